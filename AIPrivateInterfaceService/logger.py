@@ -1,7 +1,17 @@
+import queue
+import atexit
 import logging
+import threading
+from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 class Logger:
+    """
+    Loggers of the service put records on a bounded in-memory queue; a single listener thread
+    formats them and writes them to the console and, if configured, a rotating log file.
+    """
+
     # ANSI escape codes for colors
     COLORS = {
         "WARNING": "\033[93m",  # Yellow
@@ -20,11 +30,34 @@ class Logger:
             color = Logger.COLORS.get(record.levelname, Logger.COLORS["ENDC"])
             return f"{color}{log_message}{Logger.COLORS['ENDC']}"
 
+    class NonBlockingQueueHandler(QueueHandler):
+        """Enqueues records untouched, leaving formatting to the listener; drops them when the queue is full."""
+
+        def __init__(self, log_queue):
+            super().__init__(log_queue)
+            self.dropped = 0
+
+        def prepare(self, record):
+            return record
+
+        def enqueue(self, record):
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
     log_formatter = logging.Formatter(
         f"%(asctime)s - [%(levelname)s] -  %(name)s - (%(filename)s).%(funcName)s(line %(lineno)d) - %(message)s",
         datefmt="%d-%m-%Y %H:%M:%S",
     )
 
+    # Pipeline state, shared by every logger of the process
+    _lock = threading.RLock()
+    _level = logging.INFO
+    _loggers = []
+    _queue_handler = None
+    _listener = None
+
     @staticmethod
     def get_stream_handler() -> logging.StreamHandler:
         stream_handler = logging.StreamHandler()
@@ -33,12 +66,75 @@ class Logger:
         return stream_handler
 
     @staticmethod
-    def get_logger(name) -> logging.Logger:
+    def get_file_handler(file_path: str, max_bytes: int = 50 * 1024**2, backup_count: int = 5):
+        log_path = Path(file_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count)
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(Logger.log_formatter)
+        return file_handler
+
+    @classmethod
+    def configure(
+        cls,
+        level="INFO",
+        file_path: str = None,
+        max_bytes: int = 50 * 1024**2,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+    ):
+        """(Re)configures the pipeline; loggers created before the call pick up the new level.
+
+        Args:
+            level (str | int): Minimum level of the service's loggers, e.g. "INFO" or "DEBUG".
+            file_path (str): Log file, rotated when it reaches max_bytes. None logs to the console only.
+            max_bytes (int): Size at which the log file is rotated.
+            backup_count (int): Number of rotated files kept.
+            queue_size (int): Records held for the listener before new records are dropped.
+        """
+        with cls._lock:
+            cls.shutdown()
+            cls._level = logging.getLevelName(level) if isinstance(level, str) else level
+
+            log_queue = queue.Queue(maxsize=queue_size)
+            if cls._queue_handler is None:
+                cls._queue_handler = cls.NonBlockingQueueHandler(log_queue)
+            else:
+                cls._queue_handler.queue = log_queue
+
+            handlers = [cls.get_stream_handler()]
+            if file_path:
+                handlers.append(cls.get_file_handler(file_path, max_bytes, backup_count))
+            cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            cls._listener.start()
+            for logger in cls._loggers:
+                logger.setLevel(cls._level)
+
+    @classmethod
+    def shutdown(cls):
+        """Writes out the queued records and stops the listener thread."""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                for handler in cls._listener.handlers:
+                    handler.close()
+                cls._listener = None
+
+    @classmethod
+    def get_logger(cls, name) -> logging.Logger:
         logger = logging.getLogger(name)
 
-        # Check if logger already has handlers to avoid duplicate logging
-        if not logger.handlers:
-            logger.setLevel(logging.DEBUG)
-            logger.addHandler(Logger.get_stream_handler())
+        with cls._lock:
+            if cls._listener is None:
+                cls.configure(cls._level)
+            # Check if logger already has handlers to avoid duplicate logging
+            if cls._queue_handler not in logger.handlers:
+                logger.setLevel(cls._level)
+                logger.addHandler(cls._queue_handler)
+                logger.propagate = False
+                cls._loggers.append(logger)
 
         return logger
+
+
+atexit.register(Logger.shutdown)
@@ -1,3 +1,4 @@
+import os
 import grpc
 from logger import Logger
 from concurrent import futures
@@ -39,4 +40,9 @@ def serve(cert_file=None, key_file=None):
 
 
 if __name__ == "__main__":
+    Logger.configure(
+        level=os.environ.get("LOG_LEVEL", "INFO"),
+        file_path=os.environ.get("LOG_FILE"),
+        queue_size=int(os.environ.get("LOG_QUEUE_MAX_SIZE", 10000)),
+    )
     serve(cert_file="certificate.pem", key_file="private.pem")
@@ -1,5 +1,8 @@
 import grpc
+import time
 from logger import Logger
+from metrics import RPC_SECONDS
+from tracing import Tracer, CORRELATION_ID_METADATA_KEY, current_correlation_id
 from google.protobuf.any_pb2 import Any
 from Declarations.Model.Report_pb2 import Report
 from Declarations.Model.KeyValue_pb2 import KeyValue
@@ -36,7 +39,7 @@ class AIPrivateInterfaceServiceClient:
             with open(cert_file, "rb") as cert:
                 return grpc.ssl_channel_credentials(cert.read())
         except Exception as e:
-            self.log.error(f"Error reading the certificate file {cert_file}: {str(e)}")
+            self.log.error("Error reading the certificate file %s: %s", cert_file, e)
             raise
 
     def _pack_into_opaque_container(self, client_token: str) -> OpaqueContainer:
@@ -48,19 +51,34 @@ class AIPrivateInterfaceServiceClient:
         container.opaque.CopyFrom(any_message)
         return container
 
+    @staticmethod
+    def _timed_call(method: str, call, request):
+        """Invokes an RPC with the current correlation ID, recording its latency and tracing it as a span."""
+        correlation_id = current_correlation_id()
+        metadata = ((CORRELATION_ID_METADATA_KEY, correlation_id),) if correlation_id else None
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with Tracer.shared().span(f"AIPrivateInterfaceService/{method}"):
+                response = call(request, metadata=metadata)
+            outcome = "ok"
+            return response
+        finally:
+            RPC_SECONDS.labels(method, outcome).observe(time.perf_counter() - started)
+
     def fetch_initial_data(self, client_token: str) -> FetchInitialDataRequest:
         """Fetch initial data using a client token."""
         try:
             token_container = self._pack_into_opaque_container(client_token)
             request = FetchInitialDataRequest(client_token=token_container)
-            response = self.stub.FetchInitialData(request)
+            response = self._timed_call("FetchInitialData", self.stub.FetchInitialData, request)
             # self.log.info(f"Fetched initial data with response: {response}.")
             return response
         except grpc.RpcError as e:
-            self.log.error(f"Error fetching initial data: {e.details()}")
+            self.log.error("Error fetching initial data: %s", e.details())
             raise
         except Exception as e:
-            self.log.error(f"Unexpected error while fetching initial data: {str(e)}")
+            self.log.error("Unexpected error while fetching initial data: %s", e)
             raise
 
     def report_processing_result(self, report: Report, client_token: str) -> ReportResultRequest:
@@ -68,14 +86,14 @@ class AIPrivateInterfaceServiceClient:
         try:
             token_container = self._pack_into_opaque_container(client_token)
             request = ReportResultRequest(report=report, client_token=token_container)
-            response = self.stub.ReportResult(request)
+            response = self._timed_call("ReportResult", self.stub.ReportResult, request)
             # self.log.info(f"Reported result with response: {response}.")
             return response
         except grpc.RpcError as e:
-            self.log.error(f"Error reporting result: {e.details()}")
+            self.log.error("Error reporting result: %s", e.details())
             raise
         except Exception as e:
-            self.log.error(f"Unexpected error while reporting result: {str(e)}")
+            self.log.error("Unexpected error while reporting result: %s", e)
             raise
 
     def close(self):
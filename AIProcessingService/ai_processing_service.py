@@ -1,15 +1,34 @@
+import uuid
+import asyncio
+import functools
+from contextlib import nullcontext
 from logger import Logger
+from config import Config
 from metadata_utils import MetadataUtils
 from Declarations.Service import AIProcessingService_pb2_grpc
 from ai_private_interface_service_client import AIPrivateInterfaceServiceClient
 from grpc_request_handler import GRPCRequestHandler
+from session_manager import SessionManager, SessionLimitError
 from error_response import ErrorResponse
+from metrics import MetricsRegistry, CHUNKS_IN_FLIGHT, CHUNKS_TOTAL
+from tracing import Tracer, CORRELATION_ID_METADATA_KEY, correlation, new_correlation_id
 
 
 class AIProcessingService(AIProcessingService_pb2_grpc.AIProcessingServiceServicer):
     def __init__(self, server_address, cert_file):
         self.log = Logger.get_logger(__name__)
-        self.request_handler = GRPCRequestHandler(AIPrivateInterfaceServiceClient(server_address, cert_file))
+        config = Config()
+        self.session_manager = SessionManager(
+            max_sessions=config.SESSION_MAX_ACTIVE, idle_timeout=config.SESSION_IDLE_TIMEOUT_SECONDS
+        )
+        self.session_manager.start_reaper()
+        MetricsRegistry.shared().register_stats(
+            "sessions", self.session_manager.stats, counters=("created", "evicted", "rejected")
+        )
+        self.request_handler = GRPCRequestHandler(
+            AIPrivateInterfaceServiceClient(server_address, cert_file), self.session_manager
+        )
+        self.tracer = Tracer.shared()
         self.log.info("AIProcessingService initialized successfully.")
 
     def Process(self, request_iterator, context):
@@ -20,20 +39,125 @@ class AIProcessingService(AIProcessingService_pb2_grpc.AIProcessingServiceServic
             self.log.error("Metadata Invalidated")
             return
 
-        for request in request_iterator:
+        # Each stream owns its own session, so concurrent streams never share processing state.
+        session_id = uuid.uuid4().hex
+        stream_span = self._start_stream(session_id)
+        context.send_initial_metadata(((CORRELATION_ID_METADATA_KEY, stream_span.trace_id),))
+        try:
+            for request in request_iterator:
+                with self._track_in_flight(request):
+                    responses = self._dispatch(request, authorization_token, session_id, stream_span)
+                yield from responses
+        finally:
+            self.request_handler.close_session(session_id)
+            self.tracer.end_span(stream_span)
+
+    def _start_stream(self, session_id):
+        """Starts the root span of a stream, whose trace ID is the stream's correlation ID."""
+        correlation_id = new_correlation_id()
+        self.log.info("Stream %s started with correlation ID %s.", session_id, correlation_id)
+        return self.tracer.start_span("Process", trace_id=correlation_id, session_id=session_id)
+
+    @staticmethod
+    def _track_in_flight(request):
+        """Counts an audio chunk as in flight from its arrival until its responses are ready."""
+        if request.WhichOneof("payload") == "audio_chunk":
+            return CHUNKS_IN_FLIGHT.track_in_progress()
+        return nullcontext()
+
+    def _dispatch(self, request, authorization_token, session_id, stream_span):
+        """Handles a single request of a stream and returns the responses to send back.
+
+        The stream's correlation ID is bound while the request is handled, which may be on an
+        executor thread, so logs, spans, error responses and outgoing calls all carry it.
+        """
+        payload_type = request.WhichOneof("payload")
+        with correlation(stream_span.trace_id), self.tracer.span(f"Process.{payload_type}", parent=stream_span) as span:
+            responses = self._handle(request, payload_type, authorization_token, session_id)
+            errors = [response.error for response in responses if response.WhichOneof("payload") == "error"]
+            if errors:
+                span.error = errors[0].debug_description
+            return responses
+
+    def _handle(self, request, payload_type, authorization_token, session_id):
+        try:
+            if payload_type == "initialize":
+                return list(self.request_handler.handle_initialize_request(request, session_id))
+            elif payload_type == "audio_chunk":
+                responses = list(self.request_handler.handle_audio_chunk_request(request, session_id))
+                CHUNKS_TOTAL.labels("ok").inc()
+                return responses
+            elif payload_type == "finalize":
+                return list(self.request_handler.handle_finalize_request(request, authorization_token, session_id))
+            else:
+                raise ValueError("Invalid Request Type")
+        except SessionLimitError as e:
+            self.log.error(str(e))
+            self._count_failed_chunk(request)
+            return [ErrorResponse.generate_capacity_exceeded_response()]
+        except ValueError as e:
+            self.log.error(str(e))
+            self._count_failed_chunk(request)
+            return [ErrorResponse.generate_invalid_request_response()]
+        except Exception as e:
+            self.log.error("Unexpected error in Process method: %s", e)
+            self._count_failed_chunk(request)
+            return [ErrorResponse.generate_internal_server_error_response()]
+
+    @staticmethod
+    def _count_failed_chunk(request):
+        if request.WhichOneof("payload") == "audio_chunk":
+            CHUNKS_TOTAL.labels("error").inc()
+
+
+class AsyncAIProcessingService(AIProcessingService):
+    """
+    grpc.aio variant of the service. Streams are handled on the event loop, so an idle stream
+    waiting for its next chunk holds no thread; the CPU-bound work of each request runs on a
+    bounded executor.
+    """
+
+    def __init__(self, server_address, cert_file, executor, max_pending: int):
+        super().__init__(server_address, cert_file)
+        self.executor = executor
+        self.max_pending = max_pending
+        self._pending_slots = None
+
+    async def Process(self, request_iterator, context):
+        """Handles incoming requests and dispatches them based on payload type."""
+        authorization_token, user_locale = MetadataUtils.extract(context)
+
+        if not MetadataUtils.validate(authorization_token, user_locale, context):
+            self.log.error("Metadata Invalidated")
+            return
+
+        session_id = uuid.uuid4().hex
+        stream_span = self._start_stream(session_id)
+        await context.send_initial_metadata(((CORRELATION_ID_METADATA_KEY, stream_span.trace_id),))
+        try:
+            async for request in request_iterator:
+                # Chunks waiting for an executor slot count as in flight too
+                with self._track_in_flight(request):
+                    responses = await self._run_in_executor(
+                        self._dispatch, request, authorization_token, session_id, stream_span
+                    )
+                for response in responses:
+                    yield response
+        finally:
+            # Closing releases shared scoring resources and may wait on locks, so it must not block the
+            # loop. It skips the pending-request limit, so a closing stream never queues behind chunks
             try:
-                payload_type = request.WhichOneof("payload")
-                if payload_type == "initialize":
-                    yield from self.request_handler.handle_initialize_request(request)
-                elif payload_type == "audio_chunk":
-                    yield from self.request_handler.handle_audio_chunk_request(request)
-                elif payload_type == "finalize":
-                    yield from self.request_handler.handle_finalize_request(request, authorization_token)
-                else:
-                    raise ValueError("Invalid Request Type")
-            except ValueError as e:
-                self.log.error(str(e))
-                yield ErrorResponse.generate_invalid_request_response()
-            except Exception as e:
-                self.log.error(f"Unexpected error in Process method: {str(e)}")
-                yield ErrorResponse.generate_internal_server_error_response()
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self.executor, self.request_handler.close_session, session_id)
+            finally:
+                # Only queues the span for the exporter thread, so it does not block
+                self.tracer.end_span(stream_span)
+
+    async def _run_in_executor(self, func, *args):
+        """Runs blocking work on the executor, limiting how many requests queue up for it."""
+        if self._pending_slots is None:
+            # Created lazily so that it binds to the server's running event loop
+            self._pending_slots = asyncio.Semaphore(self.max_pending)
+        async with self._pending_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import atexit
+import hashlib
+import tempfile
+import threading
+import requests
+from concurrent import futures
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from logger import Logger
+from metrics import MetricsRegistry
+
+
+class CachedAsset:
+    """A downloaded asset stored in the cache under the hash of its content."""
+
+    def __init__(self, url: str, path: str, content_hash: str, size: int):
+        self.url = url
+        self.path = path
+        self.content_hash = content_hash
+        self.size = size
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+class AssetCache:
+    """
+    Content-addressed download cache for lyrics and audio assets.
+
+    Responses are streamed through a pooled HTTP session into `<cache_dir>/blobs/<sha256>`, so a
+    song shared by many URLs or sessions is stored once. Cached URLs are revalidated with
+    ETag/Last-Modified, and the least recently used blobs are evicted once the cache exceeds
+    its size cap.
+
+    Downloads and evictions are written to the on-disk index at once. Cache hits only refresh a
+    blob's last access time, so they are written at most every INDEX_SAVE_INTERVAL_SECONDS; losing
+    them on a crash only affects the eviction order.
+    """
+
+    INDEX_FILE = "index.json"
+    CHUNK_SIZE = 1 << 16
+    # Blobs used this recently may still be read by a session that is starting up
+    EVICTION_GRACE_SECONDS = 60
+    INDEX_SAVE_INTERVAL_SECONDS = 5.0
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_bytes: int, pool_size: int = 16, timeout: float = 30.0):
+        self.log = Logger.get_logger(__name__)
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self.session = self._create_session(pool_size)
+        self.executor = futures.ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="asset-fetch")
+
+        self._lock = threading.Lock()
+        # Lock and number of fetches using it, per URL being fetched
+        self._url_locks = {}
+        self._index = self._load_index()
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+        atexit.register(self.flush)
+        self.hits = 0
+        self.revalidations = 0
+        self.downloads = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls) -> "AssetCache":
+        """Returns the cache shared by every session in this process, configured from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                config = Config()
+                cls._shared = cls(
+                    cache_dir=config.ASSET_CACHE_DIR,
+                    max_bytes=config.ASSET_CACHE_MAX_BYTES,
+                    pool_size=config.ASSET_HTTP_POOL_SIZE,
+                    timeout=config.ASSET_DOWNLOAD_TIMEOUT_SECONDS,
+                )
+                MetricsRegistry.shared().register_stats(
+                    "asset_cache", cls._shared.stats, counters=("hits", "revalidations", "downloads", "evictions")
+                )
+            return cls._shared
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """Create an HTTP session whose connections are reused across downloads."""
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _load_index(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILE), "r") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = {"urls": {}, "blobs": {}}
+        # Forget blobs that were removed from disk behind our back
+        index["blobs"] = {h: b for h, b in index["blobs"].items() if os.path.exists(self._blob_path(h))}
+        index["urls"] = {u: e for u, e in index["urls"].items() if e["hash"] in index["blobs"]}
+        return index
+
+    def _save_index_locked(self):
+        fd, temp_path = tempfile.mkstemp(prefix=".index-", dir=self.cache_dir)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, os.path.join(self.cache_dir, self.INDEX_FILE))
+        self._index_dirty = False
+        self._index_saved_at = time.monotonic()
+
+    def flush(self):
+        """Writes access times not yet saved to the on-disk index."""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index_locked()
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, content_hash)
+
+    @contextmanager
+    def _url_lock(self, url: str):
+        """Serializes fetches of one URL; the lock is dropped once no fetch of the URL is running."""
+        with self._lock:
+            lock, users = self._url_locks.get(url, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._url_locks[url] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._url_locks[url]
+                if users == 1:
+                    del self._url_locks[url]
+                else:
+                    self._url_locks[url] = (lock, users - 1)
+
+    def fetch(self, url: str) -> CachedAsset:
+        """Returns the cached asset for a URL, downloading or revalidating it as needed.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            CachedAsset: The asset stored in the cache.
+
+        Raises:
+            Exception: If the download fails and no cached copy is available.
+        """
+        # Sessions starting the same song concurrently share a single download
+        with self._url_lock(url):
+            with self._lock:
+                entry = self._index["urls"].get(url)
+            if entry:
+                asset = self._revalidate(url, entry)
+                if asset is not None:
+                    return asset
+            return self._download(url)
+
+    def _revalidate(self, url: str, entry: dict) -> CachedAsset:
+        """Returns the cached copy if it is still current, or None if it must be downloaded again."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            asset = self._touch(url, entry)
+            if asset is None:
+                raise Exception(f"Failed to download data from URL: {url}") from e
+            self.log.warning("Revalidation of %s failed (%s); serving the cached copy.", url, e)
+            return asset
+
+        with response:
+            if response.status_code == 304:
+                self.revalidations += 1
+                # The blob may have been evicted by another download during the round-trip
+                return self._touch(url, entry)
+            if response.status_code != 200:
+                raise Exception(f"Failed to download data from URL: {url} (HTTP {response.status_code})")
+            return self._store(url, response)
+
+    def _download(self, url: str) -> CachedAsset:
+        try:
+            response = self.session.get(url, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise Exception(f"Failed to download data from URL: {url}") from e
+        with response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to download data from URL: {url} (HTTP {response.status_code})")
+            return self._store(url, response)
+
+    def fetch_many(self, urls) -> list:
+        """Fetches several URLs concurrently and returns their assets in the same order."""
+        pending = [self.executor.submit(self.fetch, url) for url in urls]
+        return [future.result() for future in pending]
+
+    def _touch(self, url: str, entry: dict) -> CachedAsset:
+        """Marks the cached blob of an entry as used, or returns None if it has been evicted."""
+        with self._lock:
+            blob = self._index["blobs"].get(entry["hash"])
+            if blob is None or not os.path.exists(self._blob_path(entry["hash"])):
+                return None
+            self.hits += 1
+            # Also protects the blob from eviction for EVICTION_GRACE_SECONDS
+            blob["last_access"] = time.time()
+            self._index_dirty = True
+            if time.monotonic() - self._index_saved_at >= self.INDEX_SAVE_INTERVAL_SECONDS:
+                self._save_index_locked()
+        return CachedAsset(url, self._blob_path(entry["hash"]), entry["hash"], entry["size"])
+
+    def _store(self, url: str, response: requests.Response) -> CachedAsset:
+        """Streams the response body into the blob store, hashing it on the way."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(prefix=".download-", dir=self.blob_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for block in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            content_hash = digest.hexdigest()
+            os.replace(temp_path, self._blob_path(content_hash))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        entry = {
+            "hash": content_hash,
+            "size": size,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        with self._lock:
+            self.downloads += 1
+            self._index["urls"][url] = entry
+            self._index["blobs"][content_hash] = {"size": size, "last_access": time.time()}
+            self._evict_locked(keep=content_hash)
+            self._save_index_locked()
+        self.log.info("Cached %s as %s (%s bytes).", url, content_hash[:12], size)
+        return CachedAsset(url, self._blob_path(content_hash), content_hash, size)
+
+    def _evict_locked(self, keep: str):
+        blobs = self._index["blobs"]
+        total = sum(blob["size"] for blob in blobs.values())
+        grace_deadline = time.time() - self.EVICTION_GRACE_SECONDS
+        for content_hash in sorted(blobs, key=lambda h: blobs[h]["last_access"]):
+            if total <= self.max_bytes or blobs[content_hash]["last_access"] > grace_deadline:
+                break
+            if content_hash == keep:
+                continue
+            total -= blobs.pop(content_hash)["size"]
+            self._index["urls"] = {u: e for u, e in self._index["urls"].items() if e["hash"] != content_hash}
+            try:
+                os.remove(self._blob_path(content_hash))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+            self.log.info("Evicted cached asset %s.", content_hash[:12])
+
+    def stats(self) -> dict:
+        """Returns cache occupancy and hit/download counters."""
+        with self._lock:
+            lookups = self.hits + self.downloads
+            return {
+                "entries": len(self._index["blobs"]),
+                "bytes": sum(blob["size"] for blob in self._index["blobs"].values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "downloads": self.downloads,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
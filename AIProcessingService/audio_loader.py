@@ -1,15 +1,35 @@
-import re
-import requests
+from asset_cache import AssetCache
+from lyric_timeline import LyricTimeline
 
 class AudioLoader:
-    def __init__(self, lyrics_url, track_url, voice_helper_url):
+    def __init__(self, lyrics_url, track_url, voice_helper_url, asset_cache=None):
         self.lyrics_url = lyrics_url
         self.track_url = track_url
         self.voice_helper_url = voice_helper_url
+        self.asset_cache = asset_cache or AssetCache.shared()
         # Attributes to store downloaded data
         self.lyrics_data = None
-        self.original_audio = None
-        self.background_track = None
+        self.track_asset = None
+        self.voice_helper_asset = None
+
+    @property
+    def original_audio(self):
+        """Encoded bytes of the original track, read from the asset cache."""
+        return self.track_asset.read_bytes() if self.track_asset else None
+
+    @property
+    def background_track(self):
+        """Encoded bytes of the voice-helper track, read from the asset cache."""
+        return self.voice_helper_asset.read_bytes() if self.voice_helper_asset else None
+
+    def load_all(self):
+        """Fetch lyrics, track and voice helper in parallel."""
+        urls = [url for url in (self.lyrics_url, self.track_url, self.voice_helper_url) if url]
+        assets = dict(zip(urls, self.asset_cache.fetch_many(urls)))
+        if self.lyrics_url:
+            self.lyrics_data = self._parse_lrc(assets[self.lyrics_url].read_bytes().decode('utf-8'))
+        self.track_asset = assets.get(self.track_url)
+        self.voice_helper_asset = assets.get(self.voice_helper_url)
 
     def download_lyrics(self):
         """Download and parse LRC lyrics."""
@@ -22,33 +42,15 @@ class AudioLoader:
         return audio_data
 
     def _download_data_from_url(self, url):
-        """Download data from a given URL."""
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.content
-        else:
-            raise Exception(f"Failed to download data from URL: {url}")
+        """Download data from a given URL through the asset cache."""
+        return self.asset_cache.fetch(url).read_bytes()
 
     def _parse_lrc(self, lrc_content):
-        """Parse LRC format to extract time and text."""
-        # Extract timestamps and text using regex
-        pattern = re.compile(r'\[(\d{2}:\d{2}\.\d{2})\](.*)')
-        matches = pattern.findall(lrc_content)
-
-        parsed_lyrics = []
-
-        for time_stamp, text in matches:
-            minutes, seconds = time_stamp.split(":")
-            total_seconds = int(minutes) * 60 + float(seconds)
-
-            # Only add entries with non-empty text
-            if text.strip():
-                parsed_lyrics.append({"time": total_seconds, "text": text.strip()})
-
-        return parsed_lyrics
+        """Parse LRC format into a lyric timeline of its non-empty lines."""
+        return LyricTimeline.from_lrc(lrc_content)
 
     def load_original_audio(self):
-        self.original_audio = self.download_audio(self.track_url)
+        self.track_asset = self.asset_cache.fetch(self.track_url)
 
     def load_background_track(self):
-        self.background_track = self.download_audio(self.voice_helper_download_url)
+        self.voice_helper_asset = self.asset_cache.fetch(self.voice_helper_url)
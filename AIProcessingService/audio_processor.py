@@ -1,27 +1,78 @@
 from logger import Logger
 from google.protobuf.duration_pb2 import Duration
 from Declarations.Model.AIProcessingService import AIProcessingResponse_pb2
-from google_speech_transcription import GoogleSpeechTranscription
+from model_registry import ModelRegistry
 from audio_loader import AudioLoader
 from audio_scorer import AudioScorer
 from audio_utils import AudioUtils
+from reference_feature_cache import ReferenceFeatureCache
+from online_aligner import OnlineAligner
+from pcm_ring_buffer import PCMRingBuffer
+from scoring_engine import ScoringEngine
+from feature_batcher import FeatureBatcher
+from config import Config
+from metrics import STAGE_SECONDS
+from tracing import Tracer
+from contextlib import contextmanager
 import numpy as np
-import librosa
+import time
 
 class AudioProcessor:
-    def __init__(self, client_token, initial_data):
+    def __init__(
+        self, client_token, initial_data, pcm_format=None, feature_cache=None, scoring_engine=None, feature_batcher=None
+    ):
         self.client_token = client_token
         self.log = Logger.get_logger(__name__)
-        self.google_speech_transcriber = GoogleSpeechTranscription()
+
+        self.tracer = Tracer.shared()
 
         # Initialize modular components
         self.audio_loader = AudioLoader(initial_data.lyrics_download_url, initial_data.track_download_url, initial_data.voice_helper_download_url)
-        self.audio_scorer = AudioScorer(self.audio_loader.original_audio)
+        with self.tracer.span("load_assets"):
+            self.audio_loader.load_all()
+
+        # Reference features are shared by every session singing the same track
+        track_asset = self.audio_loader.track_asset
+        self.feature_cache = feature_cache or ReferenceFeatureCache.shared()
+        with self.tracer.span("reference_features"):
+            self.reference_features = self.feature_cache.get_or_compute(track_asset.content_hash, track_asset.path)
+        self.audio_scorer = AudioScorer(self.reference_features)
+
+        # User features of concurrent sessions are computed together when batching is enabled
+        self.feature_batcher = feature_batcher or FeatureBatcher.shared()
+
+        # Tracks the singer's position so each chunk is only aligned against the nearby reference
+        config = Config()
+        params = self.reference_features.params
+        band_frames = int(config.ALIGNER_BAND_SECONDS * params.sr / params.hop_length)
+        self.aligner = OnlineAligner(self.reference_features.mfcc, band_frames)
+
+        # Raw PCM chunks are appended to a ring buffer and scored once a full analysis window is available
+        self.pcm_format = pcm_format
+        self.ring_buffer = None
+        self.scored_samples = 0
+        if pcm_format is not None:
+            self.ring_buffer = PCMRingBuffer(int(config.PCM_RING_BUFFER_SECONDS * params.sr))
+            self.analysis_window = int(config.PCM_ANALYSIS_WINDOW_SECONDS * params.sr)
 
         # To keep track of the total processed audio duration
         self.processed_duration = 0
         self.chunk_scores = []
 
+        # Seconds spent in each stage of the last chunk
+        self.stage_timings = {}
+
+        # Scoring runs on the shared worker pool when one is configured, in-process otherwise. The
+        # track is acquired last, so a failure earlier in __init__ cannot leave it published
+        self.scoring_engine = scoring_engine or ScoringEngine.shared()
+        if self.scoring_engine is not None:
+            self.scoring_engine.acquire(self.reference_features)
+
+    @property
+    def google_speech_transcriber(self):
+        """Google Speech client shared by all sessions, created on first use."""
+        return ModelRegistry.shared().get("google_speech")
+
     def create_status_response(self, status_code):
         """Creates an AI processing response containing only a status code.
 
@@ -50,25 +101,96 @@ class AudioProcessor:
     #     # TODO: Implement actual processing
     #     return self._create_processing_response(1.95, 1.9, 20)
 
+    @contextmanager
+    def _timed(self, stage):
+        """Adds the time spent in the block to the stage's entry in `stage_timings`, and traces it as a span."""
+        started = time.perf_counter()
+        try:
+            with self.tracer.span(stage) as span:
+                yield span
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + elapsed
+            STAGE_SECONDS.labels(stage).observe(elapsed)
+
+    def _record_stage_timings(self, timings, parent_span):
+        """Records stages timed by the scorer or a worker process, keyed by stage name.
+
+        Their times were measured elsewhere, so they are traced as consecutive child spans of the
+        stage that ran them, rebuilt from their durations.
+        """
+        start_ns = parent_span.start_ns
+        for stage, seconds in timings.items():
+            self.stage_timings[stage] = seconds
+            STAGE_SECONDS.labels(stage).observe(seconds)
+            start_ns = self.tracer.record_span(stage, start_ns, seconds, parent=parent_span).end_ns
+
     def process_audio_chunk(self, request):
-        user_audio_chunk = request.audio_chunk.audio_data
-        self.log.debug(f"Received audio chunk of length {len(user_audio_chunk)}")
-
-        # Align user's audio chunk with the original
-        aligned_user_audio_chunk = AudioUtils.align_audio(user_audio_chunk, self.audio_loader.original_audio)
-        self.log.debug(f"Aligned audio chunk of length {len(aligned_user_audio_chunk)}")
-
-        # Score using amplitude, spectral, and MFCC matching
-        amplitude_score = self.audio_scorer.amplitude_matching_score(aligned_user_audio_chunk, self.audio_loader.original_audio)
-        self.log.debug(f"Amplitude score: {amplitude_score}")
-        spectral_score = self.audio_scorer.spectral_matching_score(aligned_user_audio_chunk, self.audio_loader.original_audio)
-        self.log.debug(f"Spectral score: {spectral_score}")
-        mfcc_score = self.audio_scorer.mfcc_matching_score(aligned_user_audio_chunk, self.audio_loader.original_audio)
-        self.log.debug(f"MFCC score: {mfcc_score}")
-
-        # Compute combined score using weights
-        combined_score = self.audio_scorer.combined_score(amplitude_score, spectral_score, mfcc_score)
-        self.log.debug(f"Combined score: {combined_score}")
+        """Processes an audio chunk and returns the corresponding AI processing response.
+
+        Args:
+            request: The audio chunk request containing audio data.
+
+        Returns:
+            AIProcessingResponse: The response with processing results, or None when a raw PCM
+                chunk did not complete an analysis window yet.
+        """
+        self.stage_timings = {}
+        if self.pcm_format is None:
+            with self._timed("decode"):
+                user_audio_chunk = AudioUtils.decode_audio(request.audio_chunk.audio_data, self.reference_features.sr)
+            return self._score_audio(user_audio_chunk)
+
+        with self._timed("decode"):
+            samples = self.pcm_format.to_samples(request.audio_chunk.audio_data, self.reference_features.sr)
+            self.ring_buffer.append(samples)
+        if self.scored_samples < self.ring_buffer.oldest_available:
+            self.log.warning(
+                "Ring buffer overrun: dropping %s unscored samples",
+                self.ring_buffer.oldest_available - self.scored_samples,
+            )
+            self.scored_samples = self.ring_buffer.oldest_available
+
+        pending = self.ring_buffer.total_written - self.scored_samples
+        if pending < self.analysis_window:
+            return None
+        window = self.ring_buffer.read(self.scored_samples, pending)
+        self.scored_samples += pending
+        return self._score_audio(window)
+
+    def _score_audio(self, user_audio_chunk):
+        reference = self.reference_features
+        self.log.debug("Scoring audio chunk of %s samples", len(user_audio_chunk))
+
+        if self.scoring_engine is not None:
+            # Features, alignment and scores are all computed in a worker process from the raw chunk
+            with self._timed("scoring_job") as job_span:
+                start_frame, aligner_state, scores = self.scoring_engine.submit(
+                    reference, user_audio_chunk, self.aligner
+                ).result()
+            self.aligner.restore(aligner_state)
+            self._record_stage_timings(scores.pop('timings', {}), job_span)
+        else:
+            # User features are computed once per chunk; reference features come from the shared cache
+            with self._timed("features"):
+                if self.feature_batcher is not None:
+                    user_spectrogram, user_mfccs = self.feature_batcher.extract(user_audio_chunk, reference.params)
+                else:
+                    user_spectrogram, user_mfccs = AudioUtils.spectral_features(user_audio_chunk, reference.params)
+
+            # Align user's audio chunk with the original
+            with self._timed("align"):
+                start_frame = self.aligner.align(user_mfccs)
+
+            # Score using amplitude, spectral, and MFCC matching
+            with self._timed("score") as score_span:
+                scores = self.audio_scorer.score_chunk(user_audio_chunk, user_spectrogram, user_mfccs, start_frame)
+            timings = scores.pop('timings', {})
+            self._record_stage_timings({f"score_{name}": seconds for name, seconds in timings.items()}, score_span)
+        self.log.debug("Aligned audio chunk to reference frame %s", start_frame)
+        self.log.debug("Scores: %s", scores)
+        amplitude_score, spectral_score, mfcc_score = scores['amplitude'], scores['spectral'], scores['mfcc']
+        combined_score = scores['combined']
         self.chunk_scores.append(combined_score)
 
         # Compute average score
@@ -78,13 +200,20 @@ class AudioProcessor:
         instant_score = combined_score
 
         # Generate feedback
-        feedback = self.generate_feedback(amplitude_score, spectral_score, mfcc_score)
-        self.log.debug(f"Feedback: {feedback}")
+        with self._timed("feedback"):
+            feedback = self.generate_feedback(amplitude_score, spectral_score, mfcc_score)
+        self.log.debug("Feedback: %s", feedback)
 
         # Construct the response and return
-        response = self._create_processing_response(instant_score, average_score, len(user_audio_chunk) / librosa.get_samplerate(request.audio_chunk.audio_data))
-        response.feedback = feedback
-        return response
+        self.processed_duration += len(user_audio_chunk) / reference.sr
+        with self._timed("response"):
+            return self._create_processing_response(instant_score, average_score, self.processed_duration)
+
+    def close(self):
+        """Releases the shared resources held by this session."""
+        if self.scoring_engine is not None:
+            self.scoring_engine.release(self.reference_features)
+            self.scoring_engine = None
 
     def generate_feedback(self, amplitude_score, spectral_score, mfcc_score):
         """Generate feedback based on individual scoring metrics."""
@@ -110,16 +239,17 @@ class AudioProcessor:
         Args:
             instant_score (float): The instant score for the audio chunk.
             average_score (float): The average score for the audio chunk.
-            seconds (int): The processed duration in seconds.
+            seconds (float): The processed duration in seconds.
 
         Returns:
             AIProcessingResponse: The constructed response.
         """
 
-        self.log.info("Creating AIProcessingResponse AudioChunk")
+        self.log.debug("Creating AIProcessingResponse AudioChunk")
         review = AIProcessingResponse_pb2.AIProcessingResponse()
         review.live_review.instant_score = instant_score
         review.live_review.average_score = average_score
-        duration = Duration(seconds=seconds)
+        duration = Duration()
+        duration.FromNanoseconds(int(seconds * 1e9))
         review.live_review.processed_duration.CopyFrom(duration)
         return AIProcessingResponse_pb2.AIProcessingResponse(live_review=review.live_review)
@@ -1,29 +1,67 @@
-import librosa
+import time
 import numpy as np
 
 class AudioScorer:
-    def __init__(self, original_audio):
-        self.original_audio = original_audio
+    def __init__(self, reference_features):
+        self.reference_features = reference_features
+
+    @staticmethod
+    def _match_length(user_values, original_values):
+        """Trim both inputs along their last axis to the shorter of the two."""
+        length = min(user_values.shape[-1], original_values.shape[-1])
+        return user_values[..., :length], original_values[..., :length]
 
     def amplitude_matching_score(self, user_audio, original_audio):
         """Compute a score based on amplitude matching."""
+        user_audio, original_audio = self._match_length(user_audio, original_audio)
         difference = user_audio - original_audio
         return 1 / (1 + np.mean(np.abs(difference)))
 
-    def spectral_matching_score(self, user_audio, original_audio):
-        """Compute a score based on spectral matching."""
-        user_spectrogram = np.abs(librosa.stft(user_audio))
-        original_spectrogram = np.abs(librosa.stft(original_audio))
+    def spectral_matching_score(self, user_spectrogram, original_spectrogram):
+        """Compute a score based on spectral matching of STFT magnitudes."""
+        user_spectrogram, original_spectrogram = self._match_length(user_spectrogram, original_spectrogram)
         difference = user_spectrogram - original_spectrogram
         return 1 / (1 + np.mean(np.abs(difference)))
 
-    def mfcc_matching_score(self, user_audio, original_audio):
+    def mfcc_matching_score(self, user_mfccs, original_mfccs):
         """Compute a score based on MFCC matching."""
-        user_mfccs = librosa.feature.mfcc(user_audio)
-        original_mfccs = librosa.feature.mfcc(original_audio)
+        user_mfccs, original_mfccs = self._match_length(user_mfccs, original_mfccs)
         difference = user_mfccs - original_mfccs
         return 1 / (1 + np.mean(np.abs(difference)))
 
+    def score_chunk(self, user_audio, user_spectrogram, user_mfccs, start_frame):
+        """Score a user chunk against the reference window starting at the aligned frame.
+
+        Returns:
+            dict: The amplitude, spectral, MFCC and combined scores, and under 'timings' the
+                seconds each score took. The timings travel with the scores because scoring may
+                run in a worker process.
+        """
+        reference = self.reference_features
+        n_frames = user_mfccs.shape[-1]
+        started = time.perf_counter()
+        amplitude_score = self.amplitude_matching_score(
+            user_audio, reference.audio_segment(start_frame, len(user_audio))
+        )
+        amplitude_done = time.perf_counter()
+        spectral_score = self.spectral_matching_score(
+            user_spectrogram, reference.frame_window(reference.stft_magnitude, start_frame, n_frames)
+        )
+        spectral_done = time.perf_counter()
+        mfcc_score = self.mfcc_matching_score(user_mfccs, reference.frame_window(reference.mfcc, start_frame, n_frames))
+        mfcc_done = time.perf_counter()
+        return {
+            'amplitude': amplitude_score,
+            'spectral': spectral_score,
+            'mfcc': mfcc_score,
+            'combined': self.combined_score(amplitude_score, spectral_score, mfcc_score),
+            'timings': {
+                'amplitude': amplitude_done - started,
+                'spectral': spectral_done - amplitude_done,
+                'mfcc': mfcc_done - spectral_done,
+            },
+        }
+
     def combined_score(self, amplitude_score, spectral_score, mfcc_score):
         """Compute a combined score based on weights."""
         weights = {
@@ -1,33 +1,52 @@
 import logging
+from config import Config
+from audio_utils import AudioUtils
 from generated import audio_transcription_pb2
 from generated import audio_transcription_pb2_grpc
-from whisper_transcription import WhisperTranscription
-from wav2vec2_transcription import Wav2VecTranscription
-from google_speech_transcription import GoogleSpeechTranscription
+from model_registry import ModelRegistry
+from wav2vec2_batcher import Wav2Vec2Batcher
+from transcription_cache import TranscriptionCache
 
 logging.basicConfig(level=logging.INFO)
 
 
 class AudioTranscriptionService(audio_transcription_pb2_grpc.AudioTranscriptionServiceServicer):
-    def __init__(self):
-        self.whisper_transcriber = WhisperTranscription()
-        logging.info("OpenAI Whisper loaded successfully")
-        self.google_speech_transcriber = GoogleSpeechTranscription()
-        logging.info("Google speech to text loaded successfully")
-        self.wav2vec2_transcriber = Wav2VecTranscription()
-        logging.info("Facebook Wav2Vec2 loaded successfully")
+    def __init__(self, model_registry=None, transcription_cache=None):
+        # Engines are loaded on first use and shared with the rest of the process
+        self.model_registry = model_registry or ModelRegistry.shared()
+        self.transcription_cache = transcription_cache or TranscriptionCache.shared()
+        logging.info("Transcription engines available: %s", ', '.join(self.model_registry.names()))
+
+        # Cache keys name the model and settings too, so cached transcripts never outlive a model change
+        config = Config()
+        self.engine_ids = {
+            "whisper": f"whisper:{config.WHISPER_MODEL_SIZE}:vad={config.WHISPER_VAD}",
+            "wav2vec2": f"wav2vec2:{config.WAV2VEC2_MODEL_NAME}:{config.WAV2VEC2_BACKEND}",
+            "google_speech": "google_speech:video",
+        }
+        self.engine_locales = {"google_speech": "en-US"}
+
+    def _transcribe(self, transcription_service, audio_data):
+        if transcription_service == "wav2vec2":
+            # Concurrent Wav2Vec2 requests are batched into shared forward passes
+            audio = AudioUtils.decode_audio(audio_data, Wav2Vec2Batcher.SAMPLE_RATE)
+            return Wav2Vec2Batcher.shared().transcribe(audio)
+        with self.model_registry.use(transcription_service) as transcriber:
+            return transcriber.transcribe(audio_data)
 
     def TranscribeAudio(self, request, context):
         transcription_service = request.transcription_service
+        transcription_text = ""
 
-        if transcription_service == "whisper":
-            transcription_text = self.whisper_transcriber.transcribe(request.audio_data)
-        elif transcription_service == "google_speech":
-            transcription_text = self.google_speech_transcriber.transcribe(request.audio_data)
-        elif transcription_service == "wav2vec2":
-            transcription_text = self.wav2vec2_transcriber.transcribe(request.audio_data)
+        if transcription_service in self.model_registry.names():
+            transcription_text = self.transcription_cache.get_or_transcribe(
+                self.engine_ids.get(transcription_service, transcription_service),
+                request.audio_data,
+                lambda audio_data: self._transcribe(transcription_service, audio_data),
+                locale=self.engine_locales.get(transcription_service),
+            )
         else:
-            logging.error(f"Invalid transcription service: {transcription_service}")
+            logging.error("Invalid transcription service: %s", transcription_service)
             # Handle the error or set a default transcription service
 
         return audio_transcription_pb2.TranscriptionResponse(transcription=transcription_text)
@@ -1,20 +1,86 @@
+import io
+import hashlib
 import numpy as np
 import librosa
 
 class AudioUtils:
     @staticmethod
-    def align_audio(user_audio, original_audio):
-        """Align user's audio chunk with the original audio using DTW."""
-        user_mfccs = librosa.feature.mfcc(user_audio)
-        original_mfccs = librosa.feature.mfcc(original_audio)
+    def content_hash(data: bytes) -> str:
+        """Return the SHA-256 hex digest identifying a piece of encoded audio."""
+        return hashlib.sha256(data).hexdigest()
 
-        # Compute the DTW alignment between the two MFCC sequences
-        _, path = librosa.sequence.dtw(user_mfccs, original_mfccs)
+    @staticmethod
+    def decode_audio(audio_data: bytes, sr: int) -> np.ndarray:
+        """Decode an encoded audio chunk into a mono float signal at the given sample rate."""
+        audio, _ = librosa.load(io.BytesIO(audio_data), sr=sr, mono=True)
+        return audio
+
+    @staticmethod
+    def spectral_features(audio, params):
+        """Compute the STFT magnitude and MFCCs of a signal with the given FeatureParams.
+
+        The same computation is used for the reference track and the user's chunks so that
+        both sides of every comparison are on the same scale.
+        """
+        stft_magnitude = np.abs(librosa.stft(audio, n_fft=params.n_fft, hop_length=params.hop_length))
+        mel = librosa.feature.melspectrogram(S=stft_magnitude**2, sr=params.sr)
+        mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=params.n_mfcc)
+        return stft_magnitude.astype(np.float32), mfcc.astype(np.float32)
+
+    @staticmethod
+    def voiced_intervals(audio, sr, top_db=30, min_silence=0.3, pad=0.1, max_length=30.0):
+        """Find the voiced regions of a signal with an energy-based VAD.
+
+        Args:
+            audio (np.ndarray): Mono signal.
+            sr (int): Sample rate of the signal.
+            top_db (float): Frames quieter than the peak by more than this are treated as silence.
+            min_silence (float): Silences shorter than this (in seconds) do not split a region.
+            pad (float): Seconds of context kept on both sides of each region.
+            max_length (float): Regions longer than this (in seconds) are split into equal parts.
+
+        Returns:
+            np.ndarray: Sample intervals of shape (n, 2), in order and non-overlapping.
+        """
+        intervals = librosa.effects.split(audio, top_db=top_db)
+        if len(intervals) == 0:
+            return np.zeros((0, 2), dtype=int)
+
+        # Merge regions separated by short pauses, then add context around each region
+        merged = [list(intervals[0])]
+        for start, end in intervals[1:]:
+            if start - merged[-1][1] < min_silence * sr:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        pad_samples = int(pad * sr)
+        padded = []
+        for start, end in merged:
+            start, end = max(0, start - pad_samples), min(len(audio), end + pad_samples)
+            if padded and start <= padded[-1][1]:
+                padded[-1][1] = end
+            else:
+                padded.append([start, end])
+
+        max_samples = int(max_length * sr)
+        result = []
+        for start, end in padded:
+            parts = -(-(end - start) // max_samples)
+            bounds = np.linspace(start, end, parts + 1).astype(int)
+            result.extend(zip(bounds[:-1], bounds[1:]))
+        return np.array(result, dtype=int)
+
+    @staticmethod
+    def align_audio(user_mfccs, original_mfccs):
+        """Locate the user's chunk in the original using subsequence DTW on precomputed MFCCs.
 
-        # Extract the aligned audio chunk based on DTW path
-        aligned_audio_chunk = user_audio[path[0]]
+        Returns:
+            int: The frame of the original at which the user's chunk starts.
+        """
+        _, path = librosa.sequence.dtw(user_mfccs, original_mfccs, subseq=True)
 
-        return aligned_audio_chunk
+        # The warping path is returned end-first, so its last entry is where the chunk starts
+        return int(path[-1][1])
 
     @staticmethod
     def is_noisy(audio):
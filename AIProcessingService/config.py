@@ -33,6 +33,83 @@ class Config:
         self.USER_LOCALE_KEY = self._get_env_variable("USER_LOCALE_KEY")
         self.MISSING_AUTHORIZATION_MSG = (self._get_env_variable("MISSING_AUTHORIZATION_MSG"),)
         self.MISSING_USER_LOCALE_MSG = self._get_env_variable("MISSING_USER_LOCALE_MSG")
+        self.GRPC_SERVER_MODE = self._get_optional_env_variable("GRPC_SERVER_MODE", "sync")  # "sync" or "aio"
+        self.LOG_LEVEL = self._get_optional_env_variable("LOG_LEVEL", "INFO")
+        self.LOG_FILE = self._get_optional_env_variable("LOG_FILE", "logs/app.log")
+        self.LOG_FILE_MAX_BYTES = int(self._get_optional_env_variable("LOG_FILE_MAX_BYTES", 50 * 1024**2))
+        self.LOG_FILE_BACKUP_COUNT = int(self._get_optional_env_variable("LOG_FILE_BACKUP_COUNT", 5))
+        self.LOG_QUEUE_MAX_SIZE = int(self._get_optional_env_variable("LOG_QUEUE_MAX_SIZE", 10000))
+        self.LOG_DEBUG_SAMPLE_EVERY = int(self._get_optional_env_variable("LOG_DEBUG_SAMPLE_EVERY", 1))  # 1: keep all
+        self.METRICS_PORT = int(self._get_optional_env_variable("METRICS_PORT", 9464))  # 0 disables /metrics
+        self.TRACING_EXPORTER = self._get_optional_env_variable("TRACING_EXPORTER", "none")  # none, jsonl or otlp
+        self.TRACING_JSONL_PATH = self._get_optional_env_variable("TRACING_JSONL_PATH", "logs/traces.jsonl")
+        self.TRACING_OTLP_ENDPOINT = self._get_optional_env_variable(
+            "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
+        self.TRACING_SERVICE_NAME = self._get_optional_env_variable("TRACING_SERVICE_NAME", "aiprocessing-service")
+        self.SCORING_EXECUTOR_WORKERS = int(self._get_optional_env_variable("SCORING_EXECUTOR_WORKERS", os.cpu_count()))
+        self.SCORING_MAX_PENDING = int(
+            self._get_optional_env_variable("SCORING_MAX_PENDING", 4 * self.SCORING_EXECUTOR_WORKERS)
+        )
+        self.SCORING_ENGINE_WORKERS = int(self._get_optional_env_variable("SCORING_ENGINE_WORKERS", 0))  # 0: in-process
+        self.FEATURE_BATCH_MAX_SIZE = int(self._get_optional_env_variable("FEATURE_BATCH_MAX_SIZE", 16))  # <=1: off
+        self.FEATURE_BATCH_MAX_WAIT_MS = float(self._get_optional_env_variable("FEATURE_BATCH_MAX_WAIT_MS", 5))
+        self.WHISPER_MODEL_SIZE = self._get_optional_env_variable("WHISPER_MODEL_SIZE", "large-v2")
+        self.WHISPER_VAD = self._get_optional_env_variable("WHISPER_VAD", "false").lower() in ("1", "true", "yes")
+        self.WHISPER_VAD_TOP_DB = float(self._get_optional_env_variable("WHISPER_VAD_TOP_DB", 30))
+        self.WHISPER_BATCH_SIZE = int(self._get_optional_env_variable("WHISPER_BATCH_SIZE", 8))
+        self.WAV2VEC2_MODEL_NAME = self._get_optional_env_variable("WAV2VEC2_MODEL_NAME", "facebook/wav2vec2-base-960h")
+        self.GOOGLE_SPEECH_CREDENTIALS_FILE = self._get_optional_env_variable(
+            "GOOGLE_SPEECH_CREDENTIALS_FILE", "sa_speech_test.json"
+        )
+        self.WAV2VEC2_BACKEND = self._get_optional_env_variable("WAV2VEC2_BACKEND", "torch")  # torch, int8 or onnx
+        self.WAV2VEC2_ONNX_DIR = self._get_optional_env_variable("WAV2VEC2_ONNX_DIR", "onnx_models")
+        self.WAV2VEC2_BATCH_MAX_SIZE = int(self._get_optional_env_variable("WAV2VEC2_BATCH_MAX_SIZE", 8))
+        self.WAV2VEC2_BATCH_MAX_WAIT_MS = float(self._get_optional_env_variable("WAV2VEC2_BATCH_MAX_WAIT_MS", 20))
+        self.WAV2VEC2_BATCH_MAX_LENGTH_RATIO = float(
+            self._get_optional_env_variable("WAV2VEC2_BATCH_MAX_LENGTH_RATIO", 1.25)
+        )
+        self.TRANSCRIPTION_CACHE_MAX_ENTRIES = int(self._get_optional_env_variable("TRANSCRIPTION_CACHE_MAX_ENTRIES", 4096))
+        self.TRANSCRIPTION_CACHE_DIR = self._get_optional_env_variable("TRANSCRIPTION_CACHE_DIR", "")  # empty: memory only
+        self.MODEL_REGISTRY_MAX_BYTES = int(self._get_optional_env_variable("MODEL_REGISTRY_MAX_BYTES", 8 * 1024**3))
+        self.MODEL_IDLE_TIMEOUT_SECONDS = float(self._get_optional_env_variable("MODEL_IDLE_TIMEOUT_SECONDS", 900))
+        self.SESSION_IDLE_TIMEOUT_SECONDS = float(self._get_optional_env_variable("SESSION_IDLE_TIMEOUT_SECONDS", 300))
+        self.REFERENCE_FEATURE_CACHE_MAX_BYTES = int(
+            self._get_optional_env_variable("REFERENCE_FEATURE_CACHE_MAX_BYTES", 1024**3)
+        )
+        self.REFERENCE_FEATURE_SR = int(self._get_optional_env_variable("REFERENCE_FEATURE_SR", 22050))
+        self.REFERENCE_FEATURE_N_FFT = int(self._get_optional_env_variable("REFERENCE_FEATURE_N_FFT", 2048))
+        self.REFERENCE_FEATURE_HOP_LENGTH = int(self._get_optional_env_variable("REFERENCE_FEATURE_HOP_LENGTH", 512))
+        self.REFERENCE_FEATURE_N_MFCC = int(self._get_optional_env_variable("REFERENCE_FEATURE_N_MFCC", 20))
+        self.ALIGNER_BAND_SECONDS = float(self._get_optional_env_variable("ALIGNER_BAND_SECONDS", 3.0))
+        self.PCM_RING_BUFFER_SECONDS = float(self._get_optional_env_variable("PCM_RING_BUFFER_SECONDS", 30))
+        self.PCM_ANALYSIS_WINDOW_SECONDS = float(self._get_optional_env_variable("PCM_ANALYSIS_WINDOW_SECONDS", 1.0))
+        # A sync server holds a worker thread per stream, so it cannot serve more sessions than it has workers.
+        # An aio server keeps idle streams on the event loop, so sessions are bounded by memory instead: each
+        # holds a PCM ring buffer plus roughly SESSION_OVERHEAD_BYTES of features and scores, while reference
+        # features and models are shared. With the defaults that allows about 1100 sessions per node.
+        self.SESSION_MEMORY_BUDGET_BYTES = int(
+            self._get_optional_env_variable("SESSION_MEMORY_BUDGET_BYTES", 4 * 1024**3)
+        )
+        self.SESSION_OVERHEAD_BYTES = int(self._get_optional_env_variable("SESSION_OVERHEAD_BYTES", 1024**2))
+        session_bytes = int(self.PCM_RING_BUFFER_SECONDS * self.REFERENCE_FEATURE_SR) * 4 + self.SESSION_OVERHEAD_BYTES
+        default_max_sessions = (
+            max(1, self.SESSION_MEMORY_BUDGET_BYTES // session_bytes)
+            if self.GRPC_SERVER_MODE == "aio"
+            else self.GRPC_SERVER_MAX_WORKERS
+        )
+        self.SESSION_MAX_ACTIVE = int(self._get_optional_env_variable("SESSION_MAX_ACTIVE", default_max_sessions))
+        self.FEATURE_STORE_DIR = self._get_optional_env_variable("FEATURE_STORE_DIR", "")  # Empty disables the store
+        # Deletes namespaces of other feature parameters at startup; only safe when no other replica still uses them
+        self.FEATURE_STORE_PURGE_STALE = self._get_optional_env_variable(
+            "FEATURE_STORE_PURGE_STALE", "false"
+        ).lower() in ("1", "true", "yes")
+        self.ASSET_CACHE_DIR = self._get_optional_env_variable("ASSET_CACHE_DIR", "asset_cache")
+        self.ASSET_CACHE_MAX_BYTES = int(self._get_optional_env_variable("ASSET_CACHE_MAX_BYTES", 5 * 1024**3))
+        self.ASSET_HTTP_POOL_SIZE = int(self._get_optional_env_variable("ASSET_HTTP_POOL_SIZE", 16))
+        self.ASSET_DOWNLOAD_TIMEOUT_SECONDS = float(
+            self._get_optional_env_variable("ASSET_DOWNLOAD_TIMEOUT_SECONDS", 30)
+        )
 
     @staticmethod
     def _get_env_variable(var_name):
@@ -41,3 +118,9 @@ class Config:
         if not value:
             raise ValueError(f"Missing essential configuration: {var_name}. Please set this environment variable.")
         return value
+
+    @staticmethod
+    def _get_optional_env_variable(var_name, default):
+        """Retrieve environment variable or fall back to the given default if not set."""
+        value = os.environ.get(var_name)
+        return value if value else default
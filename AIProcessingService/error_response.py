@@ -1,19 +1,23 @@
-import grpc
 from config import Config
+from tracing import current_correlation_id
 from Declarations.Model.AIProcessingService import AIProcessingResponse_pb2
 
 
 class ErrorResponse:
+    StatusCode = AIProcessingResponse_pb2.AIProcessingResponse.StatusCode
+
     @staticmethod
     def generate_error_response(
-        code: grpc.StatusCode,
+        code: int,
         details: str,
+        debug_description: str = "Invalid request received by server.",
     ):
         """Generates and returns an AI processing response for error scenarios.
 
         Args:
-            code (grpc.StatusCode): The gRPC status code for the error.
+            code (AIProcessingResponse_pb2.AIProcessingResponse.StatusCode): The status code for the error.
             details (str): The error details message.
+            debug_description (str): Description of the error for client developers.
 
         Returns:
             AIProcessingResponse: The constructed error response.
@@ -21,8 +25,31 @@ class ErrorResponse:
         return AIProcessingResponse_pb2.AIProcessingResponse(
             status_code=code,
             error=AIProcessingResponse_pb2.AIProcessingResponse.Error(
-                correlation_id=Config.DEFAULT_CORRELATION_ID,
-                debug_description="Invalid request received by server.",
+                correlation_id=current_correlation_id(Config().DEFAULT_CORRELATION_ID),
+                debug_description=debug_description,
                 user_description=details,
             ),
         )
+
+    @staticmethod
+    def generate_invalid_request_response(details: str = "Invalid request."):
+        """Generates the response sent when the client misused the Process call."""
+        return ErrorResponse.generate_error_response(ErrorResponse.StatusCode.STATUSCODE_CLIENT_ERROR_RETRY, details)
+
+    @staticmethod
+    def generate_internal_server_error_response(details: str = "An error occurred while processing your request."):
+        """Generates the response sent when processing failed on the server side."""
+        return ErrorResponse.generate_error_response(
+            ErrorResponse.StatusCode.STATUSCODE_SERVER_ERROR_RETRY,
+            details,
+            debug_description="Internal error in AIProcessingService.",
+        )
+
+    @staticmethod
+    def generate_capacity_exceeded_response():
+        """Generates the response sent when no session slot is available on this server."""
+        return ErrorResponse.generate_error_response(
+            ErrorResponse.StatusCode.STATUSCODE_SERVER_ERROR_RETRY,
+            "The server is busy. Please try again shortly.",
+            debug_description="Session capacity reached on this AIProcessingService instance.",
+        )
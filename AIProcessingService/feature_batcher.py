@@ -0,0 +1,164 @@
+import time
+import queue
+import threading
+import numpy as np
+import librosa
+from collections import Counter
+from concurrent import futures
+from logger import Logger
+from metrics import MetricsRegistry
+
+
+class FeatureBatcher:
+    """
+    Micro-batches user feature extraction across sessions.
+
+    Sessions submit their chunks and wait on a future. A single worker thread collects chunks for
+    at most `max_wait` seconds (or until `max_batch_size` are queued), zero-pads them to a common
+    length and computes the STFT and mel spectrogram of the whole batch in one vectorized call.
+    Each session then receives the same features AudioUtils.spectral_features would compute for
+    its chunk alone, trimmed to the chunk's own frame count.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_batch_size: int, max_wait: float):
+        """
+        Args:
+            max_batch_size (int): Maximum number of chunks computed together.
+            max_wait (float): Maximum time in seconds the first chunk of a batch waits for others.
+        """
+        self.log = Logger.get_logger(__name__)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._mel_bases = {}
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._batch_sizes = Counter()
+        self._chunks = 0
+        self._samples = 0
+        self._wait_seconds = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="feature-batcher", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def shared(cls):
+        """Returns the batcher shared by every session in this process, or None if batching is disabled."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                config = Config()
+                if config.FEATURE_BATCH_MAX_SIZE <= 1:
+                    return None
+                cls._shared = cls(config.FEATURE_BATCH_MAX_SIZE, config.FEATURE_BATCH_MAX_WAIT_MS / 1000)
+                MetricsRegistry.shared().register_stats(
+                    "feature_batcher", cls._shared.stats, counters=("batches", "chunks")
+                )
+            return cls._shared
+
+    def submit(self, audio: np.ndarray, params) -> futures.Future:
+        """Queues a chunk for feature extraction.
+
+        Args:
+            audio (np.ndarray): Mono samples of the chunk at params.sr.
+            params (FeatureParams): The parameters the features are computed with.
+
+        Returns:
+            Future: Resolves to the (stft_magnitude, mfcc) tuple of the chunk.
+        """
+        future = futures.Future()
+        self._queue.put((np.asarray(audio, dtype=np.float32), params, future, time.monotonic()))
+        return future
+
+    def extract(self, audio: np.ndarray, params):
+        """Computes the features of a chunk as part of the next batch and waits for them."""
+        return self.submit(audio, params).result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Chunks are only stacked with chunks using the same feature parameters
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for params, items in groups.items():
+                self._compute(params, items)
+
+    def _compute(self, params, items):
+        started = time.monotonic()
+        try:
+            results = self._batch_features([item[0] for item in items], params)
+        except Exception as e:
+            self.log.error("Batched feature extraction failed: %s", e)
+            for item in items:
+                item[2].set_exception(e)
+            return
+
+        for item, result in zip(items, results):
+            item[2].set_result(result)
+
+        with self._stats_lock:
+            self._batch_sizes[len(items)] += 1
+            self._chunks += len(items)
+            self._samples += sum(len(item[0]) for item in items)
+            self._wait_seconds += sum(started - item[3] for item in items)
+        self.log.debug("Computed features of %s chunks in %.4fs", len(items), time.monotonic() - started)
+
+    def _mel_basis(self, params) -> np.ndarray:
+        basis = self._mel_bases.get(params)
+        if basis is None:
+            basis = self._mel_bases[params] = librosa.filters.mel(sr=params.sr, n_fft=params.n_fft)
+        return basis
+
+    def _batch_features(self, chunks, params) -> list:
+        """Computes (stft_magnitude, mfcc) for every chunk with one STFT over the zero-padded batch."""
+        lengths = [len(chunk) for chunk in chunks]
+        stacked = np.zeros((len(chunks), max(lengths)), dtype=np.float32)
+        for row, chunk in zip(stacked, chunks):
+            row[: len(chunk)] = chunk
+
+        # Frames are centered and edge-padded with zeros, so a chunk's own frames are unaffected
+        # by the padding added after it
+        stft_magnitude = np.abs(
+            librosa.stft(stacked, n_fft=params.n_fft, hop_length=params.hop_length, pad_mode="constant")
+        )
+        mel = np.einsum("mf,bft->bmt", self._mel_basis(params), stft_magnitude**2, optimize=True)
+
+        results = []
+        for i, length in enumerate(lengths):
+            n_frames = 1 + length // params.hop_length
+            # power_to_db clips relative to its input's maximum, so it runs per chunk
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel[i, :, :n_frames]), n_mfcc=params.n_mfcc)
+            results.append((stft_magnitude[i, :, :n_frames].astype(np.float32), mfcc.astype(np.float32)))
+        return results
+
+    def stats(self) -> dict:
+        """Returns the batch-size histogram and throughput since the batcher started."""
+        with self._stats_lock:
+            elapsed = time.monotonic() - self._started_at
+            batches = sum(self._batch_sizes.values())
+            return {
+                "batches": batches,
+                "chunks": self._chunks,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "mean_batch_size": self._chunks / batches if batches else 0.0,
+                "mean_wait_seconds": self._wait_seconds / self._chunks if self._chunks else 0.0,
+                "chunks_per_second": self._chunks / elapsed if elapsed else 0.0,
+                "samples_per_second": self._samples / elapsed if elapsed else 0.0,
+                "queued": self._queue.qsize(),
+            }
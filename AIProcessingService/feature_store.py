@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from logger import Logger
+
+
+class FeatureStore:
+    """
+    Persistent on-disk store of reference features saved as `.npy` files and loaded memory-mapped,
+    so restarted replicas skip recomputation and worker processes share pages through the OS cache.
+
+    Entries live under a namespace derived from FORMAT_VERSION and the feature parameters:
+
+        <root>/<namespace>/<track_hash>/<feature>.npy
+        <root>/<namespace>/<track_hash>/meta.json
+
+    Changing the parameters or bumping FORMAT_VERSION selects a new namespace, which invalidates
+    every older entry; purge_stale() deletes them from disk. Replicas running other parameters may
+    still be reading those namespaces, e.g. during a rolling deploy, so purging is a maintenance
+    step left to the operator rather than something done at startup.
+    """
+
+    # Bump whenever the way features are computed changes, to invalidate stored entries
+    FORMAT_VERSION = 1
+    META_FILE = "meta.json"
+    # Names produced by _namespace(); nothing else under the root is ever touched
+    NAMESPACE_PATTERN = re.compile(r"^v\d+-[0-9a-f]{16}$")
+
+    def __init__(self, root_dir: str, params):
+        self.log = Logger.get_logger(__name__)
+        self.root_dir = root_dir
+        self.params = params
+        self.namespace = self._namespace(params)
+        self.namespace_dir = os.path.join(root_dir, self.namespace)
+        os.makedirs(self.namespace_dir, exist_ok=True)
+
+    @classmethod
+    def _namespace(cls, params) -> str:
+        description = json.dumps({"version": cls.FORMAT_VERSION, **params.as_dict()}, sort_keys=True)
+        digest = hashlib.sha256(description.encode("utf-8")).hexdigest()[:16]
+        return f"v{cls.FORMAT_VERSION}-{digest}"
+
+    def _entry_dir(self, track_hash: str) -> str:
+        return os.path.join(self.namespace_dir, track_hash)
+
+    def _metadata(self, track_hash: str) -> dict:
+        return {"version": self.FORMAT_VERSION, "track_hash": track_hash, "params": self.params.as_dict()}
+
+    def load(self, track_hash: str, feature_names) -> dict:
+        """Memory-maps the stored features of a track.
+
+        Args:
+            track_hash (str): Content hash of the encoded track.
+            feature_names (Iterable[str]): Names of the features to load.
+
+        Returns:
+            dict: Read-only memory-mapped arrays keyed by feature name, or None if the track is not
+                stored with the current version and parameters.
+        """
+        entry_dir = self._entry_dir(track_hash)
+        try:
+            with open(os.path.join(entry_dir, self.META_FILE), "r") as f:
+                metadata = json.load(f)
+            if metadata != self._metadata(track_hash):
+                self.log.warning("Stale feature store entry for track %s; ignoring it.", track_hash[:12])
+                return None
+            return {name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r") for name in feature_names}
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            self.log.error("Corrupt feature store entry for track %s: %s", track_hash[:12], e)
+            return None
+
+    def save(self, track_hash: str, features: dict):
+        """Writes the features of a track atomically.
+
+        The entry is written to a temporary directory and renamed into place, so concurrent readers
+        and writers in other processes never observe a partial entry.
+
+        Args:
+            track_hash (str): Content hash of the encoded track.
+            features (dict): Arrays keyed by feature name.
+        """
+        entry_dir = self._entry_dir(track_hash)
+        if os.path.isdir(entry_dir):
+            return
+        temp_dir = tempfile.mkdtemp(prefix=f".{track_hash[:12]}-", dir=self.namespace_dir)
+        try:
+            for name, array in features.items():
+                np.save(os.path.join(temp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(temp_dir, self.META_FILE), "w") as f:
+                json.dump(self._metadata(track_hash), f)
+            os.rename(temp_dir, entry_dir)
+            self.log.info("Stored reference features for track %s in %s.", track_hash[:12], entry_dir)
+        except OSError as e:
+            # Another process may have stored the same track first, which is fine.
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.isdir(entry_dir):
+                self.log.error("Failed to store reference features for track %s: %s", track_hash[:12], e)
+
+    def purge_stale(self) -> int:
+        """Deletes every namespace written with other parameters or format versions.
+
+        Only directories named like a namespace of this store are removed. Run it once no replica
+        uses the old parameters any more, since their namespaces are indistinguishable from stale ones.
+
+        Returns:
+            int: The number of namespaces removed.
+        """
+        removed = 0
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name != self.namespace and self.NAMESPACE_PATTERN.match(name) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+                self.log.info("Purged stale feature store namespace %s.", name)
+        return removed
+
+
+if __name__ == "__main__":
+    from config import Config
+    from reference_feature_cache import FeatureParams
+
+    config = Config()
+    if not config.FEATURE_STORE_DIR:
+        raise SystemExit("FEATURE_STORE_DIR is not set.")
+    store = FeatureStore(
+        config.FEATURE_STORE_DIR,
+        FeatureParams(
+            sr=config.REFERENCE_FEATURE_SR,
+            n_fft=config.REFERENCE_FEATURE_N_FFT,
+            hop_length=config.REFERENCE_FEATURE_HOP_LENGTH,
+            n_mfcc=config.REFERENCE_FEATURE_N_MFCC,
+        ),
+    )
+    print(f"Removed {store.purge_stale()} stale namespaces; kept {store.namespace}.")
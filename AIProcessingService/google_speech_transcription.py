@@ -9,9 +9,8 @@ logging.basicConfig(level=logging.INFO)
 
 
 class GoogleSpeechTranscription:
-    def __init__(self):
+    def __init__(self, client_file='sa_speech_test.json'):
         # Initialize the Google Speech client
-        client_file = 'sa_speech_test.json'
         credentials = service_account.Credentials.from_service_account_file(client_file)
         self.client = speech.SpeechClient(credentials=credentials)
 
@@ -40,5 +39,5 @@ class GoogleSpeechTranscription:
                 logging.warning("No transcription results returned from Google Speech API.")
                 return ""
         except Exception as e:
-            logging.error(f"Error transcribing audio: {e}")
+            logging.error("Error transcribing audio: %s", e)
             return ""
@@ -1,23 +1,26 @@
-import grpc
 from logger import Logger
 from token_validator import TokenValidator
 from audio_processor import AudioProcessor
 from report_generator import ReportGenerator
 from error_response import ErrorResponse
+from pcm_ring_buffer import PCMFormat
+from tracing import Tracer
 
 
 class GRPCRequestHandler:
-    def __init__(self, private_interface_client):
+    def __init__(self, private_interface_client, session_manager):
         self.log = Logger.get_logger(__name__)
-        self.audio_processor = None
         self.private_interface_client = private_interface_client
+        self.session_manager = session_manager
         self.report_generator = ReportGenerator(private_interface_client)
+        self.tracer = Tracer.shared()
 
-    def handle_initialize_request(self, request):
-        """Handles an initialization request and performs necessary actions.
+    def handle_initialize_request(self, request, session_id):
+        """Handles an initialization request and registers a session for the stream.
 
         Args:
             request: The initialization request containing client data.
+            session_id (str): The ID of the stream sending the request.
 
         Returns:
             AIProcessingResponse: The response indicating success or error.
@@ -26,26 +29,48 @@ class GRPCRequestHandler:
         try:
             client_token_container = request.initialize.client_token
         except Exception as e:
-            self.log.error(f"Error handling initialize request: {str(e)}")
-            return ErrorResponse.generate_error_response(
-                code=grpc.StatusCode.INTERNAL, details="An error occurred while processing your request."
-            )
+            self.log.error("Error handling initialize request: %s", e)
+            yield ErrorResponse.generate_internal_server_error_response()
+            return
 
         if client_token_container:
             client_token = TokenValidator.unpack_client_token(client_token_container)
+            pcm_format = PCMFormat.from_initialize(request.initialize)
 
-            initial_data = self.private_interface_client.fetch_initial_data(client_token)
+            # The slot is claimed first, so a stream over capacity is rejected before any download
+            session = self.session_manager.reserve(session_id, client_token)
+            try:
+                initial_data = self.private_interface_client.fetch_initial_data(client_token)
 
-            self.audio_processor = AudioProcessor(client_token, initial_data)
-            self.log.info("Processing audio chunk...")
+                with self.tracer.span("AudioProcessor.init", session_id=session_id):
+                    audio_processor = AudioProcessor(client_token, initial_data, pcm_format)
+            except BaseException:
+                self.session_manager.remove(session_id)
+                raise
+            self.session_manager.attach(session, audio_processor)
+            self.log.info("Session %s ready to process audio chunks.", session_id)
 
-            yield self.audio_processor.create_status_response(0)
+            yield audio_processor.create_status_response(0)
         else:
             self.log.error("client_token not found in Initialize message.")
-            return None
 
-    def handle_audio_chunk_request(self, request):
-        yield self.audio_processor.process_audio_chunk(request)
+    def handle_audio_chunk_request(self, request, session_id):
+        session = self.session_manager.get(session_id)
+        with self.tracer.span(
+            "AudioProcessor.process_audio_chunk", session_id=session_id, chunk_bytes=len(request.audio_chunk.audio_data)
+        ):
+            response = session.audio_processor.process_audio_chunk(request)
+        # Raw PCM chunks only produce a review once a full analysis window has been received
+        if response is not None:
+            yield response
 
-    def handle_finalize_request(self, request, client_token):
-        yield self.report_generator.handle_finalize(request, client_token)
+    def handle_finalize_request(self, request, client_token, session_id):
+        with self.tracer.span("ReportGenerator.handle_finalize", session_id=session_id):
+            response = self.report_generator.handle_finalize(request, client_token)
+        yield response
+        # The stream either ends here or re-initializes, so the processing state is no longer needed.
+        self.session_manager.remove(session_id)
+
+    def close_session(self, session_id):
+        """Releases the session of a stream that has ended."""
+        self.session_manager.remove(session_id)
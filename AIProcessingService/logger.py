@@ -1,10 +1,24 @@
 import sys
+import queue
+import atexit
 import logging
+import threading
 import traceback
 from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from tracing import current_correlation_id
 
 
 class Logger:
+    """
+    Logging backend shared by every module of the service.
+
+    Loggers only put records on a bounded in-memory queue; a single listener thread formats them and
+    writes them to the console and one rotating log file. Messages use lazy %-style arguments, so a
+    record below the configured level costs a level check, and one above it is formatted on the
+    listener thread rather than on the request thread.
+    """
+
     # Adjusted ANSI escape codes for colors based on user's description
     COLORS = {
         "WARNING": "\033[93m",  # Yellow
@@ -23,18 +37,76 @@ class Logger:
             color = Logger.COLORS.get(record.levelname, Logger.COLORS["ENDC"])
             return f"{color}{log_message}{Logger.COLORS['ENDC']}"
 
-    console_formatter = ColoredFormatter("%(levelname)s: %(message)s")
+    class CorrelationIdFilter(logging.Filter):
+        """Adds the correlation ID of the stream being handled, if any, to every record."""
+
+        def filter(self, record):
+            correlation_id = current_correlation_id()
+            record.correlation_id = correlation_id or "-"
+            record.correlation = f"[{correlation_id}] " if correlation_id else ""
+            return True
+
+    class DebugSamplingFilter(logging.Filter):
+        """Passes one in every `every` DEBUG records of each call site; other levels always pass.
+
+        Counting per call site keeps the first occurrence of every line, and since a chunk runs
+        each of its debug lines once, the lines kept for one chunk tend to be kept together.
+        """
+
+        def __init__(self, every: int = 1):
+            super().__init__()
+            self.every = max(1, int(every))
+            self._counts = {}
+
+        def filter(self, record):
+            if self.every == 1 or record.levelno != logging.DEBUG:
+                return True
+            site = (record.pathname, record.lineno)
+            count = self._counts.get(site, 0)
+            self._counts[site] = count + 1
+            return count % self.every == 0
+
+    class NonBlockingQueueHandler(QueueHandler):
+        """Enqueues records untouched, leaving all formatting to the listener thread.
+
+        The queue never leaves the process, so records need not be made picklable, and a full
+        queue drops the record instead of blocking the caller.
+        """
+
+        def __init__(self, log_queue):
+            super().__init__(log_queue)
+            self.dropped = 0
+
+        def prepare(self, record):
+            return record
+
+        def enqueue(self, record):
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    console_formatter = ColoredFormatter("%(levelname)s: %(correlation)s%(message)s")
     file_formatter = logging.Formatter(
-        f"%(asctime)s - [%(levelname)s] -  %(name)s - (%(filename)s).%(funcName)s(line %(lineno)d) - %(message)s",
+        f"%(asctime)s - [%(levelname)s] - [%(correlation_id)s] -  %(name)s - (%(filename)s).%(funcName)s(line %(lineno)d) - %(message)s",
         datefmt="%d-%m-%Y %H:%M:%S",
     )
 
+    # Pipeline state, shared by every logger of the process
+    _lock = threading.RLock()
+    _level = logging.INFO
+    _loggers = []
+    _queue_handler = None
+    _sampling_filter = None
+    _listener = None
+    _file_handler = None
+
     @staticmethod
-    def get_file_handler() -> logging.FileHandler:
-        # create logs folder if it doesn't exist
-        log_path = Path("logs")  # Simplified path for demonstration purposes
-        log_path.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_path / "app.log")
+    def get_file_handler(file_path: str = "logs/app.log", max_bytes: int = 50 * 1024**2, backup_count: int = 5):
+        # create the log folder if it doesn't exist
+        log_path = Path(file_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(Logger.file_formatter)
         return file_handler
@@ -46,26 +118,100 @@ class Logger:
         stream_handler.setFormatter(Logger.console_formatter)
         return stream_handler
 
-    @staticmethod
-    def get_logger(name) -> logging.Logger:
+    @classmethod
+    def configure(
+        cls,
+        level="INFO",
+        file_path: str = "logs/app.log",
+        max_bytes: int = 50 * 1024**2,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        debug_sample_every: int = 1,
+    ):
+        """(Re)configures the pipeline; loggers created before the call pick up the new level.
+
+        Args:
+            level (str | int): Minimum level of the service's loggers, e.g. "INFO" or "DEBUG".
+            file_path (str): Log file, rotated when it reaches max_bytes. None logs to the console only.
+            max_bytes (int): Size at which the log file is rotated.
+            backup_count (int): Number of rotated files kept.
+            queue_size (int): Records held for the listener before new records are dropped.
+            debug_sample_every (int): Keep one in this many DEBUG records of each call site.
+        """
+        with cls._lock:
+            if cls._listener is not None:
+                # Stopping the listener writes out everything queued so far
+                cls._listener.stop()
+                if cls._file_handler is not None:
+                    cls._file_handler.close()
+            cls._level = logging.getLevelName(level) if isinstance(level, str) else level
+
+            log_queue = queue.Queue(maxsize=queue_size)
+            if cls._queue_handler is None:
+                cls._queue_handler = cls.NonBlockingQueueHandler(log_queue)
+                cls._queue_handler.addFilter(cls.CorrelationIdFilter())  # Must run on the logging thread
+                cls._sampling_filter = cls.DebugSamplingFilter(debug_sample_every)
+                cls._queue_handler.addFilter(cls._sampling_filter)
+            else:
+                cls._queue_handler.queue = log_queue
+                cls._sampling_filter.every = max(1, int(debug_sample_every))
+
+            handlers = [cls.get_stream_handler()]
+            cls._file_handler = cls.get_file_handler(file_path, max_bytes, backup_count) if file_path else None
+            if cls._file_handler is not None:
+                handlers.append(cls._file_handler)
+            cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            cls._listener.start()
+            for logger in cls._loggers:
+                logger.setLevel(cls._level)
+
+    @classmethod
+    def shutdown(cls):
+        """Writes out the queued records and stops the listener thread."""
+        with cls._lock:
+            if cls._listener is not None:
+                cls._listener.stop()
+                cls._listener = None
+                if cls._file_handler is not None:
+                    cls._file_handler.close()
+
+    @classmethod
+    def get_logger(cls, name) -> logging.Logger:
         logger = logging.getLogger(name)
 
-        # Check if logger already has handlers to avoid duplicate logging
-        if not logger.handlers:
-            logger.setLevel(logging.DEBUG)  # Set to DEBUG to capture all messages
-            logger.addHandler(Logger.get_file_handler())
-            logger.addHandler(Logger.get_stream_handler())
+        with cls._lock:
+            if cls._listener is None:
+                # Until the process configures logging, e.g. in a worker process or a tool importing
+                # the service's modules, records go to the console rather than a file in the working directory
+                cls.configure(cls._level, file_path=None)
+            # Check if logger already has handlers to avoid duplicate logging
+            if cls._queue_handler not in logger.handlers:
+                logger.setLevel(cls._level)
+                logger.addHandler(cls._queue_handler)
+                logger.propagate = False
+                cls._loggers.append(logger)
 
         return logger
 
-    @staticmethod
-    def set_log_level(level: str):
-        """Sets the log level for the logger.
+    @classmethod
+    def set_log_level(cls, level: str):
+        """Sets the log level of every logger of the service.
 
         Args:
             level (str): The desired log level (e.g., "INFO", "DEBUG").
         """
-        logging.getLogger().setLevel(level)
+        with cls._lock:
+            cls._level = logging.getLevelName(level)
+            for logger in cls._loggers:
+                logger.setLevel(cls._level)
+
+    @classmethod
+    def stats(cls) -> dict:
+        handler = cls._queue_handler
+        return {
+            "queued": handler.queue.qsize() if handler is not None else 0,
+            "dropped": handler.dropped if handler is not None else 0,
+        }
 
     def error(self, msg, *args, **kwargs):
         if sys.exc_info()[1]:  # Check if there's an exception currently being handled
@@ -87,3 +233,6 @@ class Logger:
             super().error(detailed_msg, *args, **kwargs)
         else:
             super().error(msg, *args, **kwargs)
+
+
+atexit.register(Logger.shutdown)
@@ -0,0 +1,103 @@
+# This module is copied verbatim into AIProcessingService/ and Scoring/, which are deployed
+# separately; change both copies together (tests/test_shared_copies.py checks they match).
+import re
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Tuple
+
+# Syllable payloads mark the end of a lyric line with a literal "\n"
+LINE_BREAK = "\\n"
+
+
+class LyricTimeline:
+    """Time-ordered lyric entries with O(log n) range queries.
+
+    Start times are kept in a sorted float array next to an object array of texts, so a chunk's
+    lyrics are found with two `searchsorted` calls and returned as a slice. The display text of a
+    range (see `transform`) is cached per (first, last) index pair, since every listener of a song
+    asks for the same windows.
+    """
+
+    LRC_PATTERN = re.compile(r"\[(\d{2}:\d{2}\.\d{2})\](.*)")
+
+    def __init__(self, times, texts, transform_cache_size: int = 256):
+        times = np.asarray(times, dtype=float)
+        texts = np.asarray(texts, dtype=object)
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.texts = texts[order]
+        self._transform_range = lru_cache(maxsize=transform_cache_size)(self._transform_range_uncached)
+
+    @classmethod
+    def from_csv(cls, source, payload_type: int = 1) -> "LyricTimeline":
+        """Builds a timeline from a lyrics CSV with start_time, payload_type and payload columns.
+
+        Args:
+            source: Path or file-like object accepted by `pandas.read_csv`.
+            payload_type (int): Only rows of this payload type are lyric syllables.
+        """
+        csv_data = pd.read_csv(source)
+        csv_data = csv_data[csv_data["payload_type"] == payload_type]
+        return cls(
+            csv_data["start_time"].to_numpy(dtype=float),
+            csv_data["payload"].astype(str).str.strip().to_numpy(dtype=object),
+        )
+
+    @classmethod
+    def from_lrc(cls, lrc_content: str) -> "LyricTimeline":
+        """Builds a timeline from LRC content, one entry per non-empty timestamped line."""
+        matches = [(stamp, text.strip()) for stamp, text in cls.LRC_PATTERN.findall(lrc_content) if text.strip()]
+        if not matches:
+            return cls.empty()
+        stamps, texts = zip(*matches)
+        minutes, seconds = np.char.partition(np.array(stamps), ":")[:, [0, 2]].T
+        return cls(minutes.astype(int) * 60 + seconds.astype(float), texts)
+
+    @classmethod
+    def empty(cls) -> "LyricTimeline":
+        return cls(np.empty(0), np.empty(0, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def range(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """Returns the index range [first, last) of entries with start_time <= time <= end_time."""
+        first = int(np.searchsorted(self.times, start_time, side="left"))
+        last = int(np.searchsorted(self.times, end_time, side="right"))
+        return first, max(first, last)
+
+    def texts_between(self, start_time: float, end_time: float) -> np.ndarray:
+        """Returns a view of the texts starting within [start_time, end_time]."""
+        first, last = self.range(start_time, end_time)
+        return self.texts[first:last]
+
+    def transform_between(self, start_time: float, end_time: float) -> str:
+        """Returns the display text (see `transform`) of the entries within [start_time, end_time]."""
+        return self._transform_range(*self.range(start_time, end_time))
+
+    def line_start_times(self) -> np.ndarray:
+        """Returns the start time of every lyric line, i.e. of entries that follow a line break."""
+        if not len(self):
+            return self.times
+        follows_break = np.fromiter((LINE_BREAK in text for text in self.texts[:-1]), dtype=bool, count=len(self) - 1)
+        return self.times[np.concatenate(([True], follows_break))]
+
+    def _transform_range_uncached(self, first: int, last: int) -> str:
+        return self.transform(self.texts[first:last])
+
+    @staticmethod
+    def transform(syllables) -> str:
+        """Joins syllables into words separated by spaces, and lines at the line-break markers."""
+        transformed_lyrics = ""
+        word = ""
+        for syllable in syllables:
+            if LINE_BREAK in syllable:
+                parts = syllable.split(LINE_BREAK)
+                word += parts[0]
+                transformed_lyrics += word.strip() + "\n"
+                word = parts[1] + " "
+            else:
+                word += syllable + " "
+        transformed_lyrics += word.strip()
+        return transformed_lyrics
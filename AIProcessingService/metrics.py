@@ -0,0 +1,327 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from logger import Logger
+
+# Latency buckets in seconds, from sub-millisecond steps up to model loads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+NAMESPACE = "aiprocessing"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """A metric family: one child per combination of label values."""
+
+    TYPE = None
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # Children by the label values passed in, and by their string form for exposition
+        self._children = {}
+        self._series = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self.labels()
+
+    def labels(self, *values):
+        """Returns the child for the given label values, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._series.setdefault(tuple(str(value) for value in values), self._new_child())
+                self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self):
+        """Yields the exposition lines of every child."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.TYPE}"
+        with self._lock:
+            series = list(self._series.items())
+        for values, child in series:
+            yield from child.samples(self.name, dict(zip(self.labelnames, values)))
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name: str, labels: dict):
+        yield f"{name}{_format_labels(labels)} {_format_value(self.value)}"
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabelled.inc(amount)
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._unlabelled.dec(amount)
+
+    def set(self, value: float):
+        self._unlabelled.set(value)
+
+    @contextmanager
+    def track_in_progress(self):
+        """Counts the block as in progress while it runs."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observes the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name: str, labels: dict):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+        yield f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+        yield f"{name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Histogram(_Metric):
+    """Cumulative histogram; observing is a bisect and two additions under a lock."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabelled.observe(value)
+
+    def time(self):
+        return self._unlabelled.time()
+
+
+class MetricsRegistry:
+    """
+    In-process registry of the service's metrics, rendered in the Prometheus text format.
+
+    Instruments are updated on the hot path. Components that already keep their own statistics
+    register their `stats()` method instead, which is only called when the metrics are scraped.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, namespace: str = NAMESPACE):
+        self.log = Logger.get_logger(__name__)
+        self.namespace = namespace
+        self._metrics = {}
+        self._stats_sources = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "MetricsRegistry":
+        """Returns the registry shared by the process."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _get_or_create(self, metric_class, name: str, help: str, labelnames=(), **kwargs):
+        full_name = f"{self.namespace}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = metric_class(full_name, help, labelnames, **kwargs)
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {full_name} is already registered with a different type or labels.")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_stats(self, name: str, stats, counters=()):
+        """Exports the numeric values of a component's stats() dictionary, read at scrape time.
+
+        Top-level numbers become `<namespace>_<name>_<key>`. Dictionaries of numbers become one
+        labelled series per entry, and dictionaries of dictionaries (e.g. per-engine stats) one
+        series per field, labelled by entry name.
+
+        Args:
+            name (str): Prefix of the exported series, e.g. "reference_feature_cache".
+            stats (Callable[[], dict]): The component's stats method.
+            counters (Iterable[str]): Keys that only ever increase, exported as counters.
+        """
+        with self._lock:
+            self._stats_sources[name] = (stats, frozenset(counters))
+
+    def _collect_stats(self, name: str, stats, counters):
+        try:
+            values = stats()
+        except Exception as e:
+            self.log.warning("Could not collect %s stats: %s", name, e)
+            return
+        series = {}
+        for key, value in values.items():
+            if isinstance(value, dict):
+                for entry, entry_value in value.items():
+                    if isinstance(entry_value, dict):
+                        for field, field_value in entry_value.items():
+                            series.setdefault(f"{key}_{field}", []).append(({"name": entry}, field_value))
+                    else:
+                        series.setdefault(key, []).append(({"key": entry}, entry_value))
+            else:
+                series.setdefault(key, []).append(({}, value))
+
+        for key, samples in series.items():
+            samples = [(labels, value) for labels, value in samples if isinstance(value, (int, float))]
+            if not samples:
+                continue
+            metric_name = f"{self.namespace}_{name}_{key}"
+            yield f"# TYPE {metric_name} {'counter' if key in counters else 'gauge'}"
+            for labels, value in samples:
+                yield f"{metric_name}{_format_labels(labels)} {_format_value(value)}"
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            sources = list(self._stats_sources.items())
+        lines = [line for metric in metrics for line in metric.collect()]
+        for name, (stats, counters) in sources:
+            lines.extend(self._collect_stats(name, stats, counters))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves the registry on /metrics from a side port, on a daemon thread."""
+
+    def __init__(self, port: int, registry: MetricsRegistry = None, host: str = ""):
+        self.log = Logger.get_logger(__name__)
+        registry = registry or MetricsRegistry.shared()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.http_server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.http_server.serve_forever, name="metrics-server", daemon=True).start()
+        self.log.info("Serving Prometheus metrics on port %s.", self.port)
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+
+_registry = MetricsRegistry.shared()
+
+# Instruments of the request path, shared by every session
+STAGE_SECONDS = _registry.histogram(
+    "stage_seconds", "Seconds spent in each stage of processing an audio chunk.", ("stage",)
+)
+RPC_SECONDS = _registry.histogram(
+    "private_interface_rpc_seconds", "Latency of calls to the AIPrivateInterfaceService.", ("method", "outcome")
+)
+CHUNKS_IN_FLIGHT = _registry.gauge(
+    "chunks_in_flight", "Audio chunks received but not yet answered, including those waiting for a worker."
+)
+CHUNKS_TOTAL = _registry.counter("chunks_total", "Audio chunks answered, by outcome.", ("outcome",))
+MODEL_LOAD_SECONDS = _registry.histogram(
+    "model_load_seconds", "Time taken to load each transcription engine.", ("engine",)
+)
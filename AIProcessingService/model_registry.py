@@ -0,0 +1,282 @@
+import gc
+import time
+import threading
+from contextlib import contextmanager
+from logger import Logger
+from metrics import MetricsRegistry, MODEL_LOAD_SECONDS
+
+
+class ModelEntry:
+    """A registered engine: how to build it and, once built, the loaded instance and its accounting."""
+
+    def __init__(self, name: str, loader):
+        self.name = name
+        self.loader = loader
+        self.engine = None
+        self.loading = None
+        self.in_use = 0
+        self.last_used = 0.0
+        self.load_seconds = 0.0
+        self.resident_bytes = 0
+        self.loads = 0
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of speech-to-text engines.
+
+    Engines are registered by name with a loader and only built on first use, so a deployment
+    never pays startup time or memory for engines it does not call. Every session shares the
+    loaded instance. Engines that have been idle for longer than `idle_timeout`, or the least
+    recently used ones once the resident size exceeds `max_bytes`, are unloaded again; engines
+    currently in use through `use()` are never unloaded.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_bytes: int, idle_timeout: float, reap_interval: float = 60.0):
+        """
+        Args:
+            max_bytes (int): Budget for the combined resident size of loaded engines.
+            idle_timeout (float): Seconds after which an unused engine is unloaded.
+            reap_interval (float): Seconds between idle checks of the reaper thread.
+        """
+        self.log = Logger.get_logger(__name__)
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._reaper = None
+
+    @classmethod
+    def shared(cls) -> "ModelRegistry":
+        """Returns the registry shared by the process, with the default engines registered from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                config = Config()
+                registry = cls(config.MODEL_REGISTRY_MAX_BYTES, config.MODEL_IDLE_TIMEOUT_SECONDS)
+                registry.register(
+                    "whisper",
+                    lambda: cls._load_whisper(
+                        config.WHISPER_MODEL_SIZE, config.WHISPER_VAD, config.WHISPER_VAD_TOP_DB, config.WHISPER_BATCH_SIZE
+                    ),
+                )
+                registry.register(
+                    "wav2vec2",
+                    lambda: cls._load_wav2vec2(config.WAV2VEC2_MODEL_NAME, config.WAV2VEC2_BACKEND, config.WAV2VEC2_ONNX_DIR),
+                )
+                registry.register("google_speech", lambda: cls._load_google_speech(config.GOOGLE_SPEECH_CREDENTIALS_FILE))
+                registry.start_reaper()
+                cls._shared = registry
+                MetricsRegistry.shared().register_stats(
+                    "model_registry", cls._shared.stats, counters=("engines_loads",)
+                )
+            return cls._shared
+
+    def start_reaper(self):
+        """Starts a daemon thread that periodically unloads idle engines."""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def stop_reaper(self):
+        """Stops the idle-engine reaper thread."""
+        self._stop_event.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    def _reap_loop(self):
+        while not self._stop_event.wait(self.reap_interval):
+            self.evict_idle()
+
+    # Engine modules are imported inside the loaders so that their heavy dependencies
+    # (torch, transformers, whisper) are only imported when the engine is first used
+    @staticmethod
+    def _load_whisper(model_size: str, vad: bool, vad_top_db: float, batch_size: int):
+        from whisper_transcription import WhisperTranscription
+
+        return WhisperTranscription(model_size=model_size, vad=vad, vad_top_db=vad_top_db, batch_size=batch_size)
+
+    @staticmethod
+    def _load_wav2vec2(model_name: str, backend: str, onnx_dir: str):
+        from wav2vec2_transcription import Wav2VecTranscription
+
+        return Wav2VecTranscription(model_name=model_name, backend=backend, onnx_dir=onnx_dir)
+
+    @staticmethod
+    def _load_google_speech(credentials_file: str):
+        from google_speech_transcription import GoogleSpeechTranscription
+
+        return GoogleSpeechTranscription(client_file=credentials_file)
+
+    def register(self, name: str, loader):
+        """Registers an engine under a name.
+
+        Args:
+            name (str): The name the engine is requested by.
+            loader (Callable[[], object]): Builds the engine. Engines may define `resident_bytes()`
+                to report their memory footprint and `close()` to release resources when unloaded.
+        """
+        with self._lock:
+            self._entries[name] = ModelEntry(name, loader)
+
+    def names(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, name: str):
+        """Returns the shared instance of an engine, loading it on first use.
+
+        Prefer `use()` for long calls, so the engine cannot be unloaded while it runs.
+
+        Raises:
+            ValueError: If no engine is registered under the name.
+        """
+        with self.use(name) as engine:
+            return engine
+
+    @contextmanager
+    def use(self, name: str):
+        """Context manager that yields the engine and keeps it loaded until the block exits."""
+        entry = self._acquire(name)
+        try:
+            yield entry.engine
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+                # Engines pinned while the budget was exceeded can be unloaded now
+                unloaded = self._evict_locked(keep=name) if self._resident_bytes_locked() > self.max_bytes else []
+            self._close(unloaded)
+
+    def _resident_bytes_locked(self) -> int:
+        return sum(entry.resident_bytes for entry in self._entries.values() if entry.engine is not None)
+
+    def _acquire(self, name: str) -> ModelEntry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                raise ValueError(f"Unknown transcription engine: {name}")
+            entry.in_use += 1
+            while entry.engine is None and entry.loading is not None:
+                # Another thread is loading the same engine; wait for it rather than loading twice
+                loading = entry.loading
+                self._lock.release()
+                try:
+                    loading.wait()
+                finally:
+                    self._lock.acquire()
+            if entry.engine is not None:
+                entry.last_used = time.monotonic()
+                return entry
+            entry.loading = threading.Event()
+
+        try:
+            self._load(entry)
+        except BaseException:
+            with self._lock:
+                entry.in_use -= 1
+                entry.loading.set()
+                entry.loading = None
+            raise
+
+        with self._lock:
+            entry.loading.set()
+            entry.loading = None
+            entry.last_used = time.monotonic()
+            unloaded = self._evict_locked(keep=name)
+        self._close(unloaded)
+        return entry
+
+    def _load(self, entry: ModelEntry):
+        self.log.info("Loading transcription engine '%s'...", entry.name)
+        started = time.monotonic()
+        engine = entry.loader()
+        load_seconds = time.monotonic() - started
+        MODEL_LOAD_SECONDS.labels(entry.name).observe(load_seconds)
+        resident_bytes = engine.resident_bytes() if hasattr(engine, "resident_bytes") else 0
+        with self._lock:
+            entry.engine = engine
+            entry.load_seconds = load_seconds
+            entry.resident_bytes = resident_bytes
+            entry.loads += 1
+        self.log.info(
+            "Loaded transcription engine '%s' in %.2fs (%.1f MiB resident).",
+            entry.name,
+            load_seconds,
+            resident_bytes / 1024**2,
+        )
+
+    def evict_idle(self) -> int:
+        """Unloads every engine that has been idle for longer than the timeout. Returns the number unloaded."""
+        with self._lock:
+            now = time.monotonic()
+            idle = [
+                entry for entry in self._entries.values()
+                if entry.engine is not None and not entry.in_use and now - entry.last_used > self.idle_timeout
+            ]
+            unloaded = [self._unload_locked(entry) for entry in idle]
+        self._close(unloaded)
+        return len(unloaded)
+
+    def _evict_locked(self, keep: str) -> list:
+        """Unloads idle engines, then least recently used ones until the budget is met."""
+        now = time.monotonic()
+        loaded = sorted(
+            (entry for entry in self._entries.values() if entry.engine is not None and entry.name != keep),
+            key=lambda entry: entry.last_used,
+        )
+        total = self._resident_bytes_locked()
+        unloaded = []
+        for entry in loaded:
+            if entry.in_use:
+                continue
+            if total <= self.max_bytes and now - entry.last_used <= self.idle_timeout:
+                continue
+            total -= entry.resident_bytes
+            unloaded.append(self._unload_locked(entry))
+        if total > self.max_bytes:
+            self.log.warning(
+                "Loaded transcription engines use %.1f MiB, above the budget of %.1f MiB.",
+                total / 1024**2,
+                self.max_bytes / 1024**2,
+            )
+        return unloaded
+
+    def _unload_locked(self, entry: ModelEntry):
+        engine, entry.engine = entry.engine, None
+        self.log.info("Unloading transcription engine '%s'.", entry.name)
+        return engine
+
+    @staticmethod
+    def _close(engines: list):
+        for engine in engines:
+            if hasattr(engine, "close"):
+                engine.close()
+        if engines:
+            gc.collect()
+
+    def stats(self) -> dict:
+        """Returns, per engine, whether it is loaded, its load time and its resident size."""
+        with self._lock:
+            engines = {
+                entry.name: {
+                    "loaded": entry.engine is not None,
+                    "in_use": entry.in_use,
+                    "loads": entry.loads,
+                    "load_seconds": entry.load_seconds,
+                    "resident_bytes": entry.resident_bytes if entry.engine is not None else 0,
+                }
+                for entry in self._entries.values()
+            }
+        return {
+            "engines": engines,
+            "resident_bytes": sum(engine["resident_bytes"] for engine in engines.values()),
+            "max_bytes": self.max_bytes,
+        }
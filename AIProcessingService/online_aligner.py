@@ -0,0 +1,90 @@
+import numpy as np
+import librosa
+
+
+class OnlineAligner:
+    """
+    Incremental aligner that tracks where the singer currently is in the reference.
+
+    Each chunk is aligned with subsequence DTW against a bounded window of the reference MFCCs
+    around the current playhead, instead of against the whole song, so the per-chunk cost depends
+    on the chunk and band sizes only. The first chunk is searched across the whole reference.
+    When the best match touches the edge of the search window, the singer may have moved outside
+    it, so the band is widened for the next chunk until the match settles again.
+    """
+
+    def __init__(self, reference_mfccs: np.ndarray, band_frames: int, max_band_frames: int = None):
+        """
+        Args:
+            reference_mfccs (np.ndarray): MFCCs of the reference track, shape (n_mfcc, n_frames).
+            band_frames (int): Number of reference frames searched on each side of the expected position.
+            max_band_frames (int): Upper bound for the band when it widens after an uncertain match.
+        """
+        self.reference_mfccs = reference_mfccs
+        self.band_frames = band_frames
+        self.max_band_frames = max_band_frames or band_frames * 8
+        self.reset()
+
+    def reset(self):
+        """Forgets the playhead, so the next chunk is searched across the whole reference."""
+        self.playhead = None
+        self.current_band = self.band_frames
+        self.last_start_frame = 0
+
+    @property
+    def state(self) -> tuple:
+        """Everything align() depends on besides the reference, small enough to send to a worker process."""
+        return self.playhead, self.current_band, self.last_start_frame
+
+    def restore(self, state: tuple):
+        """Resumes from a state returned by `state`, e.g. after a chunk was aligned in a worker process."""
+        self.playhead, self.current_band, self.last_start_frame = state
+
+    @property
+    def n_reference_frames(self) -> int:
+        return self.reference_mfccs.shape[-1]
+
+    @property
+    def position(self) -> int:
+        """Reference frame at which the next chunk is expected to start."""
+        return self.playhead or 0
+
+    def _search_window(self, n_frames: int):
+        if self.playhead is None:
+            return 0, self.n_reference_frames
+        start = max(0, self.playhead - self.current_band)
+        end = min(self.n_reference_frames, self.playhead + n_frames + self.current_band)
+        # Near the end of the song keep the window at least as long as the chunk
+        start = max(0, min(start, end - n_frames))
+        return start, end
+
+    def align(self, user_mfccs: np.ndarray) -> int:
+        """Aligns the next chunk and advances the playhead.
+
+        Args:
+            user_mfccs (np.ndarray): MFCCs of the user's chunk, shape (n_mfcc, n_frames).
+
+        Returns:
+            int: The reference frame at which the chunk starts.
+        """
+        window_start, window_end = self._search_window(user_mfccs.shape[-1])
+        window = self.reference_mfccs[:, window_start:window_end]
+        _, path = librosa.sequence.dtw(user_mfccs, window, subseq=True)
+
+        # The warping path is returned end-first
+        match_start = int(path[-1][1])
+        match_end = int(path[0][1])
+
+        touches_edge = (match_start == 0 and window_start > 0) or (
+            match_end == window.shape[-1] - 1 and window_end < self.n_reference_frames
+        )
+        if touches_edge:
+            self.current_band = min(self.current_band * 2, self.max_band_frames)
+        else:
+            self.current_band = self.band_frames
+
+        # Singers move through the song in real time, so the next chunk is expected right after this
+        # one's duration rather than wherever the warping path happened to end
+        self.last_start_frame = window_start + match_start
+        self.playhead = min(self.last_start_frame + user_mfccs.shape[-1], self.n_reference_frames)
+        return self.last_start_frame
@@ -0,0 +1,111 @@
+import numpy as np
+import librosa
+from Declarations.Model.AIProcessingService import AIProcessingRequest_pb2
+
+Encoding = AIProcessingRequest_pb2.AIProcessingRequest.AudioFormat.Encoding
+
+
+class PCMFormat:
+    """Raw PCM layout negotiated by the client in the Initialize message."""
+
+    DTYPES = {
+        Encoding.ENCODING_PCM_S16LE: np.dtype("<i2"),
+        Encoding.ENCODING_PCM_F32LE: np.dtype("<f4"),
+    }
+    MAX_SAMPLE_RATE = 192000
+
+    def __init__(self, encoding: int, sample_rate: int, channels: int):
+        if encoding not in self.DTYPES:
+            raise ValueError(f"Unsupported PCM encoding: {encoding}")
+        if not 0 < sample_rate <= self.MAX_SAMPLE_RATE:
+            raise ValueError(f"Invalid PCM sample rate: {sample_rate}")
+        if channels < 1:
+            raise ValueError(f"Invalid PCM channel count: {channels}")
+        self.encoding = encoding
+        self.dtype = self.DTYPES[encoding]
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    @classmethod
+    def from_initialize(cls, initialize):
+        """Builds the format from an Initialize message.
+
+        Returns:
+            PCMFormat: The negotiated format, or None if the client sends encoded audio files.
+
+        Raises:
+            ValueError: If the client requested an invalid raw format.
+        """
+        if not initialize.HasField("audio_format"):
+            return None
+        audio_format = initialize.audio_format
+        if audio_format.encoding == Encoding.ENCODING_ENCODED_FILE:
+            return None
+        return cls(audio_format.encoding, audio_format.sample_rate, audio_format.channels or 1)
+
+    def to_samples(self, data: bytes, target_sr: int) -> np.ndarray:
+        """Interprets raw chunk bytes as mono float32 samples at the target sample rate.
+
+        The bytes are viewed in place with np.frombuffer; a copy is only made when converting
+        int16 to float, down-mixing channels or resampling.
+        """
+        frame_size = self.dtype.itemsize * self.channels
+        if len(data) % frame_size:
+            raise ValueError(f"Audio chunk of {len(data)} bytes is not a whole number of {frame_size}-byte frames.")
+
+        samples = np.frombuffer(data, dtype=self.dtype)
+        if self.dtype.kind == "i":
+            samples = samples.astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.sample_rate != target_sr:
+            samples = librosa.resample(samples, orig_sr=self.sample_rate, target_sr=target_sr)
+        return samples
+
+
+class PCMRingBuffer:
+    """
+    Preallocated ring buffer of mono float32 samples addressed by absolute sample index.
+
+    Appends copy into the preallocated storage, and reads that do not wrap around the end of the
+    storage return views, so steady-state ingest does not allocate.
+    """
+
+    def __init__(self, capacity: int):
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.total_written = 0
+
+    @property
+    def oldest_available(self) -> int:
+        """Absolute index of the oldest sample still held in the buffer."""
+        return max(0, self.total_written - self.capacity)
+
+    def append(self, samples: np.ndarray):
+        """Appends samples, overwriting the oldest ones once the buffer is full."""
+        if len(samples) >= self.capacity:
+            # Samples older than the last `capacity` count as written but are overwritten at once
+            self.total_written += len(samples) - self.capacity
+            samples = samples[-self.capacity :]
+        offset = self.total_written % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        self._buffer[offset : offset + first] = samples[:first]
+        self._buffer[: len(samples) - first] = samples[first:]
+        self.total_written += len(samples)
+
+    def read(self, start: int, length: int) -> np.ndarray:
+        """Returns the samples in [start, start + length) by absolute index.
+
+        Raises:
+            ValueError: If part of the range was overwritten or has not been written yet.
+        """
+        if start < self.oldest_available or start + length > self.total_written:
+            raise ValueError(
+                f"Samples [{start}, {start + length}) are not available; "
+                f"buffer holds [{self.oldest_available}, {self.total_written})."
+            )
+        offset = start % self.capacity
+        if offset + length <= self.capacity:
+            return self._buffer[offset : offset + length]
+        first = self.capacity - offset
+        return np.concatenate((self._buffer[offset:], self._buffer[: length - first]))
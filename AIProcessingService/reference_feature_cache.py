@@ -0,0 +1,220 @@
+import threading
+import numpy as np
+import librosa
+from collections import OrderedDict
+from logger import Logger
+from metrics import MetricsRegistry
+from audio_utils import AudioUtils
+
+
+class FeatureParams:
+    """Analysis parameters shared by the reference features and the per-chunk user features."""
+
+    def __init__(self, sr: int = 22050, n_fft: int = 2048, hop_length: int = 512, n_mfcc: int = 20):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mfcc = n_mfcc
+
+    def as_dict(self) -> dict:
+        return {"sr": self.sr, "n_fft": self.n_fft, "hop_length": self.hop_length, "n_mfcc": self.n_mfcc}
+
+    def key(self) -> tuple:
+        return (self.sr, self.n_fft, self.hop_length, self.n_mfcc)
+
+    def __eq__(self, other):
+        return isinstance(other, FeatureParams) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+
+class ReferenceFeatures:
+    """Features of an original track, computed once and shared read-only by every session singing it."""
+
+    # No pitch contour: no scorer of the service reads one, and a full-song pyin would be the slowest step
+    # of computing a reference. Add it back here once a scorer needs it
+    FEATURE_NAMES = ("audio", "stft_magnitude", "mfcc", "onset_envelope", "rms")
+
+    def __init__(self, track_hash: str, params: FeatureParams, **features):
+        self.track_hash = track_hash
+        self.params = params
+        self.sr = params.sr
+        self.audio = features["audio"]
+        self.stft_magnitude = features["stft_magnitude"]
+        self.mfcc = features["mfcc"]
+        self.onset_envelope = features["onset_envelope"]
+        self.rms = features["rms"]
+
+    @classmethod
+    def compute(cls, track_hash: str, audio: np.ndarray, params: FeatureParams) -> "ReferenceFeatures":
+        """Computes every reference feature from the decoded track."""
+        stft_magnitude, mfcc = AudioUtils.spectral_features(audio, params)
+        onset_envelope = librosa.onset.onset_strength(y=audio, sr=params.sr, hop_length=params.hop_length)
+        rms = librosa.feature.rms(S=stft_magnitude, frame_length=params.n_fft, hop_length=params.hop_length)[0]
+        return cls(
+            track_hash,
+            params,
+            audio=audio,
+            stft_magnitude=stft_magnitude,
+            mfcc=mfcc,
+            onset_envelope=onset_envelope.astype(np.float32),
+            rms=rms.astype(np.float32),
+        )
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FEATURE_NAMES}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(feature.nbytes for feature in self.as_dict().values())
+
+    @property
+    def n_frames(self) -> int:
+        return self.mfcc.shape[-1]
+
+    def audio_segment(self, start_frame: int, n_samples: int) -> np.ndarray:
+        """Returns the reference samples starting at the given analysis frame."""
+        start = start_frame * self.params.hop_length
+        return self.audio[start : start + n_samples]
+
+    def frame_window(self, feature: np.ndarray, start_frame: int, n_frames: int) -> np.ndarray:
+        """Returns the columns of a frame-indexed feature starting at the given analysis frame."""
+        return feature[..., start_frame : start_frame + n_frames]
+
+
+class ReferenceFeatureCache:
+    """
+    Process-wide LRU cache of reference features keyed by track content hash and feature
+    parameters, bounded by a byte budget.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_bytes: int, params: FeatureParams = None, feature_store=None):
+        self.log = Logger.get_logger(__name__)
+        self.max_bytes = max_bytes
+        self.params = params or FeatureParams()
+        self.feature_store = feature_store
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls) -> "ReferenceFeatureCache":
+        """Returns the cache shared by every session in this process, configured from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                from feature_store import FeatureStore
+
+                config = Config()
+                params = FeatureParams(
+                    sr=config.REFERENCE_FEATURE_SR,
+                    n_fft=config.REFERENCE_FEATURE_N_FFT,
+                    hop_length=config.REFERENCE_FEATURE_HOP_LENGTH,
+                    n_mfcc=config.REFERENCE_FEATURE_N_MFCC,
+                )
+                feature_store = None
+                if config.FEATURE_STORE_DIR:
+                    feature_store = FeatureStore(config.FEATURE_STORE_DIR, params)
+                    if config.FEATURE_STORE_PURGE_STALE:
+                        feature_store.purge_stale()
+                cls._shared = cls(
+                    max_bytes=config.REFERENCE_FEATURE_CACHE_MAX_BYTES, params=params, feature_store=feature_store
+                )
+                MetricsRegistry.shared().register_stats(
+                    "reference_feature_cache", cls._shared.stats, counters=("hits", "misses", "evictions")
+                )
+            return cls._shared
+
+    def get_or_compute(self, track_hash: str, audio_source) -> ReferenceFeatures:
+        """Returns the features of a track, computing them at most once per process.
+
+        Concurrent callers asking for the same track wait for the first computation
+        instead of repeating it.
+
+        Args:
+            track_hash (str): Content hash of the encoded track.
+            audio_source: Path or file-like object with the encoded track, decoded only when the
+                features are neither cached nor in the feature store.
+
+        Returns:
+            ReferenceFeatures: The cached or freshly computed features.
+        """
+        key = (track_hash, self.params.key())
+        while True:
+            with self._lock:
+                features = self._entries.get(key)
+                if features is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return features
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._in_flight[key] = threading.Event()
+                    break
+            # Another session is computing this track; wait and look it up again.
+            pending.wait()
+
+        try:
+            features = self._compute(track_hash, audio_source)
+            self._store(key, features)
+            return features
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set()
+
+    def _compute(self, track_hash: str, audio_source) -> ReferenceFeatures:
+        if self.feature_store is not None:
+            stored = self.feature_store.load(track_hash, ReferenceFeatures.FEATURE_NAMES)
+            if stored is not None:
+                self.log.info("Loaded reference features for track %s from the feature store.", track_hash[:12])
+                return ReferenceFeatures(track_hash, self.params, **stored)
+
+        self.log.info("Computing reference features for track %s.", track_hash[:12])
+        audio, _ = librosa.load(audio_source, sr=self.params.sr, mono=True)
+        features = ReferenceFeatures.compute(track_hash, audio, self.params)
+        if self.feature_store is not None:
+            self.feature_store.save(track_hash, features.as_dict())
+        return features
+
+    def _store(self, key, features: ReferenceFeatures):
+        size = features.nbytes
+        with self._lock:
+            if size > self.max_bytes:
+                self.log.warning(
+                    "Reference features of %s bytes exceed the cache budget of %s bytes; not cached.",
+                    size,
+                    self.max_bytes,
+                )
+                return
+            self._entries[key] = features
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.nbytes
+                self.evictions += 1
+                self.log.info("Evicted reference features for track %s.", evicted.track_hash[:12])
+
+    def stats(self) -> dict:
+        """Returns cache occupancy and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -19,7 +19,7 @@ class ReportGenerator:
         Returns:
             AIProcessingResponse: The constructed response containing the generated report.
         """
-        self.log.info(f"Handling Finalize request with reason: {request.finalize.finalize_reason}")
+        self.log.info("Handling Finalize request with reason: %s", request.finalize.finalize_reason)
         report = self._create_report_feedback(3.9, "AI comment", 20, 20, 2.9)
         self.private_interface_client.report_processing_result(report, client_token)
         return AIProcessingResponse_pb2.AIProcessingResponse(report=report)
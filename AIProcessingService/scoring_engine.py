@@ -0,0 +1,207 @@
+import time
+import threading
+import multiprocessing
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent import futures
+from multiprocessing import shared_memory
+from logger import Logger
+from audio_utils import AudioUtils
+from audio_scorer import AudioScorer
+from online_aligner import OnlineAligner
+from reference_feature_cache import FeatureParams, ReferenceFeatures
+
+
+class SharedReference:
+    """Reference features of one track copied once into a shared-memory block readable by every worker."""
+
+    ALIGNMENT = 64
+
+    def __init__(self, features: ReferenceFeatures):
+        arrays = features.as_dict()
+        layout = {}
+        size = 0
+        for name, array in arrays.items():
+            layout[name] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            offset, shape, dtype = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = array
+
+        self.references = 0
+        # Small, picklable description sent with every job instead of the arrays themselves
+        self.handle = {
+            "name": self.shm.name,
+            "layout": layout,
+            "track_hash": features.track_hash,
+            "params": features.params.as_dict(),
+        }
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Worker-side attachments to published references, keyed by shared-memory block name
+_attached = OrderedDict()
+_MAX_ATTACHED = 4
+
+
+def _detach(name: str):
+    """Drops this worker's mapping of a block, so an unlinked block's memory can be returned to the OS."""
+    shm, scorer = _attached.pop(name)
+    # The scorer's arrays are views of the mapping, which cannot be closed while they are alive
+    del scorer
+    try:
+        shm.close()
+    except BufferError:
+        # A view outlived the scorer; the mapping is closed when it is garbage collected
+        pass
+
+
+def _attach(handle: dict, released: tuple = ()) -> AudioScorer:
+    """Returns a scorer over the shared reference, attaching to its block on first use in this worker.
+
+    Blocks the parent has released since are detached first, so their memory is not pinned by the
+    worker until they age out of the LRU.
+    """
+    for name in released:
+        if name in _attached:
+            _detach(name)
+    entry = _attached.get(handle["name"])
+    if entry is None:
+        shm = shared_memory.SharedMemory(name=handle["name"])
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, (offset, shape, dtype) in handle["layout"].items()
+        }
+        features = ReferenceFeatures(handle["track_hash"], FeatureParams(**handle["params"]), **arrays)
+        entry = _attached[handle["name"]] = (shm, AudioScorer(features))
+        del arrays, features
+        while len(_attached) > _MAX_ATTACHED:
+            _detach(next(iter(_attached)))
+    _attached.move_to_end(handle["name"])
+    return entry[1]
+
+
+def _process_job(handle, released, user_audio, aligner_state, band_frames, max_band_frames):
+    """Extracts the features of a raw chunk, aligns it from the session's aligner state and scores it.
+
+    Returns:
+        tuple: The start frame, the aligner state to resume from, and the scores. Their 'timings'
+            hold the seconds of each stage, named as AudioProcessor names its stages.
+    """
+    scorer = _attach(handle, released)
+    reference = scorer.reference_features
+    started = time.perf_counter()
+    user_spectrogram, user_mfccs = AudioUtils.spectral_features(user_audio, reference.params)
+    features_done = time.perf_counter()
+    aligner = OnlineAligner(reference.mfcc, band_frames, max_band_frames)
+    aligner.restore(aligner_state)
+    start_frame = aligner.align(user_mfccs)
+    align_done = time.perf_counter()
+
+    scores = scorer.score_chunk(user_audio, user_spectrogram, user_mfccs, start_frame)
+    scores["timings"] = {
+        "features": features_done - started,
+        "align": align_done - features_done,
+        **{f"score_{name}": seconds for name, seconds in scores["timings"].items()},
+    }
+    return start_frame, aligner.state, scores
+
+
+class ScoringEngine:
+    """
+    Runs the CPU-bound work of each chunk on a pool of worker processes, so that it is not bound to
+    one core by the GIL: feature extraction, alignment and scoring.
+
+    The reference features of each track in use are published once into shared memory and only a
+    small handle is pickled per job, along with the raw chunk and the session's aligner state, which
+    are smaller than the chunk's spectrogram. Sessions acquire the track when they start and release
+    it when they end; the block is unlinked once no session uses it. Jobs carry the names of the
+    blocks released recently, so workers drop their mappings of them on their next job.
+    """
+
+    # Released block names sent with every job; a worker idle for longer than this many releases
+    # still drops its stale mappings through its LRU
+    RELEASED_HISTORY = 64
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_workers: int):
+        self.log = Logger.get_logger(__name__)
+        # Workers are spawned rather than forked, since forking a process running gRPC threads is unsafe
+        self.executor = futures.ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._published = {}
+        self._released = deque(maxlen=self.RELEASED_HISTORY)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Returns the engine shared by every session in this process, or None if scoring runs in-process."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                max_workers = Config().SCORING_ENGINE_WORKERS
+                if max_workers <= 0:
+                    return None
+                cls._shared = cls(max_workers)
+            return cls._shared
+
+    @classmethod
+    def shutdown_shared(cls):
+        """Stops the shared engine's workers, if one was started."""
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.shutdown()
+                cls._shared = None
+
+    def acquire(self, features: ReferenceFeatures):
+        """Publishes the features of a track to shared memory, if not already published."""
+        with self._lock:
+            published = self._published.get(features.track_hash)
+            if published is None:
+                published = self._published[features.track_hash] = SharedReference(features)
+                self.log.info("Published reference of track %s to shared memory.", features.track_hash[:12])
+            published.references += 1
+
+    def release(self, features: ReferenceFeatures):
+        """Drops a session's use of a track, unlinking its shared memory once unused."""
+        with self._lock:
+            published = self._published.get(features.track_hash)
+            if published is None:
+                return
+            published.references -= 1
+            if published.references <= 0:
+                del self._published[features.track_hash]
+                published.close()
+                self._released.append(published.shm.name)
+                self.log.info("Unpublished reference of track %s.", features.track_hash[:12])
+
+    def submit(self, features, user_audio, aligner: OnlineAligner) -> futures.Future:
+        """Schedules the processing of a raw chunk on the worker pool.
+
+        The aligner is not advanced here; restore it from the returned state once the job is done.
+
+        Returns:
+            Future: Resolves to the (start_frame, aligner_state, scores) tuple returned by the job.
+        """
+        with self._lock:
+            handle = self._published[features.track_hash].handle
+            released = tuple(self._released)
+        return self.executor.submit(
+            _process_job, handle, released, user_audio, aligner.state, aligner.band_frames, aligner.max_band_frames
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for published in self._published.values():
+                published.close()
+            self._published.clear()
@@ -1,8 +1,12 @@
 import grpc
+import asyncio
 from config import Config
 from logger import Logger
 from concurrent import futures
-from ai_processing_service import AIProcessingService
+from scoring_engine import ScoringEngine
+from metrics import MetricsRegistry, MetricsServer
+from tracing import Tracer
+from ai_processing_service import AIProcessingService, AsyncAIProcessingService
 from Declarations.Service import AIProcessingService_pb2_grpc
 
 
@@ -46,25 +50,115 @@ class Server:
                 )
                 return
             self.server.start()
-            self.log.info(f"AIProcessingService server started and listening on port {self.config.GRPC_SERVER_PORT}.")
+            self.log.info("AIProcessingService server started and listening on port %s.", self.config.GRPC_SERVER_PORT)
             self._await_termination()
         except grpc.RpcError as rpc_err:
-            self.log.error(f"gRPC error occurred: {rpc_err}")
+            self.log.error("gRPC error occurred: %s", rpc_err)
         except ValueError as val_err:
-            self.log.error(f"Value error occurred: {val_err}")
+            self.log.error("Value error occurred: %s", val_err)
         except Exception as e:
-            self.log.error(f"An unexpected error occurred while starting the AIProcessingService server: {e}")
+            self.log.error("An unexpected error occurred while starting the AIProcessingService server: %s", e)
 
     def _await_termination(self):
         try:
             self.server.wait_for_termination()
         except KeyboardInterrupt:
             self.log.info("Attempting graceful shutdown...")
-            self.server.stop(10)  # 10 seconds grace period for shutdown
+            self.server.stop(10).wait()  # 10 seconds grace period for shutdown
+            ScoringEngine.shutdown_shared()
+            Tracer.shutdown_shared()
+            self.log.info("AIProcessingService server stopped.")
+
+
+class AsyncServer:
+    """grpc.aio server whose streams wait for chunks on the event loop instead of pinning worker threads."""
+
+    def __init__(self, config):
+        self.config = config
+        self.log = Logger.get_logger(__name__)
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=self.config.SCORING_EXECUTOR_WORKERS, thread_name_prefix="scoring"
+        )
+        self.server = None
+
+    def _initialize_service(self):
+        # The aio server binds to the running event loop, so it is created inside start()
+        self.server = grpc.aio.server(
+            options=[("grpc.max_send_message_length", self.config.GRPC_MAX_SEND_MESSAGE_LENGTH)],
+        )
+        AIProcessingService_pb2_grpc.add_AIProcessingServiceServicer_to_server(
+            AsyncAIProcessingService(
+                server_address=self.config.AI_PRIVATE_INTERFACE_SERVER_ADDRESS,
+                cert_file=self.config.AI_PRIVATE_INTERFACE_CERT_FILE,
+                executor=self.executor,
+                max_pending=self.config.SCORING_MAX_PENDING,
+            ),
+            self.server,
+        )
+
+    def _set_server_credentials(self):
+        with open(self.config.GRPC_SERVER_CERT_FILE, "rb") as f:
+            server_cert = f.read()
+        with open(self.config.GRPC_SERVER_KEY_FILE, "rb") as f:
+            server_key = f.read()
+
+        server_credentials = grpc.ssl_server_credentials([(server_key, server_cert)])
+        self.server.add_secure_port(f"[::]:{self.config.GRPC_SERVER_PORT}", server_credentials)
+
+    async def start(self):
+        try:
+            self._initialize_service()
+            if self.config.GRPC_SERVER_CERT_FILE and self.config.GRPC_SERVER_KEY_FILE:
+                self._set_server_credentials()
+            else:
+                self.log.error(
+                    "Starting server in insecure mode is not allowed. Please provide the necessary certificates."
+                )
+                return
+            await self.server.start()
+            self.log.info(
+                "AIProcessingService asyncio server started and listening on port %s with %s scoring workers.",
+                self.config.GRPC_SERVER_PORT,
+                self.config.SCORING_EXECUTOR_WORKERS,
+            )
+            await self._await_termination()
+        except grpc.RpcError as rpc_err:
+            self.log.error("gRPC error occurred: %s", rpc_err)
+        except ValueError as val_err:
+            self.log.error("Value error occurred: %s", val_err)
+        except Exception as e:
+            self.log.error("An unexpected error occurred while starting the AIProcessingService server: %s", e)
+
+    async def _await_termination(self):
+        try:
+            await self.server.wait_for_termination()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            self.log.info("Attempting graceful shutdown...")
+            await self.server.stop(10)  # 10 seconds grace period for shutdown
+            self.executor.shutdown(wait=True)
+            ScoringEngine.shutdown_shared()
+            Tracer.shutdown_shared()
             self.log.info("AIProcessingService server stopped.")
 
 
 if __name__ == "__main__":
     config = Config()
-    server = Server(config=config)
-    server.start()
+    Logger.configure(
+        level=config.LOG_LEVEL,
+        file_path=config.LOG_FILE,
+        max_bytes=config.LOG_FILE_MAX_BYTES,
+        backup_count=config.LOG_FILE_BACKUP_COUNT,
+        queue_size=config.LOG_QUEUE_MAX_SIZE,
+        debug_sample_every=config.LOG_DEBUG_SAMPLE_EVERY,
+    )
+    MetricsRegistry.shared().register_stats("logging", Logger.stats, counters=("dropped",))
+    if config.METRICS_PORT > 0:
+        MetricsServer(config.METRICS_PORT).start()
+    if config.GRPC_SERVER_MODE == "aio":
+        try:
+            asyncio.run(AsyncServer(config=config).start())
+        except KeyboardInterrupt:
+            pass
+    else:
+        server = Server(config=config)
+        server.start()
@@ -0,0 +1,182 @@
+import time
+import threading
+from logger import Logger
+
+
+class SessionLimitError(Exception):
+    """Raised when a new session would exceed the configured capacity."""
+
+
+class Session:
+    """State owned by a single Process stream: its AudioProcessor, buffers and score accumulators."""
+
+    def __init__(self, session_id: str, client_token: str, audio_processor):
+        self.session_id = session_id
+        self.client_token = client_token
+        self.audio_processor = audio_processor
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
+
+    def touch(self):
+        """Marks the session as active now."""
+        self.last_activity = time.monotonic()
+
+    def close(self):
+        """Releases the resources held by the session's AudioProcessor."""
+        if self.audio_processor is not None:
+            self.audio_processor.close()
+
+    def idle_seconds(self, now: float = None) -> float:
+        """Returns how long the session has been idle."""
+        return (now or time.monotonic()) - self.last_activity
+
+
+class SessionManager:
+    """
+    Thread-safe registry of live sessions keyed by stream ID, with bounded capacity
+    and idle-timeout eviction.
+    """
+
+    def __init__(self, max_sessions: int, idle_timeout: float, reap_interval: float = 30.0):
+        self.log = Logger.get_logger(__name__)
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+        self._rejected = 0
+        self._stop_event = threading.Event()
+        self._reaper = None
+
+    def start_reaper(self):
+        """Starts a daemon thread that periodically evicts idle sessions."""
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+            self._reaper.start()
+
+    def stop_reaper(self):
+        """Stops the idle-session reaper thread."""
+        self._stop_event.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    def _reap_loop(self):
+        while not self._stop_event.wait(self.reap_interval):
+            self.evict_idle()
+
+    def reserve(self, session_id: str, client_token: str) -> Session:
+        """Claims a slot for a stream's session before its AudioProcessor is built.
+
+        Building a processor downloads the song and computes its reference features, so a stream
+        is turned away before doing that work rather than after. The reserved session has no
+        processor until `attach` is called, and is never evicted as idle in the meantime.
+
+        Args:
+            session_id (str): The ID of the stream owning the session.
+            client_token (str): The client token received in the Initialize message.
+
+        Returns:
+            Session: The reserved session.
+
+        Raises:
+            SessionLimitError: If the registry is full, even after evicting idle sessions.
+        """
+        with self._lock:
+            closed = [self._sessions.pop(session_id)] if session_id in self._sessions else []
+            if len(self._sessions) >= self.max_sessions:
+                closed.extend(self._evict_idle_locked())
+            full = len(self._sessions) >= self.max_sessions
+            if full:
+                self._rejected += 1
+            else:
+                session = Session(session_id, client_token, None)
+                self._sessions[session_id] = session
+                self._created += 1
+                active = len(self._sessions)
+        for stale in closed:
+            stale.close()
+        if full:
+            raise SessionLimitError(f"Session capacity reached ({self.max_sessions} active sessions).")
+        self.log.info("Reserved session %s (%s/%s active).", session_id, active, self.max_sessions)
+        return session
+
+    def attach(self, session: Session, audio_processor):
+        """Hands a reserved session its AudioProcessor, making it ready for audio chunks.
+
+        Raises:
+            ValueError: If the session was removed or replaced while the processor was built; the
+                processor is closed.
+        """
+        with self._lock:
+            current = self._sessions.get(session.session_id) is session
+            if current:
+                session.audio_processor = audio_processor
+                session.touch()
+        if not current:
+            audio_processor.close()
+            raise ValueError(f"Session {session.session_id} was closed while it was initializing.")
+
+    def get(self, session_id: str) -> Session:
+        """Returns the session for the stream and marks it as active.
+
+        Raises:
+            ValueError: If no session is registered for the stream, e.g. Initialize was not sent
+                or the session was evicted.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None or session.audio_processor is None:
+            raise ValueError(f"No active session for stream {session_id}. Send an Initialize request first.")
+        session.touch()
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Drops the session for the stream. Returns True if a session was removed."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            active = len(self._sessions)
+        if session is not None:
+            session.close()
+            self.log.info("Removed session %s (%s/%s active).", session_id, active, self.max_sessions)
+        return session is not None
+
+    def evict_idle(self) -> int:
+        """Evicts every session idle for longer than the timeout. Returns the number evicted."""
+        with self._lock:
+            evicted = self._evict_idle_locked()
+        for session in evicted:
+            session.close()
+        return len(evicted)
+
+    def _evict_idle_locked(self) -> list:
+        now = time.monotonic()
+        # Reserved sessions are still building their processor, which is not idleness
+        expired = [
+            sid
+            for sid, session in self._sessions.items()
+            if session.audio_processor is not None and session.idle_seconds(now) > self.idle_timeout
+        ]
+        evicted = [self._sessions.pop(session_id) for session_id in expired]
+        for session_id in expired:
+            self.log.info("Evicted idle session %s.", session_id)
+        self._evicted += len(expired)
+        return evicted
+
+    def active_count(self) -> int:
+        """Returns the number of live sessions."""
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self) -> dict:
+        """Returns live session counts for monitoring."""
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "capacity": self.max_sessions,
+                "created": self._created,
+                "evicted": self._evicted,
+                "rejected": self._rejected,
+            }
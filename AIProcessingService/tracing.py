@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# gRPC metadata key carrying the correlation ID to clients and to the AIPrivateInterfaceService
+CORRELATION_ID_METADATA_KEY = "x-correlation-id"
+
+_correlation_id = contextvars.ContextVar("correlation_id", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def new_correlation_id() -> str:
+    """Returns a new random correlation ID; its 32 hex digits double as an OTLP trace ID."""
+    return uuid.uuid4().hex
+
+
+def current_correlation_id(default: str = None) -> str:
+    """Returns the correlation ID bound to the current context, or `default` outside any stream."""
+    correlation_id = _correlation_id.get()
+    return correlation_id if correlation_id is not None else default
+
+
+@contextmanager
+def correlation(correlation_id: str):
+    """Binds a correlation ID to the current context for the duration of the block."""
+    token = _correlation_id.set(correlation_id)
+    try:
+        yield
+    finally:
+        _correlation_id.reset(token)
+
+
+class Span:
+    """A timed operation within the trace of one correlation ID."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attributes: dict = None, start_ns: int = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": self.duration_seconds * 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+
+    def export(self, spans):
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(span.to_dict()) + "\n" for span in spans)
+
+    def shutdown(self):
+        pass
+
+
+class OtlpHttpSpanExporter:
+    """Posts finished spans to an OTLP/HTTP collector using the JSON encoding of ExportTraceServiceRequest."""
+
+    SPAN_KIND_INTERNAL = 1
+    STATUS_CODE_ERROR = 2
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        import requests
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    @staticmethod
+    def _attribute(key: str, value) -> dict:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _span(self, span: Span) -> dict:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": self.SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [self._attribute(key, value) for key, value in span.attributes.items()],
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        if span.error:
+            encoded["status"] = {"code": self.STATUS_CODE_ERROR, "message": span.error}
+        return encoded
+
+    def export(self, spans):
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": "aiprocessing"}, "spans": [self._span(span) for span in spans]}],
+                }
+            ]
+        }
+        response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def shutdown(self):
+        self.session.close()
+
+
+class Tracer:
+    """
+    Records spans per correlation ID and hands finished spans to an exporter on a background thread.
+
+    Spans are cheap plain objects, so instrumentation stays in place when tracing is off; without
+    an exporter finished spans are simply dropped. When the export queue is full, spans are
+    dropped rather than blocking the request path.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, exporter=None, max_queue_size: int = 10000, batch_size: int = 512, flush_interval: float = 1.0):
+        """
+        Args:
+            exporter: Object with export(spans) and shutdown(), or None to drop spans.
+            max_queue_size (int): Finished spans held for export before new ones are dropped.
+            batch_size (int): Maximum spans per export call.
+            flush_interval (float): Seconds between exports of a partial batch.
+        """
+        # Imported here because the logger imports this module for its correlation-ID filter
+        from logger import Logger
+
+        self.log = Logger.get_logger(__name__)
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._exported = 0
+        self._dropped = 0
+        self._failed_exports = 0
+        self._stop_event = threading.Event()
+        self._worker = None
+        if exporter is not None:
+            self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+            self._worker.start()
+            atexit.register(self.shutdown)
+
+    @classmethod
+    def shared(cls) -> "Tracer":
+        """Returns the tracer shared by the process, with the exporter selected in Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+                from metrics import MetricsRegistry
+
+                config = Config()
+                exporter = None
+                if config.TRACING_EXPORTER == "jsonl":
+                    exporter = JsonlSpanExporter(config.TRACING_JSONL_PATH)
+                elif config.TRACING_EXPORTER == "otlp":
+                    exporter = OtlpHttpSpanExporter(config.TRACING_OTLP_ENDPOINT, config.TRACING_SERVICE_NAME)
+                cls._shared = cls(exporter)
+                MetricsRegistry.shared().register_stats(
+                    "tracing", cls._shared.stats, counters=("exported", "dropped", "failed_exports")
+                )
+            return cls._shared
+
+    @classmethod
+    def shutdown_shared(cls):
+        """Flushes and stops the shared tracer's exporter, if one was started."""
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.shutdown()
+                cls._shared = None
+
+    def start_span(self, name: str, parent: Span = None, trace_id: str = None, **attributes) -> Span:
+        """Starts a span without making it current; finish it with end_span.
+
+        The span joins the parent's trace, or else the trace of the bound correlation ID.
+        """
+        parent = parent or _current_span.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent is not None else current_correlation_id() or new_correlation_id()
+        return Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+
+    def end_span(self, span: Span, end_ns: int = None):
+        span.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if self.exporter is None:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+
+    @contextmanager
+    def span(self, name: str, parent: Span = None, **attributes):
+        """Times the block as a span, current for the block so nested spans become its children."""
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def record_span(self, name: str, start_ns: int, seconds: float, parent: Span = None, **attributes) -> Span:
+        """Records an operation timed elsewhere, e.g. in a worker process, as a finished span."""
+        span = self.start_span(name, parent, **attributes)
+        span.start_ns = start_ns
+        self.end_span(span, start_ns + int(seconds * 1e9))
+        return span
+
+    def _export_loop(self):
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.exporter.export(batch)
+                with self._stats_lock:
+                    self._exported += len(batch)
+            except Exception as e:
+                with self._stats_lock:
+                    self._failed_exports += 1
+                    self._dropped += len(batch)
+                self.log.warning("Failed to export %s spans: %s", len(batch), e)
+
+    def shutdown(self):
+        """Exports the queued spans and stops the exporter thread."""
+        if self._worker is None:
+            return
+        self._stop_event.set()
+        self._worker.join(timeout=10)
+        self._worker = None
+        self.exporter.shutdown()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "exported": self._exported,
+                "dropped": self._dropped,
+                "failed_exports": self._failed_exports,
+            }
@@ -0,0 +1,164 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+from collections import OrderedDict
+from logger import Logger
+from metrics import MetricsRegistry
+
+
+def transcript_key(engine: str, audio, locale: str = None, sr: int = None) -> str:
+    """Builds the cache key of a transcription.
+
+    Args:
+        engine (str): Name of the engine (and model) producing the transcript.
+        audio (bytes | np.ndarray): Encoded audio bytes or decoded samples.
+        locale (str): Language of the transcription, if the engine takes one.
+        sr (int): Sample rate of decoded samples. Encoded audio carries its own, so it is ignored there.
+    """
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(f"{audio.dtype.str}{audio.shape}".encode())
+        audio = np.ascontiguousarray(audio)
+    else:
+        sr = None
+    digest.update(memoryview(audio).cast("B"))
+    return hashlib.sha256(f"{engine}|{locale}|{sr}|{digest.hexdigest()}".encode()).hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Cache of transcripts keyed by (engine, locale, sample rate, audio content hash).
+
+    Identical audio sent to the same engine, such as a chunk resent after a client retry, is
+    transcribed once. Transcripts are kept in a bounded in-memory LRU tier and, when `cache_dir`
+    is set, in an on-disk tier that survives restarts. Concurrent requests for the same key wait
+    for the first transcription instead of calling the engine again.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries: int, cache_dir: str = None):
+        """
+        Args:
+            max_entries (int): Capacity of the in-memory tier.
+            cache_dir (str): Directory of the on-disk tier, or None to keep transcripts in memory only.
+        """
+        self.log = Logger.get_logger(__name__)
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls) -> "TranscriptionCache":
+        """Returns the cache shared by every transcriber in this process, configured from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+
+                config = Config()
+                cls._shared = cls(config.TRANSCRIPTION_CACHE_MAX_ENTRIES, config.TRANSCRIPTION_CACHE_DIR or None)
+                MetricsRegistry.shared().register_stats(
+                    "transcription_cache", cls._shared.stats, counters=("memory_hits", "disk_hits", "misses", "evictions")
+                )
+            return cls._shared
+
+    @staticmethod
+    def key(engine: str, audio, locale: str = None, sr: int = None) -> str:
+        """Builds the cache key of a transcription; see transcript_key."""
+        return transcript_key(engine, audio, locale, sr)
+
+    def get_or_transcribe(self, engine: str, audio, transcribe, locale: str = None, sr: int = None) -> str:
+        """Returns the cached transcript of the audio, calling `transcribe(audio)` on a miss.
+
+        Empty transcripts are not cached, since the engines also return "" when a call fails.
+        """
+        key = self.key(engine, audio, locale, sr)
+        while True:
+            with self._lock:
+                text = self._entries.get(key)
+                if text is not None:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return text
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    pending = self._in_flight[key] = threading.Event()
+                    break
+            # Another request is transcribing the same audio; wait and look it up again.
+            pending.wait()
+
+        try:
+            text = self._load(key)
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+            else:
+                with self._lock:
+                    self.misses += 1
+                text = transcribe(audio)
+                if text:
+                    self._save(key, engine, text)
+            if text:
+                self._store(key, text)
+            return text
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load(self, key: str):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)["text"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _save(self, key: str, engine: str, text: str):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".transcript-", dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            json.dump({"engine": engine, "text": text}, f)
+        os.replace(temp_path, path)
+
+    def _store(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Returns cache occupancy and hit counters for both tiers."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,125 @@
+import os
+import re
+import logging
+import torch
+
+logging.basicConfig(level=logging.INFO)
+
+
+class TorchBackend:
+    """Runs the fp32 PyTorch model as loaded."""
+
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model
+
+    def logits(self, input_values, attention_mask=None):
+        with torch.inference_mode():
+            return self.model(input_values, attention_mask=attention_mask).logits
+
+    def resident_bytes(self):
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class Int8Backend(TorchBackend):
+    """Runs the model with its Linear layers dynamically quantized to int8.
+
+    Weights are stored as int8 and activations are quantized on the fly, which roughly quarters
+    the size of the transformer layers and speeds up CPU inference. The convolutional feature
+    encoder stays in fp32.
+    """
+
+    name = "int8"
+
+    def __init__(self, model):
+        super().__init__(
+            torch.ao.quantization.quantize_dynamic(model.cpu(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        )
+
+    def resident_bytes(self):
+        # Quantized weights live in packed parameters that parameters() does not report
+        total = 0
+        for value in self.model.state_dict().values():
+            if isinstance(value, tuple):
+                value = value[0]
+            if isinstance(value, torch.Tensor):
+                total += value.numel() * value.element_size()
+        return total
+
+
+class OnnxBackend:
+    """Runs the model exported to ONNX with an ONNX Runtime CPU session.
+
+    The export is written once to `onnx_dir` and reused by later processes.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model, model_name, onnx_dir, uses_attention_mask, num_threads=0):
+        import onnxruntime
+
+        self.uses_attention_mask = uses_attention_mask
+        self.path = os.path.join(onnx_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name) + ".onnx")
+        if not os.path.exists(self.path):
+            os.makedirs(onnx_dir, exist_ok=True)
+            self._export(model, self.path)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+
+    def _export(self, model, path):
+        logging.info("Exporting Wav2Vec2 model to %s", path)
+        model = model.cpu().eval()
+        example = torch.zeros(1, 16000)
+        inputs, input_names = (example,), ["input_values"]
+        dynamic_axes = {"input_values": {0: "batch", 1: "samples"}, "logits": {0: "batch", 1: "frames"}}
+        if self.uses_attention_mask:
+            inputs += (torch.ones(1, 16000, dtype=torch.long),)
+            input_names.append("attention_mask")
+            dynamic_axes["attention_mask"] = {0: "batch", 1: "samples"}
+
+        # Export to a temporary file first so that a crash never leaves a truncated model behind
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        torch.onnx.export(
+            model,
+            inputs,
+            temp_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False,
+        )
+        os.replace(temp_path, path)
+
+    def logits(self, input_values, attention_mask=None):
+        feeds = {"input_values": input_values.cpu().numpy()}
+        if self.uses_attention_mask:
+            feeds["attention_mask"] = attention_mask.cpu().numpy().astype("int64")
+        return torch.from_numpy(self.session.run(["logits"], feeds)[0])
+
+    def resident_bytes(self):
+        return os.path.getsize(self.path)
+
+
+def create_backend(name, model, model_name, uses_attention_mask, onnx_dir="onnx_models"):
+    """Wrap a loaded Wav2Vec2ForCTC model in the inference backend with the given name.
+
+    Args:
+        name (str): "torch" (fp32), "int8" (dynamically quantized) or "onnx" (ONNX Runtime).
+        model (Wav2Vec2ForCTC): The loaded fp32 model.
+        model_name (str): Name or path the model was loaded from, used to name the ONNX export.
+        uses_attention_mask (bool): Whether the model takes an attention mask.
+        onnx_dir (str): Directory holding exported ONNX models.
+    """
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "int8":
+        return Int8Backend(model)
+    if name == "onnx":
+        return OnnxBackend(model, model_name, onnx_dir, uses_attention_mask)
+    raise ValueError(f"Unsupported Wav2Vec2 backend: {name}")
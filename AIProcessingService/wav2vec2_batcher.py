@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+import numpy as np
+from collections import Counter
+from concurrent import futures
+from logger import Logger
+from metrics import MetricsRegistry
+
+
+class Wav2Vec2Batcher:
+    """
+    Dynamic batching front-end for the Wav2Vec2 engine.
+
+    Concurrent callers submit 16 kHz float arrays and wait on futures. A worker thread collects
+    requests for at most `max_wait` seconds (or until `max_queue` are pending), sorts them by
+    length and splits them into batches whose longest input is at most `max_length_ratio` times
+    the shortest, so little compute is spent on padding. Each batch runs one forward pass.
+    The model is taken from the ModelRegistry for every batch, so it stays loaded while busy
+    and can still be unloaded when idle.
+    """
+
+    SAMPLE_RATE = 16000
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self, model_registry, max_batch_size: int, max_wait: float, max_length_ratio: float = 1.25, engine_name="wav2vec2"
+    ):
+        """
+        Args:
+            model_registry (ModelRegistry): Registry providing the Wav2VecTranscription engine.
+            max_batch_size (int): Maximum number of arrays in one forward pass.
+            max_wait (float): Maximum time in seconds the first request of a batch waits for others.
+            max_length_ratio (float): Maximum ratio between the longest and shortest array of a batch.
+            engine_name (str): Name of the engine in the registry.
+        """
+        self.log = Logger.get_logger(__name__)
+        self.model_registry = model_registry
+        self.engine_name = engine_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_length_ratio = max_length_ratio
+        # Requests are collected from a window a few batches wide, so that length grouping has
+        # enough requests to choose from
+        self.max_queue = max_batch_size * 4
+        self._queue = queue.Queue()
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._audio_samples = 0
+        self._padded_samples = 0
+
+        self._worker = threading.Thread(target=self._run, name="wav2vec2-batcher", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def shared(cls) -> "Wav2Vec2Batcher":
+        """Returns the batcher shared by every caller in this process, configured from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                from config import Config
+                from model_registry import ModelRegistry
+
+                config = Config()
+                cls._shared = cls(
+                    ModelRegistry.shared(),
+                    max_batch_size=config.WAV2VEC2_BATCH_MAX_SIZE,
+                    max_wait=config.WAV2VEC2_BATCH_MAX_WAIT_MS / 1000,
+                    max_length_ratio=config.WAV2VEC2_BATCH_MAX_LENGTH_RATIO,
+                )
+                MetricsRegistry.shared().register_stats(
+                    "wav2vec2_batcher", cls._shared.stats, counters=("batches", "requests")
+                )
+            return cls._shared
+
+    def submit(self, audio: np.ndarray) -> futures.Future:
+        """Queues a mono 16 kHz float array for transcription.
+
+        Returns:
+            Future: Resolves to the transcript of the array.
+        """
+        future = futures.Future()
+        self._queue.put((np.asarray(audio, dtype=np.float32), future))
+        return future
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Transcribes an array as part of the next batch and waits for the result."""
+        return self.submit(audio).result()
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for batch in self._group_by_length(pending):
+                self._run_batch(batch)
+
+    def _group_by_length(self, requests: list) -> list:
+        """Splits requests into batches of similar length, shortest first."""
+        batches = []
+        for request in sorted(requests, key=lambda request: len(request[0])):
+            batch = batches[-1] if batches else None
+            if (
+                batch is None
+                or len(batch) >= self.max_batch_size
+                or len(request[0]) > self.max_length_ratio * max(len(batch[0][0]), 1)
+            ):
+                batch = []
+                batches.append(batch)
+            batch.append(request)
+        return batches
+
+    def _run_batch(self, batch: list):
+        audios = [request[0] for request in batch]
+        started = time.monotonic()
+        try:
+            with self.model_registry.use(self.engine_name) as transcriber:
+                transcripts = transcriber.transcribe_batch(audios)
+        except Exception as e:
+            self.log.error("Wav2Vec2 batch of %s failed: %s", len(batch), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), transcript in zip(batch, transcripts):
+            future.set_result(transcript)
+
+        lengths = [len(audio) for audio in audios]
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._requests += len(batch)
+            self._audio_samples += sum(lengths)
+            self._padded_samples += max(lengths) * len(lengths)
+        self.log.debug("Transcribed Wav2Vec2 batch of %s in %.3fs", len(batch), time.monotonic() - started)
+
+    def stats(self) -> dict:
+        """Returns the batch-size histogram, padding efficiency and throughput since start."""
+        with self._stats_lock:
+            elapsed = time.monotonic() - self._started_at
+            batches = sum(self._batch_sizes.values())
+            return {
+                "batches": batches,
+                "requests": self._requests,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "mean_batch_size": self._requests / batches if batches else 0.0,
+                "padding_efficiency": self._audio_samples / self._padded_samples if self._padded_samples else 1.0,
+                "requests_per_second": self._requests / elapsed if elapsed else 0.0,
+                "queued": self._queue.qsize(),
+            }
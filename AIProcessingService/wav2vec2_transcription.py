@@ -1,44 +1,134 @@
 import torch
 import logging
+import threading
 import torchaudio
-from transformers import Wav2Vec2ForCTC, Wav2Vec2Tokenizer
+from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+from wav2vec2_backends import create_backend
 
 logging.basicConfig(level=logging.INFO)
 
 
 class Wav2VecTranscription:
-    def __init__(self, device="cpu"):
-        # Check if GPU is available and set the device
-        if torch.cuda.is_available():
+    SAMPLE_RATE = 16000
+
+    def __init__(self, device="cpu", model_name="facebook/wav2vec2-base-960h", backend="torch", onnx_dir="onnx_models"):
+        # Check if GPU is available and set the device; the int8 and ONNX backends run on CPU
+        if torch.cuda.is_available() and backend == "torch":
             device = "cuda"
         self.device = device
-        
-        # Load the Wav2Vec 2.0 model and tokenizer
-        self.model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h").to(device)
-        self.tokenizer = Wav2Vec2Tokenizer.from_pretrained("facebook/wav2vec2-base-960h")
+
+        # Load the Wav2Vec 2.0 model and its processor (feature extractor and CTC tokenizer)
+        self.model_name = model_name
+        self.model = Wav2Vec2ForCTC.from_pretrained(model_name).to(device)
+        self.model.eval()
+        self.processor = Wav2Vec2Processor.from_pretrained(model_name)
+        self.tokenizer = self.processor.tokenizer
+
+        # Only models whose feature encoder uses layer norm were trained with an attention mask;
+        # group-norm models (e.g. wav2vec2-base) expect plain zero padding instead
+        self.config = self.model.config
+        self.uses_attention_mask = self.config.feat_extract_norm == "layer"
+
+        # Inference runs through the selected backend: fp32 PyTorch, int8 PyTorch or ONNX Runtime.
+        # The backend owns the weights, so the fp32 model is not kept around next to an ONNX session
+        self.backend = create_backend(backend, self.model, model_name, self.uses_attention_mask, onnx_dir)
+        self.model = getattr(self.backend, "model", None)
+
+        # Resample transforms build their filter kernel on construction, so keep one per source rate
+        self._resamplers = {}
+        self._resamplers_lock = threading.Lock()
+
+    def resident_bytes(self):
+        """Return the memory held by the model weights of the active backend."""
+        return self.backend.resident_bytes()
+
+    def close(self):
+        """Release cached GPU memory once the model is unloaded."""
+        self.model = None
+        self.backend = None
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
+
+    def resample(self, waveform, sample_rate):
+        """Resample a waveform tensor to 16 kHz, reusing the transform for each source rate."""
+        if sample_rate == self.SAMPLE_RATE:
+            return waveform
+        with self._resamplers_lock:
+            resampler = self._resamplers.get(sample_rate)
+            if resampler is None:
+                resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=self.SAMPLE_RATE)
+                self._resamplers[sample_rate] = resampler
+        return resampler(waveform)
 
     def transcribe(self, audio_path):
         try:
             # Load the audio data
             waveform, sample_rate = torchaudio.load(audio_path)
-            
+
             # Resample the audio to 16kHz if it's not already
-            if sample_rate != 16000:
-                resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=16000)
-                waveform = resampler(waveform)
-            
-            # Tokenize the audio data
-            input_values = self.tokenizer(waveform.squeeze().numpy(), return_tensors="pt", padding="longest").input_values
-
-            # Use the Wav2Vec 2.0 model to transcribe the audio data
-            with torch.no_grad():
-                logits = self.model(input_values).logits
-                predicted_ids = torch.argmax(logits, dim=-1)
-
-            # Decode the ids to text
-            transcription = self.tokenizer.batch_decode(predicted_ids)[0]
-            return transcription
-        
+            waveform = self.resample(waveform, sample_rate)
+            return self.transcribe_array(waveform.squeeze().numpy())
+
         except Exception as e:
             print(f"Error: {e}")
             return None
+
+    def _output_length(self, n_samples):
+        """Number of logit frames the convolutional feature encoder produces for n samples."""
+        for kernel, stride in zip(self.config.conv_kernel, self.config.conv_stride):
+            n_samples = (n_samples - kernel) // stride + 1
+        return max(n_samples, 0)
+
+    def transcribe_array(self, audio):
+        """Transcribe a mono float array sampled at 16 kHz."""
+        return self.transcribe_batch([audio])[0]
+
+    def transcribe_batch(self, audios):
+        """Transcribe several mono 16 kHz float arrays with a single forward pass.
+
+        The arrays are padded to the longest one and logits of padded frames are discarded. The
+        group norm of models trained without an attention mask spans the padding too, so for those
+        models only arrays of equal length share a forward pass; either way each transcript matches
+        what the array would produce on its own.
+
+        Args:
+            audios (list[np.ndarray]): The arrays to transcribe.
+
+        Returns:
+            list[str]: One transcript per array, in the same order.
+        """
+        if not self.uses_attention_mask and len({len(audio) for audio in audios}) > 1:
+            transcripts = [None] * len(audios)
+            by_length = {}
+            for i, audio in enumerate(audios):
+                by_length.setdefault(len(audio), []).append(i)
+            for indices in by_length.values():
+                for i, transcript in zip(indices, self._forward([audios[i] for i in indices])):
+                    transcripts[i] = transcript
+            return transcripts
+        return self._forward(audios)
+
+    def _forward(self, audios):
+        inputs = self.processor(
+            list(audios),
+            sampling_rate=self.SAMPLE_RATE,
+            return_tensors="pt",
+            padding="longest",
+            return_attention_mask=self.uses_attention_mask,
+        )
+        input_values = inputs.input_values.to(self.device)
+        attention_mask = inputs.attention_mask.to(self.device) if self.uses_attention_mask else None
+
+        # Use the Wav2Vec 2.0 model to transcribe the audio data
+        logits = self.backend.logits(input_values, attention_mask)
+        predicted_ids = torch.argmax(logits, dim=-1)
+
+        # Frames computed from padding decode as the CTC blank (the pad token)
+        # The mask must live on the device of predicted_ids, e.g. CUDA, to index it
+        device = predicted_ids.device
+        output_lengths = torch.tensor([self._output_length(len(audio)) for audio in audios], device=device)
+        frames = torch.arange(predicted_ids.shape[-1], device=device).unsqueeze(0)
+        predicted_ids[frames >= output_lengths.unsqueeze(1)] = self.tokenizer.pad_token_id
+
+        # Decode the ids to text
+        return self.processor.batch_decode(predicted_ids.cpu())
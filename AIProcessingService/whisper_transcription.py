@@ -1,17 +1,98 @@
 import io
+import torch
 import whisper
 import librosa
-import logging 
+import logging
+import threading
+from audio_utils import AudioUtils
 
 logging.basicConfig(level=logging.INFO)
 
 
 class WhisperTranscription:
-    def __init__(self):
-        self.model = whisper.load_model("large-v2")
+    SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+    def __init__(self, model_size="large-v2", vad=False, vad_top_db=30, batch_size=8, language=None):
+        """
+        Args:
+            model_size (str): Whisper checkpoint to load.
+            vad (bool): Transcribe only the voiced segments found by an energy VAD, decoded in batches,
+                instead of running Whisper's sequential long-form decoding over the whole input.
+            vad_top_db (float): Frames quieter than the peak by more than this are treated as silence.
+            batch_size (int): Number of voiced segments decoded together in VAD mode.
+            language (str): Language code, or None to let Whisper detect it.
+        """
+        self.model_size = model_size
+        self.model = whisper.load_model(model_size)
+        self.vad = vad
+        self.vad_top_db = vad_top_db
+        self.batch_size = batch_size
+        self.language = language
+
+        # Whisper installs kv-cache hooks on the shared modules for every decode, so two decodes
+        # must never run on the same model at once
+        self._lock = threading.Lock()
+
+    def resident_bytes(self):
+        """Return the memory held by the model's parameters and buffers."""
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
 
     def transcribe(self, audio_data):
         audio_bytes_io = io.BytesIO(audio_data)
-        audio_array, _ = librosa.load(audio_bytes_io, sr=None)
-        transcription = self.model.transcribe(audio_array, verbose=True)
+        audio_array, _ = librosa.load(audio_bytes_io, sr=self.SAMPLE_RATE)
+        if self.vad:
+            return self.transcribe_segments(audio_array)['text']
+        with self._lock:
+            transcription = self.model.transcribe(audio_array, verbose=None, language=self.language)
         return transcription['text']
+
+    def transcribe_segments(self, audio_array):
+        """Transcribe the voiced segments of a 16 kHz signal, skipping silence and instrumental breaks.
+
+        Voiced segments (at most 30 s each, Whisper's window) are padded to the model's input
+        length and decoded in batches of `batch_size` with one forward pass per batch, then
+        stitched back in order.
+
+        Returns:
+            dict: "text" (the full transcript), "segments" (start/end in seconds and text of each
+                voiced segment) and "voiced_seconds"/"total_seconds".
+        """
+        intervals = AudioUtils.voiced_intervals(
+            audio_array, self.SAMPLE_RATE, top_db=self.vad_top_db, max_length=whisper.audio.CHUNK_LENGTH
+        )
+        options = whisper.DecodingOptions(
+            language=self.language, without_timestamps=True, fp16=self.model.device.type == "cuda"
+        )
+
+        segments = []
+        for batch_start in range(0, len(intervals), self.batch_size):
+            batch = intervals[batch_start : batch_start + self.batch_size]
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(audio_array[start:end])), n_mels=self.model.dims.n_mels
+                )
+                for start, end in batch
+            ]).to(self.model.device)
+            with self._lock:
+                results = whisper.decode(self.model, mels, options)
+            for (start, end), result in zip(batch, results):
+                segments.append({
+                    "start": int(start) / self.SAMPLE_RATE,
+                    "end": int(end) / self.SAMPLE_RATE,
+                    "text": result.text.strip(),
+                })
+
+        voiced_samples = int(sum(end - start for start, end in intervals))
+        logging.info(
+            "Transcribed %s voiced segments (%.1fs of %.1fs)",
+            len(segments),
+            voiced_samples / self.SAMPLE_RATE,
+            len(audio_array) / self.SAMPLE_RATE,
+        )
+        return {
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "segments": segments,
+            "voiced_seconds": voiced_samples / self.SAMPLE_RATE,
+            "total_seconds": len(audio_array) / self.SAMPLE_RATE,
+        }
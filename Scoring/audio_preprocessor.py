@@ -1,9 +1,109 @@
+import time
+import logging
 import librosa
 import numpy as np
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Optional, List, Dict
 from inspect import signature
 
 
+class StepTimer:
+    """Accumulates the time spent in each preprocessing step.
+
+    Timings are exclusive: time spent in a nested step (such as the stft a spectral step triggers)
+    is counted under the nested step only.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self._nested: List[float] = []
+
+    @contextmanager
+    def timed(self, name: str):
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self._nested.pop()
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed - nested
+            if self._nested:
+                self._nested[-1] += elapsed
+
+
+class SpectralState:
+    """Audio carried between preprocessing steps in the time domain, the STFT domain, or both.
+
+    Each representation is computed from the other on first access and kept, so consecutive
+    STFT-domain steps share one stft and a pipeline ends with at most one istft.
+    """
+
+    HOP_LENGTH = 512  # librosa.stft default for n_fft=2048
+
+    def __init__(
+        self,
+        signal: Optional[np.array] = None,
+        stft: Optional[np.array] = None,
+        timer: Optional[StepTimer] = None,
+        length: Optional[int] = None,
+    ):
+        """
+        Args:
+            signal (np.array): Time-domain signal.
+            stft (np.array): STFT of the signal, if it is known or the signal is not.
+            timer (StepTimer): Accumulates the time spent in stft and istft; a new one is used if None.
+            length (int): Samples of the signal an STFT-only state inverts to; by default the STFT's
+                own span, which can be up to a hop shorter than the signal it was computed from.
+        """
+        if signal is None and stft is None:
+            raise ValueError("SpectralState needs a signal or an STFT")
+        self._signal = signal
+        self._stft = stft
+        self._length = length
+        self._prefix_stfts = {}
+        self.timer = timer or StepTimer()
+
+    @property
+    def signal(self) -> np.array:
+        if self._signal is None:
+            with self.timer.timed("istft"):
+                self._signal = librosa.istft(self._stft, length=self._length)
+        return self._signal
+
+    @property
+    def stft(self) -> np.array:
+        if self._stft is None:
+            with self.timer.timed("stft"):
+                self._stft = librosa.stft(self._signal)
+        return self._stft
+
+    @property
+    def length(self) -> int:
+        """Number of samples of the time-domain signal, without computing it."""
+        if self._signal is not None:
+            return len(self._signal)
+        if self._length is not None:
+            return self._length
+        return self.HOP_LENGTH * (self._stft.shape[-1] - 1)
+
+    def prefix_stft(self, num_samples: int) -> np.array:
+        """Returns the STFT of the first `num_samples` samples, cached per length."""
+        if num_samples >= self.length:
+            return self.stft
+        if num_samples not in self._prefix_stfts:
+            with self.timer.timed("stft"):
+                self._prefix_stfts[num_samples] = librosa.stft(self.signal[:num_samples])
+        return self._prefix_stfts[num_samples]
+
+    def with_signal(self, signal: np.array) -> "SpectralState":
+        return SpectralState(signal=signal, timer=self.timer)
+
+    def with_stft(self, stft: np.array) -> "SpectralState":
+        """A state for a filtered STFT of this signal, which inverts back to this signal's length."""
+        return SpectralState(stft=stft, timer=self.timer, length=self.length)
+
+
 class AudioPreprocessor:
     """Handles audio preprocessing tasks."""
 
@@ -21,6 +121,8 @@ class AudioPreprocessor:
     def normalize_audio(signal: np.array, segment_length: Optional[int] = None) -> np.array:
         """Normalizes the audio signal. If segment_length is provided, perform segment-wise normalization."""
         if segment_length:
+            # Work on a copy: the input may be a prefix output shared with other pipelines
+            signal = np.array(signal, dtype=np.result_type(signal, np.float32))
             for i in range(0, len(signal), segment_length):
                 signal[i : i + segment_length] = AudioPreprocessor._normalize_segment(signal[i : i + segment_length])
         else:
@@ -43,19 +145,30 @@ class AudioPreprocessor:
     @staticmethod
     def spectral_gate(signal: np.array, threshold: float = 0.1) -> np.array:
         """Suppresses frequency components of the signal below the threshold."""
-        stft_signal = librosa.stft(signal)
-        stft_signal[np.abs(stft_signal) < threshold] = 0
-        return librosa.istft(stft_signal)
+        return AudioPreprocessor._spectral_gate(SpectralState(signal), threshold).signal
+
+    @staticmethod
+    def _spectral_gate(state: SpectralState, threshold: float = 0.1) -> SpectralState:
+        stft_signal = state.stft
+        return state.with_stft(np.where(np.abs(stft_signal) < threshold, 0, stft_signal))
 
     @staticmethod
     def voice_activity_detection(
         signal: np.array, sampling_rate: int, hop_length: int = 512, top_db: float = 20
     ) -> np.array:
         """Retains segments of the signal with vocal activity."""
-        S = np.abs(librosa.stft(signal, hop_length=hop_length))
+        return AudioPreprocessor._voice_activity_detection(SpectralState(signal), hop_length, top_db).signal
+
+    @staticmethod
+    def _voice_activity_detection(state: SpectralState, hop_length: int = 512, top_db: float = 20) -> SpectralState:
+        if hop_length == SpectralState.HOP_LENGTH:
+            S = np.abs(state.stft)
+        else:
+            S = np.abs(librosa.stft(state.signal, hop_length=hop_length))
         intervals = librosa.effects.split(S, top_db=top_db)
+        signal = state.signal
         voiced_signal = [signal[start:end] for start, end in intervals]
-        return np.concatenate(voiced_signal, axis=0)
+        return state.with_signal(np.concatenate(voiced_signal, axis=0))
 
     @staticmethod
     def source_separation(audio_chunk: np.array, sr: int = 22050) -> np.array:
@@ -67,16 +180,16 @@ class AudioPreprocessor:
     @staticmethod
     def spectral_masking(audio_chunk: np.array, reference_audio: np.array) -> np.array:
         """Applies spectral masking based on reference audio."""
-        if len(reference_audio) > len(audio_chunk):
-            reference_audio = reference_audio[: len(audio_chunk)]
-        user_stft = librosa.stft(audio_chunk)
-        ref_stft = librosa.stft(reference_audio)
+        return AudioPreprocessor._spectral_masking(SpectralState(audio_chunk), SpectralState(reference_audio)).signal
+
+    @staticmethod
+    def _spectral_masking(state: SpectralState, reference_audio: SpectralState) -> SpectralState:
+        user_stft = state.stft
+        ref_stft = reference_audio.prefix_stft(state.length)
         user_magnitude = np.abs(user_stft)
         ref_magnitude = np.abs(ref_stft)
         mask = user_magnitude / (user_magnitude + ref_magnitude + 1e-10)
-        masked_stft = user_stft * mask
-        masked_audio = librosa.istft(masked_stft)
-        return masked_audio
+        return state.with_stft(user_stft * mask)
 
     @staticmethod
     def adaptive_noise_reduction(audio_chunk: np.array, reference_audio: np.array, sr: int = 22050) -> np.array:
@@ -84,45 +197,161 @@ class AudioPreprocessor:
         Reduces noise in the audio chunk using the reference audio to model the noise.
         Assumes that the length of the audio chunk and reference audio are the same.
         """
-        # Compute the Short-Time Fourier Transform (STFT) of both audio signals
-        audio_stft = librosa.stft(audio_chunk)
-        reference_stft = librosa.stft(reference_audio)
+        return AudioPreprocessor._adaptive_noise_reduction(
+            SpectralState(audio_chunk), SpectralState(reference_audio)
+        ).signal
 
+    @staticmethod
+    def _adaptive_noise_reduction(state: SpectralState, reference_audio: SpectralState) -> SpectralState:
         # Estimate the noise profile from the reference audio
-        noise_profile = np.mean(np.abs(reference_stft), axis=1, keepdims=True)
+        noise_profile = np.mean(np.abs(reference_audio.stft), axis=1, keepdims=True)
 
         # Subtract the noise profile from the audio chunk's magnitude spectrum
-        magnitude, phase = librosa.magphase(audio_stft)
+        magnitude, phase = librosa.magphase(state.stft)
         magnitude -= noise_profile
         magnitude = np.maximum(magnitude, 0)  # Ensure that magnitude values are non-negative
 
-        # Reconstruct the denoised audio using the modified magnitude and original phase
-        denoised_stft = magnitude * phase
-        denoised_audio = librosa.istft(denoised_stft)
+        # Keep the denoised spectrum with the original phase; it is inverted only when needed
+        return state.with_stft(magnitude * phase)
+
+    # Steps that take and return a SpectralState, so they can chain in the STFT domain
+    SPECTRAL_STEPS = {
+        "spectral_gate": "_spectral_gate",
+        "adaptive_noise_reduction": "_adaptive_noise_reduction",
+        "voice_activity_detection": "_voice_activity_detection",
+        "spectral_masking": "_spectral_masking",
+    }
 
-        return denoised_audio
+    # Steps that take and return a time-domain signal
+    SIGNAL_STEPS = {
+        "normalize": "normalize_audio",
+        "trim_silences": "trim_audio",
+        "source_separation": "source_separation",
+    }
 
     @staticmethod
-    def preprocess_audio(audio: np.array, pipeline: List[str], **kwargs) -> np.array:
-        """Processes the audio through the specified preprocessing steps."""
-        processing_map = {
-            "normalize": AudioPreprocessor.normalize_audio,
-            "trim_silences": AudioPreprocessor.trim_audio,
-            "spectral_gate": AudioPreprocessor.spectral_gate,
-            "adaptive_noise_reduction": AudioPreprocessor.adaptive_noise_reduction,
-            "voice_activity_detection": AudioPreprocessor.voice_activity_detection,
-            "source_separation": AudioPreprocessor.source_separation,
-            "spectral_masking": AudioPreprocessor.spectral_masking,
-        }
+    def preprocess_audio(
+        audio: np.array, pipeline: List[str], return_state: bool = False, timer: Optional[StepTimer] = None, **kwargs
+    ) -> np.array:
+        """Processes the audio through the specified preprocessing steps.
+
+        The signal is carried between steps as a SpectralState: consecutive spectral steps reuse
+        one STFT and the result is inverted once at the end.
+
+        Args:
+            audio (np.array | SpectralState): Input audio.
+            pipeline (List[str]): Names of the preprocessing steps, applied in order.
+            return_state (bool): Return the final SpectralState instead of its time-domain signal,
+                leaving the istft to whoever needs it.
+            timer (StepTimer): Accumulates the time spent per step; a new one is used if None.
+            **kwargs: Step parameters, matched by name. A `reference_audio` array is wrapped in a
+                SpectralState so its STFT is computed once; pass a SpectralState to share it
+                across calls.
+        """
+        state = audio if isinstance(audio, SpectralState) else SpectralState(audio, timer=timer)
+        kwargs = AudioPreprocessor._wrap_reference(kwargs, state.timer)
         for step in pipeline:
-            if step in processing_map:
-                func = processing_map[step]
+            state = AudioPreprocessor.apply_step(state, step, **kwargs)
+        return state if return_state else state.signal
+
+    @staticmethod
+    def apply_step(state: SpectralState, step: str, **kwargs) -> SpectralState:
+        """Applies a single named preprocessing step to a SpectralState."""
+        if step in AudioPreprocessor.SPECTRAL_STEPS:
+            func = getattr(AudioPreprocessor, AudioPreprocessor.SPECTRAL_STEPS[step])
+            with state.timer.timed(step):
+                return func(state, **AudioPreprocessor._step_kwargs(func, kwargs, spectral=True))
+        if step in AudioPreprocessor.SIGNAL_STEPS:
+            func = getattr(AudioPreprocessor, AudioPreprocessor.SIGNAL_STEPS[step])
+            signal = state.signal
+            with state.timer.timed(step):
+                return state.with_signal(func(signal, **AudioPreprocessor._step_kwargs(func, kwargs, spectral=False)))
+        raise ValueError(f"Unknown preprocessing step: {step}")
+
+    @staticmethod
+    def _wrap_reference(kwargs: dict, timer: StepTimer) -> dict:
+        """Wraps a `reference_audio` array in a SpectralState so its STFT is computed once."""
+        if isinstance(kwargs.get("reference_audio"), np.ndarray):
+            kwargs = dict(kwargs, reference_audio=SpectralState(kwargs["reference_audio"], timer=timer))
+        return kwargs
+
+    @staticmethod
+    def _step_kwargs(func, kwargs: dict, spectral: bool) -> dict:
+        """Filters kwargs based on the function's signature, unwrapping SpectralStates for time-domain steps."""
+        sig = signature(func)
+        filtered_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters}
+        if not spectral:
+            filtered_kwargs = {
+                k: v.signal if isinstance(v, SpectralState) else v for k, v in filtered_kwargs.items()
+            }
+        return filtered_kwargs
 
-                # Filter kwargs based on the function's signature
-                sig = signature(func)
-                filtered_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters}
 
-                audio = func(audio, **filtered_kwargs)
-            else:
-                raise ValueError(f"Unknown preprocessing step: {step}")
-        return audio
+class PreprocessingTree:
+    """Prefix tree of named preprocessing pipelines that runs each distinct step prefix once.
+
+    Pipelines that start with the same steps share those steps' output, so e.g. five scores whose
+    pipelines all begin with normalize -> trim_silences normalize and trim the audio once. Each
+    pipeline's output is read from the node where its steps end.
+    """
+
+    class _Node:
+        __slots__ = ("step", "children", "outputs", "uses")
+
+        def __init__(self, step: Optional[str] = None):
+            self.step = step
+            self.children: Dict[str, "PreprocessingTree._Node"] = {}
+            self.outputs: List[str] = []
+            self.uses = 0  # Number of pipelines passing through this node
+
+    def __init__(self, pipelines: Dict[str, List[str]]):
+        """
+        Args:
+            pipelines (Dict[str, List[str]]): Step names per output name, e.g. per score.
+        """
+        self.names = list(pipelines)
+        self.root = self._Node()
+        for name, steps in pipelines.items():
+            node = self.root
+            node.uses += 1
+            for step in steps:
+                if step not in AudioPreprocessor.SPECTRAL_STEPS and step not in AudioPreprocessor.SIGNAL_STEPS:
+                    raise ValueError(f"Unknown preprocessing step: {step}")
+                node = node.children.setdefault(step, self._Node(step))
+                node.uses += 1
+            node.outputs.append(name)
+
+        self.total_steps = sum(len(steps) for steps in pipelines.values())
+        self.distinct_steps = self._count_steps(self.root)
+        self.saved_seconds = 0.0  # Step time that would have been spent re-running shared prefixes
+        logging.info(
+            f"Compiled {len(self.names)} preprocessing pipelines: "
+            f"{self.distinct_steps} distinct steps instead of {self.total_steps}"
+        )
+
+    def _count_steps(self, node: "_Node") -> int:
+        return sum(1 + self._count_steps(child) for child in node.children.values())
+
+    def run(self, audio: np.array, timer: Optional[StepTimer] = None, **kwargs) -> Dict[str, np.array]:
+        """Runs every pipeline on the audio and returns each one's time-domain output.
+
+        Args:
+            audio (np.array | SpectralState): Input audio.
+            timer (StepTimer): Accumulates the time spent per step; a new one is used if None.
+            **kwargs: Step parameters, as for `AudioPreprocessor.preprocess_audio`.
+        """
+        state = audio if isinstance(audio, SpectralState) else SpectralState(audio, timer=timer)
+        kwargs = AudioPreprocessor._wrap_reference(kwargs, state.timer)
+
+        outputs = {}
+        stack = [(self.root, state)]
+        while stack:
+            node, state = stack.pop()
+            for name in node.outputs:
+                outputs[name] = state.signal
+            for child in node.children.values():
+                started = time.perf_counter()
+                child_state = AudioPreprocessor.apply_step(state, child.step, **kwargs)
+                self.saved_seconds += (time.perf_counter() - started) * (child.uses - 1)
+                stack.append((child, child_state))
+        return {name: outputs[name] for name in self.names}
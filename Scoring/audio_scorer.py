@@ -1,14 +1,16 @@
 import librosa
 import logging
 import numpy as np
-from typing import Callable, Dict
+from typing import Callable, Dict, Optional, Tuple
 from dtw_helper import DTWHelper
+from pitch_tracker import PitchTracker
 from Levenshtein import distance as levenshtein_distance
 from audio_vis import AudioVis
 from IPython.display import display, Markdown
 import matplotlib.pyplot as plt
 from IPython.display import set_matplotlib_formats
 import io
+import time
 import contextlib
 import base64
 set_matplotlib_formats('png')
@@ -22,6 +24,8 @@ class AudioScorer:
         self.dtw_helper = DTWHelper(method=dtw_method)
         self.av = AudioVis('../data/temp')
         self.lyrics = None # temp variable to store lyrics
+        self.pitch_tracker = None  # Streaming tracker of the user's pitch, created on first use
+        self.score_timings = {}  # Seconds spent in each scoring function for the last chunk
 
         self.scoring_functions = {
             "linguistic_accuracy_score": self.linguistic_accuracy_score,
@@ -59,7 +63,11 @@ class AudioScorer:
         sr = kwargs.get('sr')
         from_file = kwargs.get('from_file', False)
         user_transcription = self.transcriber.transcribe(user_audio, sr, from_file=from_file)
-        original_transcription = self.transcriber.transcribe(reference_audio, sr, from_file=from_file)
+
+        # Use the precomputed transcript of the original singer for this window when available
+        original_transcription = kwargs.get('reference_text')
+        if original_transcription is None:
+            original_transcription = self.transcriber.transcribe(reference_audio, sr, from_file=from_file)
 
             # Function to generate debugging output
         def generate_debug_output(self):
@@ -119,15 +127,36 @@ class AudioScorer:
         reference_audio_downsampled = librosa.resample(reference_audio, orig_sr=sr, target_sr=new_sample_rate)
         return self.compute_dtw_score(user_audio_downsampled.flatten(), reference_audio_downsampled.flatten())
 
+    def _get_pitch_tracker(self, sr: int) -> PitchTracker:
+        if self.pitch_tracker is None or self.pitch_tracker.sr != sr:
+            self.pitch_tracker = PitchTracker(sr)
+        return self.pitch_tracker
+
+    def reset_pitch_tracker(self):
+        """Forgets the user's samples carried over by the pitch tracker, e.g. when a new song starts."""
+        if self.pitch_tracker is not None:
+            self.pitch_tracker.reset()
+
     def pitch_matching_score(self, user_audio: np.ndarray, reference_audio: np.ndarray, **kwargs) -> float:
-        """Pitch matching score."""
-        user_pitch, _, _ = librosa.pyin(user_audio, fmin=librosa.note_to_hz("C2"), fmax=librosa.note_to_hz("C7"))
-        reference_pitch, _, _ = librosa.pyin(
-            reference_audio, fmin=librosa.note_to_hz("C2"), fmax=librosa.note_to_hz("C7")
-        )
-        user_pitch = user_pitch[~np.isnan(user_pitch)]
-        reference_pitch = reference_pitch[~np.isnan(reference_pitch)]
-        return self.dtw_helper.compute_similarity_dtaidistance(user_pitch, reference_pitch)
+        """Pitch matching score, comparing the voiced pitch contours in cents."""
+        tracker = self._get_pitch_tracker(kwargs.get('sr'))
+        # The tracker carries the tail of the previous chunk over, which only lines up with the raw chunk:
+        # trimming or per-segment normalisation would splice incoherent samples at the boundary
+        raw_user_audio = kwargs.get('raw_user_audio')
+        user_pitch, user_voiced = tracker.process(user_audio if raw_user_audio is None else raw_user_audio)
+
+        # Use the reference contour precomputed for this window when available
+        reference_pitch = kwargs.get('reference_pitch')
+        if reference_pitch is None:
+            reference_pitch = tracker.estimate(reference_audio)
+        reference_pitch, reference_voiced = reference_pitch
+
+        user_cents = PitchTracker.hz_to_cents(user_pitch[user_voiced])
+        reference_cents = PitchTracker.hz_to_cents(reference_pitch[reference_voiced])
+        if len(user_cents) == 0 or len(reference_cents) == 0:
+            return 0.0
+        # Distance in semitones (100 cents) keeps the similarity on the scale of the other DTW scores
+        return self.dtw_helper.compute_similarity_dtaidistance(user_cents / 100, reference_cents / 100)
 
     def rhythm_score(self, user_audio: np.ndarray, reference_audio: np.ndarray, **kwargs) -> float:
         """Rhythm score."""
@@ -141,18 +170,27 @@ class AudioScorer:
         processed_original_data: Dict[str, np.ndarray],
         actual_lyrics: str,
         sr: int,
-        from_file: bool = False
+        from_file: bool = False,
+        reference_text: Optional[str] = None,
+        reference_pitch: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        raw_audio_chunk: Optional[np.ndarray] = None
     ) -> Dict[str, float]:
         """Compute scores for an audio chunk."""
         scores = {}
+        self.score_timings = {}
         for score_name, scoring_function in self.scoring_functions.items():
             kwargs = {
                 'sr': sr,
                 'actual_lyrics': actual_lyrics,
                 'reference_audio': processed_original_data[score_name],
-                'from_file': from_file
+                'from_file': from_file,
+                'reference_text': reference_text,
+                'reference_pitch': reference_pitch,
+                'raw_user_audio': raw_audio_chunk
             }
             user_audio = processed_audio_chunk_data[score_name]
+            started = time.perf_counter()
             scores[score_name] = scoring_function(user_audio, **kwargs)
+            self.score_timings[score_name] = time.perf_counter() - started
         print(f"Scores: {scores}")
         return scores
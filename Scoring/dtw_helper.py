@@ -1,14 +1,86 @@
 import numpy as np
 import dtaidistance
 from fastdtw import fastdtw
+from numba import njit, prange
 from scipy.spatial.distance import euclidean
+from typing import List, Optional, Tuple
+
+
+@njit(cache=True, nogil=True)
+def _banded_dtw(x: np.ndarray, y: np.ndarray, band: float, max_dist_sq: float) -> float:
+    """DTW distance of two (length, dims) sequences within a Sakoe-Chiba band around the diagonal.
+
+    Only the band of each row is computed, with two rows of memory. Returns inf as soon as every
+    cell of a row exceeds max_dist_sq, since no warping path through that row can end below it.
+    """
+    n, m, dims = x.shape[0], y.shape[0], x.shape[1]
+    if n == 0 or m == 0:
+        return np.inf
+    # A single row has to reach every column of y, since the path runs from (1, 1) to (1, m)
+    slope = (m - 1) / (n - 1) if n > 1 else float(m - 1)
+    # The band must be at least as wide as the diagonal's slope for a path to exist
+    radius = max(band * max(n, m), slope, 1.0)
+
+    previous = np.full(m + 1, np.inf)
+    current = np.full(m + 1, np.inf)
+    previous[0] = 0.0
+    previous_lo, previous_hi = 1, 0
+    for i in range(1, n + 1):
+        center = (i - 1) * slope
+        lo = max(1, int(np.ceil(center - radius)) + 1)
+        hi = min(m, int(np.floor(center + radius)) + 1)
+        row_min = np.inf
+        for j in range(lo, hi + 1):
+            cost = 0.0
+            for k in range(dims):
+                difference = x[i - 1, k] - y[j - 1, k]
+                cost += difference * difference
+            best = previous[j - 1]
+            if previous[j] < best:
+                best = previous[j]
+            if current[j - 1] < best:
+                best = current[j - 1]
+            current[j] = cost + best
+            if current[j] < row_min:
+                row_min = current[j]
+        if row_min > max_dist_sq:
+            return np.inf
+        # Clear the row that becomes the next `current`, so cells outside the band stay at inf
+        for j in range(previous_lo - 1, previous_hi + 1):
+            previous[j] = np.inf
+        previous, current = current, previous
+        previous_lo, previous_hi = lo, hi
+    return np.sqrt(previous[m])
+
+
+@njit(cache=True, parallel=True)
+def _banded_dtw_batch(
+    xs: np.ndarray, x_offsets: np.ndarray, ys: np.ndarray, y_offsets: np.ndarray, band: float, max_dist_sq: float
+) -> np.ndarray:
+    """Banded DTW of many pairs in parallel; pair p is xs[x_offsets[p]:x_offsets[p + 1]] vs the same slice of ys."""
+    distances = np.empty(len(x_offsets) - 1)
+    for p in prange(len(distances)):
+        distances[p] = _banded_dtw(
+            xs[x_offsets[p] : x_offsets[p + 1]], ys[y_offsets[p] : y_offsets[p + 1]], band, max_dist_sq
+        )
+    return distances
 
 
 class DTWHelper:
     """Helper class for Dynamic Time Warping computations."""
 
-    def __init__(self, method: str = 'fastdtw'):
+    def __init__(self, method: str = 'fastdtw', band: float = 0.1, max_dist: Optional[float] = None):
+        """
+        Args:
+            method (str): DTW backend: 'fastdtw', 'dtaidistance', 'dtaidistance_fast' or 'banded'.
+            band (float): Sakoe-Chiba band radius of the 'banded' backend, as a fraction of the
+                longer sequence's length.
+            max_dist (float): Distance above which the 'banded' backend abandons a pair early and
+                reports a similarity of 0; None to always finish.
+        """
         self.method = method
+        self.band = band
+        self.max_dist = max_dist
 
     def compute_similarity(self, seq1: np.ndarray, seq2: np.ndarray) -> float:
         """Compute DTW similarity between two sequences."""
@@ -18,6 +90,8 @@ class DTWHelper:
             return DTWHelper.compute_similarity_dtaidistance(seq1, seq2)
         elif self.method == 'dtaidistance_fast':
             return DTWHelper.compute_similarity_dtaidistance_fast(seq1, seq2)
+        elif self.method == 'banded':
+            return DTWHelper.compute_similarity_banded(seq1, seq2, self.band, self.max_dist)
         else:
             raise ValueError(f"Unknown DTW method: {self.method}")
 
@@ -49,3 +123,61 @@ class DTWHelper:
         distance = dtaidistance.dtw.distance(seq1, seq2, **options)
         normalized_distance = distance / (len(seq2) + len(seq1))
         return 1 / (1 + normalized_distance)
+
+    @staticmethod
+    def _as_frames(seq: np.ndarray) -> np.ndarray:
+        """Shape a sequence as (length, dims) float64: 1-D inputs, empty ones included, get one dimension."""
+        seq = np.asarray(seq, dtype=np.float64)
+        return np.ascontiguousarray(seq.reshape(len(seq), int(np.prod(seq.shape[1:]))))
+
+    @staticmethod
+    def distance_banded(
+        seq1: np.ndarray, seq2: np.ndarray, band: float = 0.1, max_dist: Optional[float] = None
+    ) -> float:
+        """DTW distance within a Sakoe-Chiba band, compiled to native code.
+
+        Sequences are 1-D or (length, dims), e.g. MFCCs transposed to one row per frame. Returns inf
+        if the distance is known to exceed max_dist, or if either sequence is empty, e.g. after trimming
+        silence.
+        """
+        max_dist_sq = np.inf if max_dist is None else max_dist**2
+        return _banded_dtw(DTWHelper._as_frames(seq1), DTWHelper._as_frames(seq2), band, max_dist_sq)
+
+    @staticmethod
+    def distances_banded(
+        pairs: List[Tuple[np.ndarray, np.ndarray]], band: float = 0.1, max_dist: Optional[float] = None
+    ) -> np.ndarray:
+        """Banded DTW distances of many (seq1, seq2) pairs, evaluated in parallel."""
+        if not pairs:
+            return np.zeros(0)
+        firsts = [DTWHelper._as_frames(seq1) for seq1, _ in pairs]
+        seconds = [DTWHelper._as_frames(seq2) for _, seq2 in pairs]
+        if len({seq.shape[1] for seq in firsts + seconds}) != 1:
+            raise ValueError("All sequences must have the same number of dimensions")
+        x_offsets = np.concatenate(([0], np.cumsum([len(seq) for seq in firsts])))
+        y_offsets = np.concatenate(([0], np.cumsum([len(seq) for seq in seconds])))
+        max_dist_sq = np.inf if max_dist is None else max_dist**2
+        return _banded_dtw_batch(
+            np.concatenate(firsts), x_offsets, np.concatenate(seconds), y_offsets, band, max_dist_sq
+        )
+
+    @staticmethod
+    def compute_similarity_banded(
+        seq1: np.ndarray, seq2: np.ndarray, band: float = 0.1, max_dist: Optional[float] = None
+    ) -> float:
+        """Compute DTW similarity between two sequences using the banded native backend.
+
+        Empty sequences, which have no alignment, have a similarity of 0.
+        """
+        distance = DTWHelper.distance_banded(seq1, seq2, band, max_dist)
+        if np.isinf(distance):
+            return 0.0
+        normalized_distance = distance / (len(seq2) + len(seq1))
+        return 1 / (1 + normalized_distance)
+
+    def compute_similarity_batch(self, pairs: List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Compute the similarity of many (seq1, seq2) pairs with the banded backend."""
+        distances = DTWHelper.distances_banded(pairs, self.band, self.max_dist)
+        # Pairs of two empty sequences are inf / 1 rather than inf / 0, so they score 0 like other empty pairs
+        lengths = np.array([max(len(seq1) + len(seq2), 1) for seq1, seq2 in pairs], dtype=float)
+        return 1 / (1 + distances / lengths)
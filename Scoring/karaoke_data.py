@@ -1,8 +1,10 @@
+import os
 import librosa
 import logging
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Union, Tuple
+from typing import Tuple, Optional
+from lyric_timeline import LyricTimeline
+from reference_transcripts import ReferenceTranscript
 
 
 class KaraokeData:
@@ -23,49 +25,55 @@ class KaraokeData:
         self.current_position = 0
         self.previous_position = 0
         self.initial_alignment_done = False
+        self.reset_listeners = []  # Called without arguments whenever the alignment is reset
         self.lyrics_data = self._parse_lyrics(raw_lyrics_data)
+        self.reference_transcript = None
 
-    def get_lyrics(self, start_time: float = None, end_time: float = None) -> List[str]:
+    def build_reference_transcript(self, transcriber, cache_path: Optional[str] = None) -> ReferenceTranscript:
+        """Transcribes the original singer once per lyric line, or loads a previously saved transcript.
+
+        Args:
+            transcriber: Transcription strategy used on the original (voice) track.
+            cache_path (str): Optional JSON file the transcript is loaded from, or saved to once built.
+        """
+        if cache_path and os.path.exists(cache_path):
+            self.reference_transcript = ReferenceTranscript.load(cache_path)
+            return self.reference_transcript
+
+        duration = len(self.original_audio) / self.sampling_rate
+        windows = ReferenceTranscript.line_windows(self.lyrics_data, duration)
+        self.reference_transcript = ReferenceTranscript.build(
+            self.original_audio, self.sampling_rate, transcriber, windows
+        )
+        if cache_path:
+            self.reference_transcript.save(cache_path)
+        return self.reference_transcript
+
+    def get_reference_text(self, start_time: float = None, end_time: float = None) -> Optional[str]:
+        """Fetches the original singer's words between the specified start and end times.
+
+        Returns None if no reference transcript was built.
+        """
+        if self.reference_transcript is None:
+            return None
+        start_time = start_time or librosa.samples_to_time(self.previous_position, sr=self.sampling_rate)
+        end_time = end_time or librosa.samples_to_time(self.current_position, sr=self.sampling_rate)
+        return self.reference_transcript.get_text(start_time, end_time)
+
+    def get_lyrics(self, start_time: float = None, end_time: float = None) -> str:
         """Fetches the lyrics between the specified start and end times."""
 
         start_time = start_time or librosa.samples_to_time(self.previous_position, sr=self.sampling_rate)
         end_time = end_time or librosa.samples_to_time(self.current_position, sr=self.sampling_rate)
+        return self.lyrics_data.transform_between(start_time, end_time)
 
-        lyrics_within_interval = []
-        for entry in self.lyrics_data:
-            if start_time <= entry["time"] <= end_time:
-                lyrics_within_interval.append(entry["lyrics"])
-        return self._transform_lyrics(lyrics_within_interval)
-
-    def _transform_lyrics(self, lyrics_list):
-        transformed_lyrics = ""
-        word = ""
-        for syllable in lyrics_list:
-            if "\\n" in syllable:
-                parts = syllable.split("\\n")
-                word += parts[0]
-                transformed_lyrics += word.strip() + "\n"
-                word = parts[1] + " "
-            else:
-                word += syllable + " "
-        transformed_lyrics += word.strip()
-        return transformed_lyrics
-
-    def _parse_lyrics(self, raw_lyrics: str) -> List[Dict[str, Union[float, str]]]:
-        """Converts raw CSV lyrics into a structured format."""
+    def _parse_lyrics(self, raw_lyrics: str) -> LyricTimeline:
+        """Converts raw CSV lyrics into a lyric timeline."""
         try:
-            # Load the CSV data
-            csv_data = pd.read_csv(raw_lyrics)
-            csv_data = csv_data[csv_data["payload_type"] == 1]
-            parsed_lyrics = [
-                {"time": row["start_time"], "lyrics": row["payload"].strip()} for _, row in csv_data.iterrows()
-            ]
-
+            return LyricTimeline.from_csv(raw_lyrics)
         except Exception as e:
             logging.error(f"Error parsing CSV lyrics: {e}")
-            parsed_lyrics = []
-
-        return parsed_lyrics
+            return LyricTimeline.empty()
 
     def align_audio(self, audio_chunk: np.array, method: str = "cross_correlation"):
         """Aligns the audio using the specified method."""
@@ -101,7 +109,7 @@ class KaraokeData:
     def _align_lyrics_data(self, audio_chunk: np.array):
         """Aligns the audio using the first entry in lyrics data."""
         if self.lyrics_data and not self.initial_alignment_done:
-            start_time = self.lyrics_data[0]["time"]
+            start_time = self.lyrics_data.times[0]
             self.current_position = librosa.time_to_samples(start_time, sr=self.sampling_rate)
             self.initial_alignment_done = True
 
@@ -126,6 +134,9 @@ class KaraokeData:
         return onset_position_in_chunk
 
     def reset_alignment(self):
-        """Resets the alignment state."""
+        """Resets the alignment state and notifies `reset_listeners`."""
         self.current_position = 0
+        self.previous_position = 0
         self.initial_alignment_done = False
+        for listener in self.reset_listeners:
+            listener()
@@ -1,8 +1,12 @@
 from karaoke_data import KaraokeData
 from audio_scorer import AudioScorer
-from audio_preprocessor import AudioPreprocessor
-from google_speech import GoogleSpeechTranscription
-from typing import List, Dict, Union, Tuple, Callable
+from audio_preprocessor import AudioPreprocessor, PreprocessingTree, SpectralState, StepTimer
+from pitch_tracker import PitchTracker
+from transcription_service import TranscriptionService
+from typing import List, Dict, Union, Tuple, Callable, Optional
+from contextlib import contextmanager
+import time
+import logging
 import numpy as np
 
 
@@ -12,15 +16,30 @@ class Pipeline:
                  track_audio: np.array,
                  raw_lyrics_data: str,
                  sr: int,
-                 pipelines: Dict[str, Dict[str, List[str]]]):
+                 pipelines: Dict[str, Dict[str, List[str]]],
+                 reference_transcript_path: Optional[str] = None,
+                 precompute_reference_transcript: bool = True,
+                 transcriber=None):
 
         self.sr = sr
         self.pipelines = pipelines
+        self._preprocessing_trees = {}
+        self.stage_timings = {}  # Seconds spent in each stage of the last chunk
 
         # Initialize components
         self.ap = AudioPreprocessor()
-        self.audio_scorer = AudioScorer(GoogleSpeechTranscription(), 'dtaidistance_fast')
+        self.audio_scorer = AudioScorer(transcriber or TranscriptionService.shared("google"), 'banded')
         self.karaoke_data = self._initialize_karaoke_data(original_audio, track_audio, raw_lyrics_data, sr)
+        # A new song, or a restart of this one, must not continue the pitch frames of the previous take
+        self.karaoke_data.reset_listeners.append(self._on_alignment_reset)
+        self.audio_scorer.reset_pitch_tracker()
+
+        # Transcribe the original singer once up front instead of once per chunk
+        if precompute_reference_transcript:
+            self.karaoke_data.build_reference_transcript(self.audio_scorer.transcriber, reference_transcript_path)
+
+        # Pitch contour of the original singer, computed once per song and indexed by frame
+        self.reference_pitch = PitchTracker(sr).contour(self.karaoke_data.original_audio)
 
         # Track scores and chunks
         self._reset_scores()
@@ -34,6 +53,11 @@ class Pipeline:
         """Helper method to initialize the KaraokeData instance."""
         return KaraokeData(original_audio, track_audio, raw_lyrics_data, sr)
 
+    def _on_alignment_reset(self):
+        """Start over from the next chunk: realign it and drop the user's pitch history."""
+        self.initialized = False
+        self.audio_scorer.reset_pitch_tracker()
+
     def _reset_scores(self):
         """Reset cumulative scores and chunk count."""
         self.cumulative_scores = {
@@ -44,28 +68,70 @@ class Pipeline:
             "rhythm_score": 0,
         }
         self.chunk_count = 0
+        self.cumulative_preprocessing_timings = {}
+
+    def _preprocessing_tree(self, audio_type: str) -> PreprocessingTree:
+        """Compile the per-score pipelines of an audio type into a prefix tree, once."""
+        if audio_type not in self._preprocessing_trees:
+            self._preprocessing_trees[audio_type] = PreprocessingTree(
+                {score_name: pipeline[audio_type] for score_name, pipeline in self.pipelines.items()}
+            )
+        return self._preprocessing_trees[audio_type]
 
     def _preprocess_audio(self, audio: np.array, audio_type: str, **kwargs) -> Dict[str, np.array]:
-        """Preprocess audio (either chunk or original) using the specified pipeline."""
-        return {
-            score_name: self.ap.preprocess_audio(audio, pipeline[audio_type], sr=self.sr, **kwargs)
-            for score_name, pipeline in self.pipelines.items()
-        }
+        """Preprocess audio (either chunk or original) using the specified pipeline.
+
+        Steps shared by the start of several scores' pipelines run once per chunk.
+        """
+        return self._preprocessing_tree(audio_type).run(audio, sr=self.sr, **kwargs)
+
+    def _record_preprocessing_timings(self, timer: StepTimer):
+        """Add one chunk's per-step preprocessing times to the running totals."""
+        for step, seconds in timer.totals.items():
+            self.cumulative_preprocessing_timings[step] = self.cumulative_preprocessing_timings.get(step, 0.0) + seconds
+
+    @contextmanager
+    def _timed(self, stage: str):
+        """Add the time spent in the block to the stage's entry in `stage_timings`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + time.perf_counter() - started
 
     def process_and_score(self, audio_chunk: np.array) -> Dict[str, float]:
         """Process and score a single audio chunk."""
-        if not self.initialized:
-            self.karaoke_data.align_audio(audio_chunk, method="start")
-            self.initialized = True
-
-        original_segment, reference_audio = self.karaoke_data.get_next_segment(len(audio_chunk))
-
-        # Process audio data
-        processed_audio_chunk_data = self._preprocess_audio(audio_chunk, "chunk", reference_audio=reference_audio)
-        processed_original_data = self._preprocess_audio(original_segment, "original", reference_audio=reference_audio)
-
-        scores = self._compute_scores(processed_audio_chunk_data, processed_original_data)
-        feedback = self._generate_feedback(scores)
+        self.stage_timings = {}
+        with self._timed("align"):
+            if not self.initialized:
+                self.karaoke_data.align_audio(audio_chunk, method="start")
+                self.initialized = True
+
+            original_segment, reference_audio = self.karaoke_data.get_next_segment(len(audio_chunk))
+
+        # Process audio data; the reference STFT is computed at most once for all pipelines
+        with self._timed("preprocess"):
+            timer = StepTimer()
+            reference_state = SpectralState(reference_audio, timer=timer)
+            processed_audio_chunk_data = self._preprocess_audio(
+                audio_chunk, "chunk", reference_audio=reference_state, timer=timer
+            )
+            processed_original_data = self._preprocess_audio(
+                original_segment, "original", reference_audio=reference_state, timer=timer
+            )
+        self._record_preprocessing_timings(timer)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "Preprocessing step costs: %s; shared prefixes saved %.1fms in total",
+                ", ".join(f"{step}={seconds * 1000:.1f}ms" for step, seconds in timer.totals.items()),
+                self.get_preprocessing_savings() * 1000,
+            )
+
+        scores = self._compute_scores(processed_audio_chunk_data, processed_original_data, audio_chunk)
+        for score_name, seconds in self.audio_scorer.score_timings.items():
+            self.stage_timings[f"score:{score_name}"] = seconds
+        with self._timed("feedback"):
+            feedback = self._generate_feedback(scores)
 
         # Update cumulative scores and chunk count
         for score_name, score_value in scores.items():
@@ -76,14 +142,18 @@ class Pipeline:
 
     def _compute_scores(self,
                         processed_audio_chunk_data: Dict[str, np.array],
-                        processed_original_data: Dict[str, np.array]) -> Dict[str, float]:
-        """Compute scores for processed audio data."""
+                        processed_original_data: Dict[str, np.array],
+                        raw_audio_chunk: np.array) -> Dict[str, float]:
+        """Compute scores for processed audio data; the raw chunk feeds the streaming pitch tracker."""
         return self.audio_scorer.process_audio_chunk(
             processed_audio_chunk_data,
             processed_original_data,
             self.karaoke_data.get_lyrics(),
             self.sr,
-            True
+            True,
+            self.karaoke_data.get_reference_text(),
+            self.reference_pitch.between(self.karaoke_data.previous_position, self.karaoke_data.current_position),
+            raw_audio_chunk
         )
 
     def get_average_scores(self) -> Dict[str, float]:
@@ -93,6 +163,17 @@ class Pipeline:
             for score_name, score_value in self.cumulative_scores.items()
         }
 
+    def get_preprocessing_timings(self) -> Dict[str, float]:
+        """Average seconds per chunk spent in each preprocessing step, including stft/istft conversions."""
+        return {
+            step: seconds / self.chunk_count
+            for step, seconds in self.cumulative_preprocessing_timings.items()
+        } if self.chunk_count else {}
+
+    def get_preprocessing_savings(self) -> float:
+        """Total seconds of step time saved so far by running shared pipeline prefixes once."""
+        return sum(tree.saved_seconds for tree in self._preprocessing_trees.values())
+
     def _generate_feedback(self, scores: Dict[str, float]) -> str:
         """Generate feedback based on the given scores."""
         feedback_messages = {
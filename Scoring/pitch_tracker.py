@@ -0,0 +1,164 @@
+import librosa
+import numpy as np
+from typing import Tuple
+
+
+class PitchContour:
+    """Frame-indexed pitch contour of a whole signal.
+
+    Frame `i` covers samples [i * hop_length, i * hop_length + frame_length).
+    """
+
+    def __init__(self, f0: np.ndarray, voiced: np.ndarray, hop_length: int):
+        self.f0 = f0
+        self.voiced = voiced
+        self.hop_length = hop_length
+
+    def between(self, start_sample: int, end_sample: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (f0, voiced) of the frames starting within [start_sample, end_sample)."""
+        first = -(-start_sample // self.hop_length)
+        last = -(-end_sample // self.hop_length)
+        return self.f0[first:last], self.voiced[first:last]
+
+
+class PitchTracker:
+    """Streaming YIN fundamental-frequency estimator tuned to the singing voice.
+
+    All frames of a call are evaluated at once: the YIN difference function of every frame comes
+    from one batched FFT, and the first dip below `threshold` is found with array operations, so
+    there is no per-frame Python loop and no Viterbi decoding. `process` keeps the samples of the
+    last incomplete frame, so frames straddling chunk boundaries are not lost.
+    """
+
+    def __init__(
+        self,
+        sr: int,
+        fmin: float = librosa.note_to_hz("C2"),
+        fmax: float = librosa.note_to_hz("C6"),
+        frame_length: int = 2048,
+        hop_length: int = 512,
+        threshold: float = 0.1,
+        rms_floor: float = 1e-3,
+    ):
+        """
+        Args:
+            sr (int): Sample rate of the audio.
+            fmin (float): Lowest detectable pitch in Hz.
+            fmax (float): Highest detectable pitch in Hz.
+            frame_length (int): Samples per analysis frame.
+            hop_length (int): Samples between consecutive frames.
+            threshold (float): YIN aperiodicity threshold; frames without a dip below it are unvoiced.
+            rms_floor (float): Frames quieter than this RMS are treated as silence (unvoiced).
+        """
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.threshold = threshold
+        self.rms_floor = rms_floor
+        self.min_period = max(1, int(np.floor(sr / fmax)))
+        self.max_period = int(np.ceil(sr / fmin))
+        self.win_length = frame_length - self.max_period
+        if self.win_length < self.max_period:
+            raise ValueError(
+                f"frame_length={frame_length} is too short for fmin={fmin:.1f} Hz at sr={sr}; "
+                f"it must be at least {2 * self.max_period} samples"
+            )
+        self.reset()
+
+    def reset(self):
+        """Forgets the samples carried over from the previous chunk."""
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self.frames_processed = 0
+
+    def process(self, chunk: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Estimates the pitch of every frame completed by this chunk.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: f0 in Hz (NaN where unvoiced) and the voiced flags.
+        """
+        buffer = np.concatenate((self._buffer, np.asarray(chunk, dtype=np.float32)))
+        f0, voiced = self.estimate(buffer)
+        self._buffer = buffer[len(f0) * self.hop_length :]
+        self.frames_processed += len(f0)
+        return f0, voiced
+
+    def contour(self, audio: np.ndarray, block_seconds: float = 30.0) -> PitchContour:
+        """Computes the frame-indexed contour of a whole signal, in blocks to bound memory.
+
+        Does not touch the streaming state of `process`.
+        """
+        block_frames = max(1, int(block_seconds * self.sr) // self.hop_length)
+        block_span = (block_frames - 1) * self.hop_length + self.frame_length
+        f0s, voiced = [np.zeros(0)], [np.zeros(0, dtype=bool)]
+        for start in range(0, len(audio), block_frames * self.hop_length):
+            block_f0, block_voiced = self.estimate(audio[start : start + block_span])
+            f0s.append(block_f0)
+            voiced.append(block_voiced)
+        return PitchContour(np.concatenate(f0s), np.concatenate(voiced), self.hop_length)
+
+    def estimate(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Estimates the pitch of every complete frame of a signal (no centering or padding)."""
+        if len(audio) < self.frame_length:
+            return np.zeros(0), np.zeros(0, dtype=bool)
+        frames = librosa.util.frame(
+            np.ascontiguousarray(audio, dtype=np.float64),
+            frame_length=self.frame_length,
+            hop_length=self.hop_length,
+            axis=0,
+        )
+
+        cmnd = self._cumulative_mean_normalized_difference(frames)
+        candidates = cmnd[:, self.min_period : self.max_period + 1]
+
+        # First local minimum below the threshold, as in YIN; fall back to the global minimum
+        below = candidates < self.threshold
+        local_min = np.zeros_like(below)
+        local_min[:, 1:-1] = (candidates[:, 1:-1] <= candidates[:, :-2]) & (candidates[:, 1:-1] <= candidates[:, 2:])
+        dips = below & local_min
+        voiced = dips.any(axis=1)
+        index = np.where(voiced, dips.argmax(axis=1), candidates.argmin(axis=1))
+
+        # Parabolic interpolation of the dip for sub-sample periods
+        rows = np.arange(len(index))
+        left = candidates[rows, np.maximum(index - 1, 0)]
+        center = candidates[rows, index]
+        right = candidates[rows, np.minimum(index + 1, candidates.shape[1] - 1)]
+        curvature = left - 2 * center + right
+        safe_curvature = np.where(np.abs(curvature) > 1e-12, curvature, np.inf)
+        shift = 0.5 * (left - right) / safe_curvature
+        period = self.min_period + index + np.clip(shift, -1, 1)
+
+        rms = np.sqrt(np.mean(frames[:, : self.win_length] ** 2, axis=1))
+        voiced &= rms >= self.rms_floor
+        f0 = np.where(voiced, self.sr / period, np.nan)
+        return f0, voiced
+
+    def _cumulative_mean_normalized_difference(self, frames: np.ndarray) -> np.ndarray:
+        """YIN's cumulative mean normalized difference d'(tau) for tau in [0, max_period], per frame."""
+        n_fft = self.frame_length
+        window = frames[:, : self.win_length]
+
+        # r(tau) = sum_j x[j] x[j + tau] over the first win_length samples, for all frames at once
+        spectrum = np.conj(np.fft.rfft(window, n_fft, axis=1)) * np.fft.rfft(frames, n_fft, axis=1)
+        acf = np.fft.irfft(spectrum, n_fft, axis=1)
+        acf = acf[:, : self.max_period + 1]
+
+        # Energy of x[tau : tau + win_length] from a running sum of squares
+        squares = np.concatenate((np.zeros((len(frames), 1)), np.cumsum(frames**2, axis=1)), axis=1)
+        taus = np.arange(self.max_period + 1)
+        energy = squares[:, taus + self.win_length] - squares[:, taus]
+
+        difference = np.maximum(energy[:, :1] + energy - 2 * acf, 0)
+        cumulative_mean = np.cumsum(difference[:, 1:], axis=1) / taus[1:]
+        cmnd = np.ones_like(difference)
+        cmnd[:, 1:] = difference[:, 1:] / np.maximum(cumulative_mean, np.finfo(float).tiny)
+        return cmnd
+
+    @staticmethod
+    def hz_to_cents(f0: np.ndarray, reference_hz: float = librosa.note_to_hz("C1")) -> np.ndarray:
+        """Converts frequencies to cents above a reference pitch."""
+        return 1200 * np.log2(np.asarray(f0) / reference_hz)
+
+    def frame_times(self, n_frames: int, first_frame: int = 0) -> np.ndarray:
+        """Centre time in seconds of frames [first_frame, first_frame + n_frames)."""
+        return ((first_frame + np.arange(n_frames)) * self.hop_length + self.frame_length / 2) / self.sr
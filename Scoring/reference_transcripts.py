@@ -0,0 +1,92 @@
+import os
+import json
+import logging
+import numpy as np
+from typing import List, Tuple
+from lyric_timeline import LyricTimeline
+
+logging.basicConfig(level=logging.INFO)
+
+
+class ReferenceTranscript:
+    """Word-level transcript of the original singer, aligned to the song timeline.
+
+    The voice track is transcribed once per lyric line (at ingest time rather than per chunk),
+    and the words of each line are spread evenly over the line's time window. Chunks then look up
+    the words whose midpoint falls inside their window instead of calling the ASR engine.
+    """
+
+    FORMAT_VERSION = 1
+    MAX_WINDOW_SECONDS = 30.0  # Longest segment sent to the engine in one call
+
+    def __init__(self, words: List[str], starts: np.ndarray, ends: np.ndarray):
+        self.words = list(words)
+        self.starts = np.asarray(starts, dtype=float)
+        self.ends = np.asarray(ends, dtype=float)
+        self._midpoints = (self.starts + self.ends) / 2
+
+    @classmethod
+    def line_windows(cls, lyrics: LyricTimeline, duration: float) -> List[Tuple[float, float]]:
+        """Split the song into transcription windows, one per lyric line.
+
+        A line starts at its first syllable and ends where the next line starts. Songs without
+        lyrics are split into fixed windows. Windows longer than MAX_WINDOW_SECONDS are split evenly.
+        """
+        line_starts = lyrics.line_start_times().tolist() or [0.0]
+
+        windows = []
+        for start, end in zip(line_starts, line_starts[1:] + [duration]):
+            if end <= start:
+                continue
+            parts = int(np.ceil((end - start) / cls.MAX_WINDOW_SECONDS))
+            edges = np.linspace(start, end, parts + 1)
+            windows.extend(zip(edges[:-1], edges[1:]))
+        return windows
+
+    @classmethod
+    def build(cls, audio: np.ndarray, sr: int, transcriber, windows: List[Tuple[float, float]]) -> "ReferenceTranscript":
+        """Transcribe each window of the voice track once and timestamp its words."""
+        words, starts, ends = [], [], []
+        for start, end in windows:
+            segment = audio[int(start * sr) : int(end * sr)]
+            if len(segment) == 0:
+                continue
+            # from_file=True: the strategies take the decoded array as is
+            segment_words = transcriber.transcribe(segment, sr, from_file=True).split()
+            if not segment_words:
+                continue
+            edges = np.linspace(start, end, len(segment_words) + 1)
+            words.extend(segment_words)
+            starts.extend(edges[:-1])
+            ends.extend(edges[1:])
+        logging.info(f"Transcribed reference track: {len(words)} words in {len(windows)} windows")
+        return cls(words, starts, ends)
+
+    def get_text(self, start_time: float, end_time: float) -> str:
+        """Return the reference words whose midpoint lies in [start_time, end_time)."""
+        first, last = np.searchsorted(self._midpoints, [start_time, end_time], side="left")
+        return " ".join(self.words[first:last])
+
+    def save(self, path: str):
+        """Persist the transcript as JSON next to the song's other assets."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "version": self.FORMAT_VERSION,
+                    "words": self.words,
+                    "starts": self.starts.tolist(),
+                    "ends": self.ends.tolist(),
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceTranscript":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported reference transcript version in {path}: {data.get('version')}")
+        return cls(data["words"], data["starts"], data["ends"])
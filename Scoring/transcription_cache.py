@@ -0,0 +1,145 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Optional
+from transcription_service import Transcription
+
+logging.basicConfig(level=logging.INFO)
+
+
+def transcript_key(engine: str, audio, locale: str = None, sr: int = None) -> str:
+    """Builds the cache key of a transcription.
+
+    Args:
+        engine (str): Name of the engine (and model) producing the transcript.
+        audio (bytes | np.ndarray): Encoded audio bytes or decoded samples.
+        locale (str): Language of the transcription, if the engine takes one.
+        sr (int): Sample rate of decoded samples. Encoded audio carries its own, so it is ignored there.
+    """
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(f"{audio.dtype.str}{audio.shape}".encode())
+        audio = np.ascontiguousarray(audio)
+    else:
+        sr = None
+    digest.update(memoryview(audio).cast("B"))
+    return hashlib.sha256(f"{engine}|{locale}|{sr}|{digest.hexdigest()}".encode()).hexdigest()
+
+
+class CachedTranscription(Transcription):
+    """Wraps a transcription strategy with a cache keyed by (engine, locale, sr, audio hash).
+
+    The reference segment of a song window is the same for every user and chunk, so its
+    transcript is only requested from the engine once. Transcripts are kept in a bounded
+    in-memory LRU tier and, when `cache_dir` is set, in an on-disk tier that survives restarts.
+    Concurrent requests for the same key wait for the first transcription instead of calling the
+    engine again. Empty transcripts are not cached, since the strategies also return "" when a
+    call fails.
+    """
+
+    def __init__(
+        self,
+        transcription: Transcription,
+        engine: str,
+        locale: Optional[str] = None,
+        max_entries: int = 1024,
+        cache_dir: Optional[str] = None,
+    ):
+        self.transcription = transcription
+        self.engine = engine
+        self.locale = locale
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)["text"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _save(self, key: str, text: str):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".transcript-", dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            json.dump({"engine": self.engine, "locale": self.locale, "text": text}, f)
+        os.replace(temp_path, path)
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def transcribe(self, audio_data: np.ndarray, sr: int, from_file: bool = False) -> str:
+        # Arrays are keyed with their sample rate whether or not the strategy writes them to a file
+        key = transcript_key(self.engine, audio_data, self.locale, sr)
+        while True:
+            with self._lock:
+                text = self._entries.get(key)
+                if text is not None:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return text
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    pending = self._in_flight[key] = threading.Event()
+                    break
+            # Another caller is transcribing the same audio; wait and look it up again
+            pending.wait()
+
+        try:
+            text = self._load(key)
+            if text is not None:
+                with self._lock:
+                    self.disk_hits += 1
+            else:
+                with self._lock:
+                    self.misses += 1
+                text = self.transcription.transcribe(audio_data, sr, from_file)
+                if text:
+                    self._save(key, text)
+            if text:
+                self._remember(key, text)
+            return text
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set()
+
+    def stats(self) -> dict:
+        """Return cache occupancy and hit counters for both tiers."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "engine": self.engine,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
@@ -4,10 +4,12 @@ import openai
 import logging
 import librosa
 import tempfile
+import threading
 import numpy as np
 import scipy.io.wavfile as wav
 from google.oauth2 import service_account
 from google.cloud import speech_v1 as speech
+from typing import Optional
 
 logging.basicConfig(level=logging.INFO)
 
@@ -16,6 +18,8 @@ class Transcription:
         raise NotImplementedError
 
 class GoogleSpeechTranscription(Transcription):
+    LANGUAGE_CODE = "en-US"
+
     def __init__(self):
         client_file = "sa_speech_test.json"
         credentials = service_account.Credentials.from_service_account_file(client_file)
@@ -34,7 +38,7 @@ class GoogleSpeechTranscription(Transcription):
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
             sample_rate_hertz=sr,
-            language_code="en-US",
+            language_code=self.LANGUAGE_CODE,
             model="video",
         )
 
@@ -83,14 +87,46 @@ class WhisperSpeechTranscription(Transcription):
         return transcription
 
 class TranscriptionService:
-    def __init__(self, method: str):
+    SHARED_CACHE_SIZE = 1024
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, method: str) -> "TranscriptionService":
+        """Return the service for a method, creating it on first use and reusing it afterwards.
+
+        Creating a strategy is expensive (the Google client re-reads its credentials file), so
+        pipelines share one cached instance per method instead of building their own.
+        """
+        with cls._shared_lock:
+            if method not in cls._shared:
+                cls._shared[method] = cls(method, cache_size=cls.SHARED_CACHE_SIZE)
+            return cls._shared[method]
+
+    def __init__(self, method: str, cache_size: int = 0, cache_dir: Optional[str] = None):
+        """
+        Args:
+            method (str): "google" or "whisper".
+            cache_size (int): Transcripts kept in memory; 0 disables caching.
+            cache_dir (str): Optional directory for an on-disk transcript cache.
+        """
         self.strategy = None
         if method == "google":
             self.strategy = GoogleSpeechTranscription()
+            locale = GoogleSpeechTranscription.LANGUAGE_CODE
         elif method == "whisper":
             self.strategy = WhisperSpeechTranscription()
+            locale = None
         else:
             raise ValueError(f"Unsupported transcription method: {method}")
 
+        if cache_size > 0 or cache_dir:
+            from transcription_cache import CachedTranscription
+
+            self.strategy = CachedTranscription(
+                self.strategy, method, locale=locale, max_entries=max(cache_size, 1), cache_dir=cache_dir
+            )
+
     def transcribe(self, audio_data: np.ndarray, sr: int, from_file: bool = False) -> str:
         return self.strategy.transcribe(audio_data, sr, from_file)
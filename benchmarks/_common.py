@@ -0,0 +1,84 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import sys
+import json
+import glob
+import resource
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".ogg")
+
+
+def add_to_path(service: str):
+    """Make the flat modules of a service directory (e.g. "AIProcessingService") importable."""
+    path = os.path.join(REPO_ROOT, service)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def audio_files(audio_dir: str) -> list:
+    """Return the audio files of a directory in a fixed (sorted) order."""
+    files = sorted(
+        path for path in glob.glob(os.path.join(audio_dir, "*")) if path.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    if not files:
+        raise SystemExit(f"No audio files found in {audio_dir}")
+    return files
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of the current process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def summarize(samples) -> dict:
+    """Mean and tail percentiles of a list of measurements."""
+    values = np.asarray(samples, dtype=float)
+    if values.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def edit_distance(reference, hypothesis) -> int:
+    """Levenshtein distance between two sequences (characters of a string or a list of words)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_item in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_item in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_item != hyp_item)))
+        previous = current
+    return previous[-1]
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance normalised by the number of reference words."""
+    reference_words, hypothesis_words = reference.split(), hypothesis.split()
+    if not reference_words:
+        return float(bool(hypothesis_words))
+    return edit_distance(reference_words, hypothesis_words) / len(reference_words)
+
+
+def character_drift(reference: str, hypothesis: str) -> float:
+    """Character-level edit distance normalised by the length of the reference."""
+    if not reference:
+        return float(bool(hypothesis))
+    return edit_distance(reference, hypothesis) / len(reference)
+
+
+def write_results(results: dict, output: str = None):
+    """Print results as JSON and optionally write them to a file."""
+    text = json.dumps(results, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,309 @@
+"""Measure end-to-end per-chunk latency of Scoring.Pipeline and AIProcessingService.AudioProcessor.
+
+Every combination of target, song, chunk size and (for the Pipeline) preprocessing config runs in
+its own subprocess, so peak memory is measured per run. For each run the script reports:
+
+- per-chunk latency: mean, p50, p95, p99 and max
+- the time spent in each stage (the objects' `stage_timings`)
+- the real-time factor (processing time / audio duration) and peak RSS
+
+Songs are synthetic by default: a sung melody with lyrics, a backing track, and a detuned, delayed,
+noisy "user" take. Each length in --song-seconds yields one song. Fixture songs can be added with
+--fixture-dir. Each subdirectory there holds original.wav (the voice helper), track.wav and
+attempted.wav, and optionally lyrics.csv (start_time, payload_type, payload).
+
+ASR is replaced by a fixed-text transcriber with --asr-latency-ms of simulated latency, unless
+--asr google is given. AudioProcessor runs against a local HTTP server serving the song files, and
+requires the generated protobuf Declarations package to be importable.
+
+Results are JSON (--output), keyed so they can be diffed between commits.
+
+Usage:
+    python benchmarks/bench_chunk_latency.py [--targets pipeline audio_processor] \\
+        [--song-seconds 30 120] [--chunk-seconds 2 5] [--configs none notebook] \\
+        [--fixture-dir path/to/songs] [--asr mock|google] [--asr-latency-ms 0] [--output out.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import numpy as np
+import soundfile as sf
+import _common
+
+LINE_BREAK = "\\n"  # Marks the last syllable of a lyric line in lyrics.csv
+SCORES = ("linguistic_accuracy_score", "linguistic_similarity_score", "amplitude_score", "pitch_score", "rhythm_score")
+
+
+def _uniform(chunk_steps, original_steps):
+    return {score: {"chunk": list(chunk_steps), "original": list(original_steps)} for score in SCORES}
+
+
+# Preprocessing configs of the Pipeline target; "notebook" is the one used in Scoring/audio_score.ipynb
+PREPROCESSING_CONFIGS = {
+    "none": _uniform([], []),
+    "notebook": dict(
+        _uniform([], []),
+        pitch_score={"chunk": ["adaptive_noise_reduction", "spectral_gate", "normalize"], "original": ["spectral_gate", "normalize"]},
+        rhythm_score={"chunk": ["adaptive_noise_reduction", "spectral_gate", "normalize"], "original": ["spectral_gate", "normalize"]},
+    ),
+    "heavy": _uniform(["normalize", "trim_silences", "source_separation", "spectral_gate"], ["normalize", "spectral_gate"]),
+}
+
+
+def synthesize_song(directory: str, seconds: float, sr: int, seed: int):
+    """Writes original.wav, track.wav, attempted.wav, lyrics.csv and lyrics.lrc of a synthetic song."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+
+    # Melody: notes of 0.25-0.6 s on a random walk around A3, with short rests
+    note_starts, semitones, position, pitch = [], [], 0.0, 0.0
+    while position < seconds:
+        note_starts.append(position)
+        pitch = float(np.clip(pitch + rng.integers(-3, 4), -9, 12))
+        semitones.append(pitch)
+        position += rng.uniform(0.25, 0.6)
+    note_index = np.searchsorted(note_starts, t, side="right") - 1
+    frequency = 220 * 2 ** (np.asarray(semitones)[note_index] / 12)
+    frequency *= 2 ** (0.01 * np.sin(2 * np.pi * 5.5 * t))  # Vibrato
+    phase = 2 * np.pi * np.cumsum(frequency) / sr
+    envelope = np.minimum(1, 20 * (t - np.asarray(note_starts)[note_index])) * (rng.random(len(note_starts)) > 0.1)[note_index]
+    voice = envelope * sum(np.sin(k * phase) / k for k in range(1, 6)) * 0.2
+
+    beat = (np.arange(n) % int(0.5 * sr)) < int(0.05 * sr)
+    track = 0.1 * np.sin(2 * np.pi * 55 * t) + 0.05 * beat * rng.standard_normal(n)
+
+    delay = int(0.08 * sr)
+    user_phase = 2 * np.pi * np.cumsum(frequency * 2 ** (rng.normal(0, 0.3) / 12)) / sr
+    user_voice = envelope * sum(np.sin(k * user_phase) / k for k in range(1, 4)) * 0.25
+    attempted = np.concatenate((np.zeros(delay), user_voice[: n - delay])) + 0.3 * track + 0.01 * rng.standard_normal(n)
+
+    sf.write(os.path.join(directory, "original.wav"), voice.astype(np.float32), sr)
+    sf.write(os.path.join(directory, "track.wav"), track.astype(np.float32), sr)
+    sf.write(os.path.join(directory, "attempted.wav"), attempted.astype(np.float32), sr)
+
+    with open(os.path.join(directory, "lyrics.csv"), "w") as f:
+        f.write("start_time,payload_type,payload\n")
+        for i, start in enumerate(note_starts):
+            line_break = LINE_BREAK if i % 8 == 7 else ""
+            f.write(f"{start:.3f},1,la{line_break}\n")
+
+
+def write_lrc(directory: str):
+    """Writes lyrics.lrc (one line per lyric line) from lyrics.csv, for the AudioProcessor target."""
+    import pandas as pd
+
+    lines, words, line_start = [], [], None
+    path = os.path.join(directory, "lyrics.csv")
+    if os.path.exists(path):
+        for start, payload in pd.read_csv(path)[["start_time", "payload"]].itertuples(index=False):
+            line_start = start if line_start is None else line_start
+            words.append(str(payload).replace(LINE_BREAK, ""))
+            if LINE_BREAK in str(payload):
+                lines.append((line_start, " ".join(words)))
+                words, line_start = [], None
+    with open(os.path.join(directory, "lyrics.lrc"), "w") as f:
+        for start, text in lines:
+            f.write(f"[{int(start // 60):02d}:{start % 60:05.2f}]{text}\n")
+
+
+def chunk_audio(audio: np.ndarray, chunk_length: int):
+    return [audio[i : i + chunk_length] for i in range(0, len(audio) - chunk_length + 1, chunk_length)]
+
+
+def run_pipeline(args) -> dict:
+    _common.add_to_path("Scoring")
+    import librosa
+    from pipeline import Pipeline
+    from transcription_service import Transcription, TranscriptionService
+
+    class FixedTranscription(Transcription):
+        """Stands in for the ASR engine: fixed text after a simulated service latency."""
+
+        def transcribe(self, audio_data, sr, from_file=False):
+            time.sleep(args.asr_latency_ms / 1000)
+            return "la la la la"
+
+    original, sr = librosa.load(os.path.join(args.song_dir, "original.wav"), sr=args.sr, mono=True)
+    track, _ = librosa.load(os.path.join(args.song_dir, "track.wav"), sr=args.sr, mono=True)
+    attempted, _ = librosa.load(os.path.join(args.song_dir, "attempted.wav"), sr=args.sr, mono=True)
+    transcriber = TranscriptionService.shared("google") if args.asr == "google" else FixedTranscription()
+
+    started = time.perf_counter()
+    pipeline = Pipeline(
+        original, track, os.path.join(args.song_dir, "lyrics.csv"), sr,
+        PREPROCESSING_CONFIGS[args.config], transcriber=transcriber,
+    )
+    setup_seconds = time.perf_counter() - started
+
+    latencies, stages = [], []
+    for chunk in chunk_audio(attempted, int(args.chunk_seconds * sr)):
+        started = time.perf_counter()
+        pipeline.process_and_score(chunk)
+        latencies.append(time.perf_counter() - started)
+        stages.append(dict(pipeline.stage_timings))
+    return {"setup_seconds": setup_seconds, "latencies": latencies, "stages": stages}
+
+
+def run_audio_processor(args) -> dict:
+    from types import SimpleNamespace
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+    _common.add_to_path("AIProcessingService")
+    generated = os.path.join(_common.REPO_ROOT, "proto", "Generated")
+    if os.path.isdir(generated):
+        sys.path.insert(0, generated)
+    # Config requires the server settings even though the processor does not use them
+    for name in (
+        "GRPC_SERVER_CERT_FILE", "GRPC_SERVER_KEY_FILE", "AI_PRIVATE_INTERFACE_SERVER_ADDRESS",
+        "AI_PRIVATE_INTERFACE_CERT_FILE", "DEFAULT_CORRELATION_ID", "AUTHORIZATION_KEY", "USER_LOCALE_KEY",
+        "MISSING_AUTHORIZATION_MSG", "MISSING_USER_LOCALE_MSG",
+    ):
+        os.environ.setdefault(name, "unused")
+    os.environ.setdefault("GRPC_SERVER_PORT", "0")
+    os.environ.setdefault("GRPC_SERVER_MAX_WORKERS", "1")
+    os.environ.setdefault("GRPC_MAX_SEND_MESSAGE_LENGTH", str(4 * 1024 * 1024))
+    os.environ.setdefault("ASSET_CACHE_DIR", tempfile.mkdtemp(prefix="bench-assets-"))
+    os.environ.setdefault("REFERENCE_FEATURE_SR", str(args.sr))
+
+    # Service modules create loggers at import, which would otherwise write logs/app.log to the working directory
+    from logger import Logger
+
+    Logger.configure(file_path=os.path.join(tempfile.mkdtemp(prefix="bench-logs-"), "app.log"))
+
+    import io
+    import librosa
+    from audio_processor import AudioProcessor
+    from scoring_engine import ScoringEngine
+
+    handler = lambda *a, **kw: SimpleHTTPRequestHandler(*a, directory=args.song_dir, **kw)  # noqa: E731
+    SimpleHTTPRequestHandler.log_message = lambda *a: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    initial_data = SimpleNamespace(
+        lyrics_download_url=f"{base_url}/lyrics.lrc",
+        track_download_url=f"{base_url}/original.wav",
+        voice_helper_download_url=f"{base_url}/track.wav",
+    )
+    started = time.perf_counter()
+    processor = AudioProcessor("bench", initial_data)
+    setup_seconds = time.perf_counter() - started
+
+    attempted, sr = librosa.load(os.path.join(args.song_dir, "attempted.wav"), sr=args.sr, mono=True)
+    latencies, stages = [], []
+    try:
+        for chunk in chunk_audio(attempted, int(args.chunk_seconds * sr)):
+            encoded = io.BytesIO()
+            sf.write(encoded, chunk, sr, format="WAV")
+            request = SimpleNamespace(audio_chunk=SimpleNamespace(audio_data=encoded.getvalue()))
+            started = time.perf_counter()
+            processor.process_audio_chunk(request)
+            latencies.append(time.perf_counter() - started)
+            stages.append(dict(processor.stage_timings))
+    finally:
+        processor.close()
+        ScoringEngine.shutdown_shared()
+        server.shutdown()
+    return {"setup_seconds": setup_seconds, "latencies": latencies, "stages": stages}
+
+
+def run_worker(args):
+    """Run one configuration and print its raw measurements as JSON."""
+    run = run_pipeline(args) if args.target == "pipeline" else run_audio_processor(args)
+    run["peak_rss_bytes"] = _common.peak_rss_bytes()
+    print(json.dumps(run))
+
+
+def summarize_run(run: dict, chunk_seconds: float) -> dict:
+    latencies = run["latencies"]
+    stage_names = sorted({stage for chunk in run["stages"] for stage in chunk})
+    return {
+        "chunks": len(latencies),
+        "setup_seconds": run["setup_seconds"],
+        "latency_seconds": _common.summarize(latencies),
+        "stage_seconds": {
+            stage: _common.summarize([chunk.get(stage, 0.0) for chunk in run["stages"]]) for stage in stage_names
+        },
+        "real_time_factor": sum(latencies) / (len(latencies) * chunk_seconds) if latencies else None,
+        "peak_rss_bytes": run["peak_rss_bytes"],
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=_common.REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=["pipeline", "audio_processor"])
+    parser.add_argument("--song-seconds", nargs="*", type=float, default=[30.0, 120.0])
+    parser.add_argument("--fixture-dir", help="Directory of fixture songs, one subdirectory per song.")
+    parser.add_argument("--chunk-seconds", nargs="+", type=float, default=[2.0, 5.0])
+    parser.add_argument("--configs", nargs="+", default=["none", "notebook"], choices=sorted(PREPROCESSING_CONFIGS))
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--asr", choices=["mock", "google"], default="mock")
+    parser.add_argument("--asr-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    parser.add_argument("--song-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.chunk_seconds = args.chunk_seconds[0]
+        return run_worker(args)
+
+    with tempfile.TemporaryDirectory(prefix="bench-songs-") as song_root:
+        songs = {}
+        for i, seconds in enumerate(args.song_seconds):
+            directory = os.path.join(song_root, f"synthetic-{seconds:g}s")
+            os.makedirs(directory)
+            synthesize_song(directory, seconds, args.sr, args.seed + i)
+            songs[os.path.basename(directory)] = directory
+        if args.fixture_dir:
+            for name in sorted(os.listdir(args.fixture_dir)):
+                if os.path.isdir(os.path.join(args.fixture_dir, name)):
+                    songs[f"fixture-{name}"] = os.path.join(args.fixture_dir, name)
+        for directory in songs.values():
+            if not os.path.exists(os.path.join(directory, "lyrics.lrc")) and os.access(directory, os.W_OK):
+                write_lrc(directory)
+
+        results = {"commit": git_commit(), "sr": args.sr, "asr": args.asr, "runs": {}}
+        for target in args.targets:
+            configs = args.configs if target == "pipeline" else ["default"]
+            for song, directory in songs.items():
+                for chunk_seconds in args.chunk_seconds:
+                    for config in configs:
+                        key = f"{target}/{song}/{chunk_seconds:g}s/{config}"
+                        command = [
+                            sys.executable, __file__, "--worker",
+                            "--target", target, "--song-dir", directory, "--config", config,
+                            "--chunk-seconds", str(chunk_seconds), "--sr", str(args.sr),
+                            "--asr", args.asr, "--asr-latency-ms", str(args.asr_latency_ms),
+                        ]
+                        completed = subprocess.run(command, capture_output=True, text=True)
+                        if completed.returncode != 0:
+                            results["runs"][key] = {"error": completed.stderr.strip().splitlines()[-1:]}
+                            continue
+                        # Libraries may print to stdout while loading; the measurements are the last line
+                        run = json.loads(completed.stdout.strip().splitlines()[-1])
+                        results["runs"][key] = summarize_run(run, chunk_seconds)
+        _common.write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Time every DTWHelper backend on sequence lengths the scorers produce and compare their scores.
+
+Workloads mirror a chunk of --chunk-seconds at --sr:
+- amplitude: raw samples downsampled by 8, as amplitude_matching_score feeds them
+- pitch: one value per 512-sample frame
+- rhythm: an onset envelope, one value per 512-sample frame
+- mfcc: 13 coefficients per 512-sample frame (multivariate)
+
+Pairs are seeded random walks and a locally time-warped, noisy copy. Scores are compared with
+exact (unbanded) DTW, normalised the same way as DTWHelper's similarities.
+
+Usage:
+    python benchmarks/bench_dtw_backends.py [--sr 22050] [--chunk-seconds 2.0] [--pairs 8] \\
+        [--band 0.1] [--skip fastdtw] [--output out.json]
+"""
+import time
+import argparse
+import numpy as np
+import _common
+
+_common.add_to_path("Scoring")
+from dtaidistance import dtw, dtw_ndim  # noqa: E402
+from dtw_helper import DTWHelper  # noqa: E402
+
+HOP_LENGTH = 512
+
+
+def warped_pair(rng: np.random.Generator, length: int, dims: int):
+    """A random walk and a copy with smooth local tempo changes, a length change of up to 5% and noise."""
+    x = np.cumsum(rng.standard_normal((length, dims)), axis=0)
+    other_length = max(2, int(length * rng.uniform(0.95, 1.05)))
+    tempo = 1 + 0.2 * np.sin(np.linspace(0, rng.uniform(2, 6) * np.pi, other_length))
+    positions = np.cumsum(tempo)
+    positions = (positions - positions[0]) / (positions[-1] - positions[0]) * (length - 1)
+    y = np.stack([np.interp(positions, np.arange(length), x[:, d]) for d in range(dims)], axis=1)
+    y += 0.1 * rng.standard_normal(y.shape)
+    return (x[:, 0], y[:, 0]) if dims == 1 else (x, y)
+
+
+def similarity(distance: float, seq1, seq2) -> float:
+    return 1 / (1 + distance / (len(seq1) + len(seq2)))
+
+
+def exact_similarity(seq1, seq2) -> float:
+    if seq1.ndim == 1:
+        return similarity(dtw.distance(seq1, seq2, use_c=True), seq1, seq2)
+    return similarity(dtw_ndim.distance(seq1, seq2, use_c=True), seq1, seq2)
+
+
+def backends(band: float, multivariate: bool) -> dict:
+    """Per-pair scoring functions of every backend that supports the workload."""
+    helpers = {
+        "fastdtw": DTWHelper.compute_similarity_fastdtw,
+        "banded": lambda seq1, seq2: DTWHelper.compute_similarity_banded(seq1, seq2, band),
+    }
+    if not multivariate:
+        helpers["dtaidistance"] = DTWHelper.compute_similarity_dtaidistance
+        helpers["dtaidistance_fast"] = DTWHelper.compute_similarity_dtaidistance_fast
+    return helpers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--chunk-seconds", type=float, default=2.0)
+    parser.add_argument("--pairs", type=int, default=8, help="Sequence pairs per workload.")
+    parser.add_argument("--band", type=float, default=0.1, help="Band of the banded backend, relative to length.")
+    parser.add_argument("--skip", nargs="*", default=[], help="Backends to leave out, e.g. fastdtw on long inputs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    frames = int(args.chunk_seconds * args.sr / HOP_LENGTH)
+    workloads = {
+        "amplitude": (int(args.chunk_seconds * args.sr / 8), 1),
+        "pitch": (frames, 1),
+        "rhythm": (frames, 1),
+        "mfcc": (frames, 13),
+    }
+    rng = np.random.default_rng(args.seed)
+
+    # Compile the native kernels outside the timings
+    warmup = [warped_pair(rng, 16, 1), warped_pair(rng, 16, 1)]
+    DTWHelper.distances_banded(warmup, args.band)
+    DTWHelper.distance_banded(*warmup[0], args.band)
+
+    results = {"sr": args.sr, "chunk_seconds": args.chunk_seconds, "band": args.band, "workloads": {}}
+    for name, (length, dims) in workloads.items():
+        pairs = [warped_pair(rng, length, dims) for _ in range(args.pairs)]
+        exact = np.array([exact_similarity(seq1, seq2) for seq1, seq2 in pairs])
+        workload = {"length": length, "dims": dims, "pairs": len(pairs), "backends": {}}
+
+        for backend, score in backends(args.band, dims > 1).items():
+            if backend in args.skip:
+                continue
+            seconds, scores = [], []
+            try:
+                for seq1, seq2 in pairs:
+                    started = time.perf_counter()
+                    scores.append(score(seq1, seq2))
+                    seconds.append(time.perf_counter() - started)
+            except Exception as e:
+                # e.g. fastdtw with scipy's euclidean rejects scalar frames on recent scipy versions
+                workload["backends"][backend] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            workload["backends"][backend] = summarize_backend(seconds, np.array(scores), exact)
+
+        started = time.perf_counter()
+        batch_scores = DTWHelper(method="banded", band=args.band).compute_similarity_batch(pairs)
+        batch_seconds = time.perf_counter() - started
+        workload["backends"]["banded_batch"] = summarize_backend(
+            [batch_seconds / len(pairs)] * len(pairs), batch_scores, exact
+        )
+        results["workloads"][name] = workload
+    _common.write_results(results, args.output)
+
+
+def summarize_backend(seconds, scores: np.ndarray, exact: np.ndarray) -> dict:
+    divergence = np.abs(scores - exact)
+    return {
+        "seconds_per_pair": _common.summarize(seconds),
+        "mean_score": float(scores.mean()),
+        "mean_abs_divergence_vs_exact": float(divergence.mean()),
+        "max_abs_divergence_vs_exact": float(divergence.max()),
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Compare the streaming YIN pitch tracker with librosa.pyin on a fixed local audio set.
+
+Each file is cut into chunks of --chunk-seconds, as the scoring pipeline receives them, and both
+estimators are timed per chunk: pyin over C2-C7 as pitch_matching_score used to run it, and
+PitchTracker.process with its carry-over between chunks. Agreement is measured on the whole
+stream against pyin on the whole file:
+
+- voicing agreement: the fraction of frames that both estimators call voiced, or both unvoiced
+- raw pitch accuracy: the fraction of frames voiced in both whose pitch differs by less than 50 cents
+- median absolute error in cents
+- octave error rate
+
+Usage:
+    python benchmarks/bench_pitch_tracker.py --audio-dir path/to/wavs \\
+        [--sr 22050] [--chunk-seconds 2.0] [--output out.json]
+"""
+import time
+import argparse
+import numpy as np
+import _common
+
+_common.add_to_path("Scoring")
+import librosa  # noqa: E402
+from pitch_tracker import PitchTracker  # noqa: E402
+
+PYIN_FMIN = librosa.note_to_hz("C2")
+PYIN_FMAX = librosa.note_to_hz("C7")
+
+
+def agreement(tracker: PitchTracker, f0, voiced, pyin_f0, pyin_voiced) -> dict:
+    """Frame-level agreement of the tracker with pyin, matching frames by their centre time."""
+    # Tracker frames are not centred; frame i is centred on pyin frame i + frame_length / (2 * hop)
+    offset = int(round(tracker.frame_length / (2 * tracker.hop_length)))
+    count = min(len(f0), len(pyin_f0) - offset)
+    f0, voiced = f0[:count], voiced[:count]
+    pyin_f0, pyin_voiced = pyin_f0[offset : offset + count], pyin_voiced[offset : offset + count]
+
+    both = voiced & pyin_voiced
+    cents = np.abs(1200 * np.log2(f0[both] / pyin_f0[both]))
+    return {
+        "frames": int(count),
+        "frames_voiced_in_both": int(both.sum()),
+        "voicing_agreement": float(np.mean(voiced == pyin_voiced)) if count else 0.0,
+        "raw_pitch_accuracy_50c": float(np.mean(cents < 50)) if cents.size else 0.0,
+        "median_abs_cents": float(np.median(cents)) if cents.size else 0.0,
+        "octave_error_rate": float(np.mean(np.abs(cents - 1200) < 100)) if cents.size else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio-dir", required=True, help="Directory of audio files used as the fixed test set.")
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--chunk-seconds", type=float, default=2.0)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    files = _common.audio_files(args.audio_dir)
+    chunk_length = int(args.chunk_seconds * args.sr)
+    pyin_chunk_seconds, tracker_chunk_seconds, contour_seconds = [], [], []
+    audio_seconds = 0.0
+    per_file = {}
+
+    # Warm up numba/FFT plans so the first chunk is not an outlier
+    warmup = np.zeros(chunk_length, dtype=np.float32)
+    librosa.pyin(warmup, fmin=PYIN_FMIN, fmax=PYIN_FMAX, sr=args.sr)
+    PitchTracker(args.sr).process(warmup)
+
+    for path in files:
+        audio, _ = librosa.load(path, sr=args.sr, mono=True)
+        audio_seconds += len(audio) / args.sr
+        tracker = PitchTracker(args.sr)
+        f0s, voiced = [], []
+        for start in range(0, len(audio), chunk_length):
+            chunk = audio[start : start + chunk_length]
+
+            started = time.perf_counter()
+            librosa.pyin(chunk, fmin=PYIN_FMIN, fmax=PYIN_FMAX, sr=args.sr)
+            pyin_chunk_seconds.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            chunk_f0, chunk_voiced = tracker.process(chunk)
+            tracker_chunk_seconds.append(time.perf_counter() - started)
+            f0s.append(chunk_f0)
+            voiced.append(chunk_voiced)
+
+        started = time.perf_counter()
+        tracker.contour(audio)
+        contour_seconds.append(time.perf_counter() - started)
+
+        pyin_f0, pyin_voiced, _ = librosa.pyin(audio, fmin=PYIN_FMIN, fmax=PYIN_FMAX, sr=args.sr)
+        per_file[path] = agreement(tracker, np.concatenate(f0s), np.concatenate(voiced), pyin_f0, pyin_voiced)
+
+    results = {
+        "files": len(files),
+        "audio_seconds": audio_seconds,
+        "sr": args.sr,
+        "chunk_seconds": args.chunk_seconds,
+        "pyin_seconds_per_chunk": _common.summarize(pyin_chunk_seconds),
+        "tracker_seconds_per_chunk": _common.summarize(tracker_chunk_seconds),
+        "speedup_mean": float(np.mean(pyin_chunk_seconds) / np.mean(tracker_chunk_seconds)),
+        "reference_contour_seconds_per_audio_second": sum(contour_seconds) / audio_seconds,
+        "agreement": {
+            metric: float(np.mean([file_result[metric] for file_result in per_file.values()]))
+            for metric in ("voicing_agreement", "raw_pitch_accuracy_50c", "median_abs_cents", "octave_error_rate")
+        },
+        "per_file": per_file,
+    }
+    _common.write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
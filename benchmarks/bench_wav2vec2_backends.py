@@ -0,0 +1,120 @@
+"""Compare Wav2Vec2 inference backends on a fixed local audio set.
+
+Each backend runs in its own subprocess so that its peak RSS is measured in isolation. For every
+backend the script reports the real-time factor (processing time / audio duration), load time,
+peak RSS, and the word error rate and character drift of its transcripts against the fp32
+PyTorch backend.
+
+Usage:
+    python benchmarks/bench_wav2vec2_backends.py --audio-dir path/to/wavs \\
+        [--model facebook/wav2vec2-base-960h] [--backends torch int8 onnx] [--repeat 3] [--output out.json]
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+import numpy as np
+import _common
+
+REFERENCE_BACKEND = "torch"
+
+
+def run_worker(args):
+    """Transcribe the audio set with one backend and print the measurements as JSON."""
+    _common.add_to_path("AIProcessingService")
+    import librosa
+    from wav2vec2_transcription import Wav2VecTranscription
+
+    files = _common.audio_files(args.audio_dir)
+    audios = [librosa.load(path, sr=Wav2VecTranscription.SAMPLE_RATE, mono=True)[0] for path in files]
+
+    started = time.perf_counter()
+    transcriber = Wav2VecTranscription(
+        device="cpu", model_name=args.model, backend=args.backend, onnx_dir=args.onnx_dir
+    )
+    load_seconds = time.perf_counter() - started
+
+    # Warm up allocators, thread pools and the ONNX graph on the first file
+    transcriber.transcribe_array(audios[0])
+
+    timings, transcripts = [], []
+    for audio in audios:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            transcript = transcriber.transcribe_array(audio)
+            best = min(best, time.perf_counter() - started)
+        timings.append(best)
+        transcripts.append(transcript)
+
+    json.dump(
+        {
+            "backend": args.backend,
+            "files": files,
+            "audio_seconds": [len(audio) / Wav2VecTranscription.SAMPLE_RATE for audio in audios],
+            "seconds": timings,
+            "transcripts": transcripts,
+            "load_seconds": load_seconds,
+            "model_bytes": transcriber.resident_bytes(),
+            "peak_rss_bytes": _common.peak_rss_bytes(),
+        },
+        sys.stdout,
+    )
+
+
+def run_backend(args, backend: str) -> dict:
+    command = [
+        sys.executable, __file__, "--worker",
+        "--backend", backend,
+        "--audio-dir", args.audio_dir,
+        "--model", args.model,
+        "--repeat", str(args.repeat),
+        "--onnx-dir", args.onnx_dir,
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise SystemExit(f"Backend {backend} failed:\n{completed.stderr}")
+    # Libraries may print to stdout while loading; the measurements are the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio-dir", required=True, help="Directory of audio files used as the fixed test set.")
+    parser.add_argument("--model", default="facebook/wav2vec2-base-960h")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file; the fastest is kept.")
+    parser.add_argument("--onnx-dir", default="onnx_models")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+
+    backends = [REFERENCE_BACKEND] + [b for b in args.backends if b != REFERENCE_BACKEND]
+    runs = {backend: run_backend(args, backend) for backend in backends}
+    reference = runs[REFERENCE_BACKEND]["transcripts"]
+
+    results = {"model": args.model, "files": len(reference), "backends": {}}
+    for backend, run in runs.items():
+        audio_seconds = sum(run["audio_seconds"])
+        wer = [_common.word_error_rate(ref, hyp) for ref, hyp in zip(reference, run["transcripts"])]
+        drift = [_common.character_drift(ref, hyp) for ref, hyp in zip(reference, run["transcripts"])]
+        results["backends"][backend] = {
+            "real_time_factor": sum(run["seconds"]) / audio_seconds,
+            "seconds_per_file": _common.summarize(run["seconds"]),
+            "load_seconds": run["load_seconds"],
+            "model_bytes": run["model_bytes"],
+            "peak_rss_bytes": run["peak_rss_bytes"],
+            "wer_vs_fp32": float(np.mean(wer)),
+            "char_drift_vs_fp32": float(np.mean(drift)),
+            "identical_transcripts": sum(ref == hyp for ref, hyp in zip(reference, run["transcripts"])),
+        }
+    _common.write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Load generator simulating concurrent singers against the AI Processing Service.
+
+Every simulated singer opens its own `Process` stream and sends an Initialize request. It then sends
+fixed-duration chunks of a local audio file at real-time pace, where each chunk leaves once it would
+have been fully recorded, and ends with a Finalize request. For every LiveReview the generator
+records the time since the chunk it covers was sent.
+
+Concurrency levels are run one after the other. For each level the generator reports:
+- the latency distribution of the chunk reviews
+- time to first review
+- error rates
+- whether the level was sustained: no more errors than --max-error-rate, and a p95 latency within
+  --slo-ms, which defaults to the chunk duration, i.e. the service keeps up with real time.
+The largest sustained level is reported as the sessions per node.
+
+To run fully offline, start the service with AI_PRIVATE_INTERFACE_SERVER_ADDRESS=localhost:50057
+and let this script start the local AIPrivateInterfaceService stand-in with --song-dir. Both ends
+use TLS; a self-signed certificate for localhost is enough:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -days 30 -subj "/CN=localhost" \\
+        -addext "subjectAltName=DNS:localhost" -keyout private.pem -out certificate.pem
+
+Usage:
+    python load_generator.py --audio singer.wav [more.wav ...] --sessions 1 2 4 8 \\
+        [--server localhost:50051] [--cert-file certificate.pem] [--chunk-seconds 2] \\
+        [--song-dir song/ --private-interface-port 50057 --private-key-file private.pem] \\
+        [--pcm s16] [--output results.json]
+"""
+import io
+import os
+import json
+import time
+import argparse
+import threading
+import collections
+import numpy as np
+import librosa
+import soundfile as sf
+from logger import Logger
+from request_builder import RequestBuilder
+from ai_processing_service_client import AIProcessingServiceClient
+from local_private_interface import LocalPrivateInterfaceServer
+from Declarations.Model.AIProcessingService.AIProcessingRequest_pb2 import AIProcessingRequest
+
+Encoding = AIProcessingRequest.AudioFormat.Encoding
+FinalizeReason = AIProcessingRequest.Finalize.FinalizeReason
+
+log = Logger.get_logger(__name__)
+
+
+class SessionResult:
+    """Measurements of one simulated singer."""
+
+    def __init__(self, index):
+        self.index = index
+        self.chunks_sent = 0
+        self.reviews = 0
+        self.latencies = []
+        self.first_review_seconds = None
+        self.error_responses = 0
+        self.failure = None
+        self.report_received = False
+
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "chunks_sent": self.chunks_sent,
+            "reviews": self.reviews,
+            "error_responses": self.error_responses,
+            "failure": self.failure,
+            "report_received": self.report_received,
+        }
+
+
+class SingerSession:
+    """One `Process` stream sending an audio file in real-time chunks."""
+
+    def __init__(self, index, client, audio, sr, chunk_seconds, pcm=None, token="load-test", locale="en", timeout=None):
+        self.result = SessionResult(index)
+        self.client = client
+        self.audio = audio
+        self.sr = sr
+        self.chunk_length = int(chunk_seconds * sr)
+        self.chunk_seconds = self.chunk_length / sr
+        self.pcm = pcm
+        self.token = token
+        self.locale = locale
+        self.timeout = timeout
+        # (audio seconds covered once the chunk is processed, time it was sent), in sending order
+        self._in_flight = collections.deque()
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _encode(self, chunk):
+        if self.pcm == "s16":
+            return (np.clip(chunk, -1, 1) * 32767).astype("<i2").tobytes()
+        if self.pcm == "f32":
+            return chunk.astype("<f4").tobytes()
+        buffer = io.BytesIO()
+        sf.write(buffer, chunk, self.sr, format="WAV")
+        return buffer.getvalue()
+
+    def requests(self):
+        """Initialize, the audio chunks paced like a live microphone, then Finalize."""
+        if self.pcm:
+            encoding = Encoding.ENCODING_PCM_S16LE if self.pcm == "s16" else Encoding.ENCODING_PCM_F32LE
+            yield RequestBuilder.create_initialize_request(self.token, encoding, self.sr)
+        else:
+            yield RequestBuilder.create_initialize_request(self.token)
+
+        self._started = time.perf_counter()
+        for i, start in enumerate(range(0, len(self.audio) - self.chunk_length + 1, self.chunk_length)):
+            data = self._encode(self.audio[start : start + self.chunk_length])
+            delay = self._started + (i + 1) * self.chunk_seconds - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                self._in_flight.append(((i + 1) * self.chunk_seconds, time.perf_counter()))
+            self.result.chunks_sent += 1
+            yield RequestBuilder.create_audio_chunk_request(data)
+
+        yield RequestBuilder.create_finalize_request(FinalizeReason.FINALIZEREASON_SONG_COMPLETED)
+
+    def _record_review(self, live_review):
+        received = time.perf_counter()
+        processed = live_review.processed_duration.seconds + live_review.processed_duration.nanos / 1e9
+        tolerance = min(0.05, self.chunk_seconds / 2)
+
+        # A review covers every chunk up to its processed duration; latency is taken from the last one
+        sent = None
+        with self._lock:
+            while self._in_flight and self._in_flight[0][0] <= processed + tolerance:
+                sent = self._in_flight.popleft()[1]
+        self.result.reviews += 1
+        if sent is not None:
+            self.result.latencies.append(received - sent)
+        if self.result.first_review_seconds is None:
+            self.result.first_review_seconds = received - self._started
+
+    def run(self):
+        try:
+            for response in self.client.process(self.requests(), self.token, self.locale, timeout=self.timeout):
+                if response.status_code != 0 or response.WhichOneof("payload") == "error":
+                    self.result.error_responses += 1
+                elif response.WhichOneof("payload") == "live_review":
+                    self._record_review(response.live_review)
+                elif response.WhichOneof("payload") == "report":
+                    self.result.report_received = True
+        except Exception as e:
+            self.result.failure = f"{type(e).__name__}: {e}"
+        return self.result
+
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values)
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def run_level(sessions, args, audios):
+    """Runs `sessions` concurrent singers, their starts spread over --ramp-seconds."""
+    clients, threads, results = [], [], [None] * sessions
+    started = time.perf_counter()
+
+    def sing(index, session):
+        results[index] = session.run()
+
+    for index in range(sessions):
+        client = AIProcessingServiceClient(server_address=args.server, cert_file=args.cert_file)
+        clients.append(client)
+        audio = audios[index % len(audios)]
+        session = SingerSession(
+            index, client, audio, args.sr, args.chunk_seconds, args.pcm, args.token, args.locale, args.timeout
+        )
+        thread = threading.Thread(target=sing, args=(index, session), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if sessions > 1:
+            time.sleep(args.ramp_seconds / (sessions - 1))
+
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close()
+    wall_seconds = time.perf_counter() - started
+
+    latencies = [latency for result in results for latency in result.latencies]
+    chunks_sent = sum(result.chunks_sent for result in results)
+    error_responses = sum(result.error_responses for result in results)
+    failed_sessions = sum(result.failure is not None for result in results)
+    latency_summary = summarize(latencies)
+    chunk_error_rate = error_responses / chunks_sent if chunks_sent else 0.0
+    session_error_rate = failed_sessions / sessions
+    slo_seconds = (args.slo_ms if args.slo_ms is not None else args.chunk_seconds * 1000) / 1000
+    return {
+        "sessions": sessions,
+        "wall_seconds": wall_seconds,
+        "chunks_sent": chunks_sent,
+        "reviews": sum(result.reviews for result in results),
+        "review_latency_seconds": latency_summary,
+        "first_review_seconds": summarize(
+            [result.first_review_seconds for result in results if result.first_review_seconds is not None]
+        ),
+        "chunk_error_rate": chunk_error_rate,
+        "session_error_rate": session_error_rate,
+        "reports_received": sum(result.report_received for result in results),
+        "sustained": bool(
+            latency_summary["count"]
+            and latency_summary["p95"] <= slo_seconds
+            and max(chunk_error_rate, session_error_rate) <= args.max_error_rate
+        ),
+        "failures": [result.to_dict() for result in results if result.failure or result.error_responses],
+    }
+
+
+def load_audios(paths, sr, max_seconds):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith((".wav", ".flac", ".mp3", ".ogg"))
+            )
+        else:
+            files.append(path)
+    if not files:
+        raise ValueError("No audio files found.")
+    return [librosa.load(file, sr=sr, mono=True, duration=max_seconds)[0] for file in files]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", nargs="+", required=True, help="Audio files or directories sung by the sessions.")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4, 8], help="Concurrency levels to run.")
+    parser.add_argument("--server", default="localhost:50051")
+    parser.add_argument("--cert-file", default="certificate.pem")
+    parser.add_argument("--chunk-seconds", type=float, default=2.0)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="Sing at most this much of each file.")
+    parser.add_argument("--pcm", choices=["s16", "f32"], help="Send raw PCM instead of WAV-encoded chunks.")
+    parser.add_argument("--warmup-sessions", type=int, default=1, help="Sessions run first and left out of results.")
+    parser.add_argument("--ramp-seconds", type=float, default=5.0, help="Spread session starts over this time.")
+    parser.add_argument("--slo-ms", type=float, help="p95 review latency a level must meet (default: chunk duration).")
+    parser.add_argument("--max-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, help="Deadline of each stream in seconds.")
+    parser.add_argument("--token", default="load-test")
+    parser.add_argument("--locale", default="en")
+    parser.add_argument("--song-dir", help="Start the local AIPrivateInterfaceService stand-in serving this song.")
+    parser.add_argument("--private-interface-port", type=int, default=50057)
+    parser.add_argument("--private-key-file", default="private.pem", help="Key of --cert-file for the stand-in.")
+    parser.add_argument("--public-host", default="localhost", help="Host the service downloads song files from.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    audios = load_audios(args.audio, args.sr, args.max_seconds)
+    private_interface = None
+    if args.song_dir:
+        private_interface = LocalPrivateInterfaceServer(
+            args.song_dir,
+            port=args.private_interface_port,
+            public_host=args.public_host,
+            cert_file=args.cert_file,
+            key_file=args.private_key_file,
+        )
+        private_interface.start()
+
+    results = {"server": args.server, "chunk_seconds": args.chunk_seconds, "pcm": args.pcm, "levels": []}
+    try:
+        # The first session of a fresh server also pays for downloading the song and computing its features
+        if args.warmup_sessions > 0:
+            log.info(f"Warming up with {args.warmup_sessions} session(s)...")
+            run_level(args.warmup_sessions, args, audios)
+        for sessions in sorted(set(args.sessions)):
+            log.info(f"Running {sessions} concurrent session(s)...")
+            level = run_level(sessions, args, audios)
+            log.info(
+                f"{sessions} session(s): p95 review latency {level['review_latency_seconds'].get('p95', float('nan')):.3f}s, "
+                f"chunk error rate {level['chunk_error_rate']:.1%}, sustained: {level['sustained']}"
+            )
+            results["levels"].append(level)
+    finally:
+        if private_interface is not None:
+            results["private_interface"] = private_interface.service.stats()
+            private_interface.stop()
+
+    # Largest level sustained along with every level below it
+    results["sustained_sessions_per_node"] = 0
+    for level in results["levels"]:
+        if not level["sustained"]:
+            break
+        results["sustained_sessions_per_node"] = level["sessions"]
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
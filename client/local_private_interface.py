@@ -0,0 +1,142 @@
+import os
+import grpc
+import threading
+from logger import Logger
+from concurrent import futures
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from Declarations.Service import AIPrivateInterfaceService_pb2_grpc
+from Declarations.Model.AIPrivateInterfaceService import FetchInitialData_pb2, ReportResult_pb2
+
+
+class _QuietRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files without logging every download to stderr."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalPrivateInterfaceService(AIPrivateInterfaceService_pb2_grpc.AIPrivateInterfaceServiceServicer):
+    """
+    Offline stand-in for Lisari's AIPrivateInterfaceService. Every session gets the same song, served
+    over HTTP from a local directory, and reports are counted instead of stored.
+
+    The song directory holds track.wav (the original track), and optionally voice_helper.wav and
+    lyrics.lrc. Lyrics are only served as LRC, the one format the service's AudioLoader parses.
+    """
+
+    TRACK_FILES = ("track.wav",)
+    VOICE_HELPER_FILES = ("voice_helper.wav",)
+    LYRICS_FILES = ("lyrics.lrc",)
+
+    def __init__(self, song_dir, base_url):
+        self.log = Logger.get_logger(__name__)
+        self.lyrics_download_url = self._file_url(song_dir, base_url, self.LYRICS_FILES)
+        self.track_download_url = self._file_url(song_dir, base_url, self.TRACK_FILES)
+        self.voice_helper_download_url = self._file_url(song_dir, base_url, self.VOICE_HELPER_FILES)
+        if not self.track_download_url:
+            raise ValueError(f"No {' or '.join(self.TRACK_FILES)} found in {song_dir}.")
+
+        self._lock = threading.Lock()
+        self.initial_data_requests = 0
+        self.reports = 0
+        self.errors = 0
+
+    @staticmethod
+    def _file_url(song_dir, base_url, candidates):
+        """URL of the first candidate file present in the song directory, or an empty string."""
+        for name in candidates:
+            if os.path.exists(os.path.join(song_dir, name)):
+                return f"{base_url}/{name}"
+        return ""
+
+    def FetchInitialData(self, request, context):
+        with self._lock:
+            self.initial_data_requests += 1
+        return FetchInitialData_pb2.FetchInitialDataResponse(
+            lyrics_download_url=self.lyrics_download_url,
+            track_download_url=self.track_download_url,
+            voice_helper_download_url=self.voice_helper_download_url,
+        )
+
+    def ReportResult(self, request, context):
+        with self._lock:
+            if request.HasField("error"):
+                self.errors += 1
+            else:
+                self.reports += 1
+        return ReportResult_pb2.ReportResultResponse()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "initial_data_requests": self.initial_data_requests,
+                "reports": self.reports,
+                "errors": self.errors,
+            }
+
+
+class LocalPrivateInterfaceServer:
+    """Runs the stand-in gRPC service and the HTTP file server behind its download URLs."""
+
+    def __init__(self, song_dir, port=50057, http_port=0, public_host="localhost", cert_file=None, key_file=None):
+        """
+        Args:
+            song_dir (str): Directory of the song served to every session.
+            port (int): Port of the gRPC service; AI_PRIVATE_INTERFACE_SERVER_ADDRESS must point to it.
+            http_port (int): Port of the file server, 0 for any free port.
+            public_host (str): Host name under which the AI Processing Service reaches this machine.
+            cert_file (str): TLS certificate of the gRPC service. Without it the service listens insecurely.
+            key_file (str): Private key of the certificate.
+        """
+        self.log = Logger.get_logger(__name__)
+        self.http_server = ThreadingHTTPServer(("", http_port), partial(_QuietRequestHandler, directory=song_dir))
+        base_url = f"http://{public_host}:{self.http_server.server_address[1]}"
+        self.service = LocalPrivateInterfaceService(song_dir, base_url)
+
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        AIPrivateInterfaceService_pb2_grpc.add_AIPrivateInterfaceServiceServicer_to_server(self.service, self.server)
+        if cert_file and key_file:
+            with open(key_file, "rb") as f:
+                private_key = f.read()
+            with open(cert_file, "rb") as f:
+                certificate_chain = f.read()
+            credentials = grpc.ssl_server_credentials(((private_key, certificate_chain),))
+            self.port = self.server.add_secure_port(f"[::]:{port}", credentials)
+        else:
+            self.port = self.server.add_insecure_port(f"[::]:{port}")
+
+    def start(self):
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+        self.server.start()
+        self.log.info(
+            f"Local AIPrivateInterfaceService listening on port {self.port}, "
+            f"serving files on port {self.http_server.server_address[1]}."
+        )
+
+    def stop(self):
+        self.server.stop(grace=None)
+        self.http_server.shutdown()
+        self.log.info("Local AIPrivateInterfaceService stopped.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local song through an offline AIPrivateInterfaceService.")
+    parser.add_argument("song_dir")
+    parser.add_argument("--port", type=int, default=50057)
+    parser.add_argument("--http-port", type=int, default=0)
+    parser.add_argument("--public-host", default="localhost")
+    parser.add_argument("--cert-file", default="certificate.pem")
+    parser.add_argument("--key-file", default="private.pem")
+    args = parser.parse_args()
+
+    server = LocalPrivateInterfaceServer(
+        args.song_dir, args.port, args.http_port, args.public_host, args.cert_file, args.key_file
+    )
+    server.start()
+    try:
+        server.server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop()
@@ -8,8 +8,14 @@ class RequestBuilder:
     """Class to build different types of AIProcessing requests."""
 
     @staticmethod
-    def create_initialize_request(client_token: str) -> AIProcessingRequest:
-        """Construct an initialization request with a packed KeyValue message."""
+    def create_initialize_request(
+        client_token: str, pcm_encoding: int = None, sample_rate: int = None, channels: int = 1
+    ) -> AIProcessingRequest:
+        """Construct an initialization request with a packed KeyValue message.
+
+        When pcm_encoding is given, the audio chunks are announced as raw PCM with the given
+        sample rate and channel count instead of complete audio files.
+        """
         kv = KeyValue(key="client_token", value=client_token)
         any_message = Any()
         any_message.Pack(kv)
@@ -17,6 +23,10 @@ class RequestBuilder:
         container.opaque.CopyFrom(any_message)
         request = AIProcessingRequest()
         request.initialize.client_token.CopyFrom(container)
+        if pcm_encoding is not None:
+            request.initialize.audio_format.encoding = pcm_encoding
+            request.initialize.audio_format.sample_rate = sample_rate
+            request.initialize.audio_format.channels = channels
         return request
 
     @staticmethod
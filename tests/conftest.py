@@ -0,0 +1,21 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The services import their modules flat, as they do when run from their own directory
+sys.path.insert(0, os.path.join(REPO_ROOT, "AIProcessingService"))
+# Scoring/ is imported flat too, after the service, so only its uniquely named modules are reachable
+sys.path.append(os.path.join(REPO_ROOT, "Scoring"))
+# gRPC stubs as written by proto/generate.sh
+sys.path.append(os.path.join(REPO_ROOT, "proto", "Generated"))
+
+from logger import Logger  # noqa: E402
+
+# Configured before any test module is imported, since service modules create loggers at import
+_log_dir = tempfile.mkdtemp(prefix="test-logs-")
+Logger.configure("WARNING", file_path=os.path.join(_log_dir, "app.log"))
+atexit.register(shutil.rmtree, _log_dir, ignore_errors=True)
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from asset_cache import AssetCache
+
+
+class AssetServer:
+    """Local HTTP server answering conditional requests with ETags, and counting what it sent."""
+
+    def __init__(self, delay: float = 0.0):
+        self.files = {}
+        self.delay = delay
+        self.responses = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.delay)
+                body = server.files.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    server._record(self.path, 304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                server._record(self.path, 200)
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer(("localhost", 0), Handler)
+        self.base_url = f"http://localhost:{self.http_server.server_address[1]}"
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+
+    def _record(self, path, status):
+        with self._lock:
+            self.responses.append((path, status))
+
+    def statuses(self, path):
+        with self._lock:
+            return [status for p, status in self.responses if p == path]
+
+    def url(self, path):
+        return self.base_url + path
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+
+@pytest.fixture
+def server():
+    server = AssetServer()
+    yield server
+    server.stop()
+
+
+def make_cache(tmp_path, max_bytes=1 << 20):
+    cache = AssetCache(str(tmp_path / "cache"), max_bytes=max_bytes, pool_size=4, timeout=5)
+    cache.EVICTION_GRACE_SECONDS = 0
+    return cache
+
+
+def test_revalidates_with_etag(tmp_path, server):
+    server.files["/track.wav"] = b"first version"
+    cache = make_cache(tmp_path)
+
+    first = cache.fetch(server.url("/track.wav"))
+    second = cache.fetch(server.url("/track.wav"))
+
+    assert server.statuses("/track.wav") == [200, 304]
+    assert second.path == first.path
+    assert second.read_bytes() == b"first version"
+    assert cache.stats()["revalidations"] == 1
+
+    server.files["/track.wav"] = b"second version"
+    third = cache.fetch(server.url("/track.wav"))
+
+    assert server.statuses("/track.wav") == [200, 304, 200]
+    assert third.read_bytes() == b"second version"
+    assert third.content_hash != first.content_hash
+
+
+def test_evicts_least_recently_used(tmp_path, server):
+    for name in "abc":
+        server.files[f"/{name}"] = name.encode() * 100
+    cache = make_cache(tmp_path, max_bytes=250)
+
+    a = cache.fetch(server.url("/a"))
+    time.sleep(0.01)
+    b = cache.fetch(server.url("/b"))
+    time.sleep(0.01)
+    cache.fetch(server.url("/a"))  # a is now more recently used than b
+    time.sleep(0.01)
+    c = cache.fetch(server.url("/c"))
+
+    assert os.path.exists(a.path) and os.path.exists(c.path)
+    assert not os.path.exists(b.path)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_redownloads_blob_evicted_during_revalidation(tmp_path, server):
+    server.files["/track.wav"] = b"track"
+    cache = make_cache(tmp_path)
+    first = cache.fetch(server.url("/track.wav"))
+
+    # Another download evicts the blob while the URL entry is being revalidated
+    with cache._lock:
+        del cache._index["blobs"][first.content_hash]
+    os.remove(first.path)
+    second = cache.fetch(server.url("/track.wav"))
+
+    assert server.statuses("/track.wav") == [200, 304, 200]
+    assert second.read_bytes() == b"track"
+
+
+def test_concurrent_fetches_share_one_download(tmp_path):
+    server = AssetServer(delay=0.05)
+    server.files["/track.wav"] = b"x" * 100000
+    cache = make_cache(tmp_path)
+    try:
+        results = [None] * 8
+
+        def fetch(i):
+            results[i] = cache.fetch(server.url("/track.wav"))
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(len(results))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.stop()
+
+    assert server.statuses("/track.wav").count(200) == 1
+    assert cache.stats()["downloads"] == 1
+    assert {asset.path for asset in results} == {results[0].path}
+    assert cache._url_locks == {}
+
+
+def test_index_saves_on_hits_are_batched(tmp_path, server):
+    server.files["/track.wav"] = b"track"
+    cache = make_cache(tmp_path)
+    asset = cache.fetch(server.url("/track.wav"))
+    index_path = os.path.join(cache.cache_dir, AssetCache.INDEX_FILE)
+
+    def saved_last_access():
+        with open(index_path) as f:
+            return json.load(f)["blobs"][asset.content_hash]["last_access"]
+
+    saved = saved_last_access()
+    time.sleep(0.01)
+    for _ in range(5):
+        cache.fetch(server.url("/track.wav"))
+    assert saved_last_access() == saved
+
+    cache.flush()
+    assert saved_last_access() > saved
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from audio_preprocessor import AudioPreprocessor, PreprocessingTree, SpectralState
+
+SR = 22050
+DENOISED = ["adaptive_noise_reduction", "spectral_gate", "normalize"]
+
+# The per-score pipelines of Scoring/audio_score.ipynb
+NOTEBOOK_PIPELINES = {
+    "linguistic_accuracy_score": {"chunk": [], "original": []},
+    "linguistic_similarity_score": {"chunk": [], "original": []},
+    "amplitude_score": {"chunk": [], "original": []},
+    "pitch_score": {"chunk": DENOISED, "original": ["spectral_gate", "normalize"]},
+    "rhythm_score": {"chunk": DENOISED, "original": ["spectral_gate", "normalize"]},
+}
+
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    t = np.arange(2 * SR) / SR
+    reference = (0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    chunk = (0.2 * np.sin(2 * np.pi * 233 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    return chunk, reference
+
+
+@pytest.mark.parametrize("audio_type", ["chunk", "original"])
+def test_tree_matches_sequential_preprocessing(audio, audio_type):
+    chunk, reference = audio
+    signal = chunk if audio_type == "chunk" else reference
+    tree = PreprocessingTree({score: pipeline[audio_type] for score, pipeline in NOTEBOOK_PIPELINES.items()})
+
+    outputs = tree.run(signal, sr=SR, reference_audio=SpectralState(reference))
+
+    assert list(outputs) == list(NOTEBOOK_PIPELINES)
+    for score, pipeline in NOTEBOOK_PIPELINES.items():
+        expected = AudioPreprocessor.preprocess_audio(signal, pipeline[audio_type], sr=SR, reference_audio=reference)
+        np.testing.assert_allclose(outputs[score], expected, rtol=1e-5, atol=1e-6)
+
+
+def test_shared_prefix_runs_once(audio):
+    chunk, reference = audio
+    tree = PreprocessingTree({score: pipeline["chunk"] for score, pipeline in NOTEBOOK_PIPELINES.items()})
+    state = SpectralState(chunk)
+
+    tree.run(state, reference_audio=SpectralState(reference))
+
+    assert tree.distinct_steps == len(DENOISED)
+    assert tree.total_steps == 2 * len(DENOISED)
+    # adaptive_noise_reduction and spectral_gate chain on one stft, then normalize inverts it once
+    assert set(state.timer.totals) == {"stft", "istft", *DENOISED}
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+dtaidistance = pytest.importorskip("dtaidistance")
+
+from dtw_helper import DTWHelper  # noqa: E402
+
+
+@pytest.fixture
+def sequences():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=50), rng.normal(size=200)
+
+
+def test_single_frame_matches_unbanded_distance(sequences):
+    x, y = sequences
+    assert DTWHelper.distance_banded(x[:1], y) == pytest.approx(dtaidistance.dtw.distance(x[:1], y))
+    assert DTWHelper.distance_banded(y, x[:1]) == pytest.approx(dtaidistance.dtw.distance(y, x[:1]))
+
+
+def test_full_band_matches_unbanded_distance(sequences):
+    x, y = sequences
+    assert DTWHelper.distance_banded(x, y, band=1.0) == pytest.approx(dtaidistance.dtw.distance(x, y))
+
+
+def test_empty_sequences_score_zero(sequences):
+    x, y = sequences
+    assert DTWHelper.distance_banded(np.zeros(0), y) == np.inf
+    assert DTWHelper.compute_similarity_banded(np.zeros(0), y) == 0.0
+    assert DTWHelper.compute_similarity_banded(np.zeros((0, 13)), np.ones((5, 13))) == 0.0
+
+    similarities = DTWHelper(method="banded").compute_similarity_batch([(np.zeros(0), np.zeros(0)), (x, y)])
+    assert similarities[0] == 0.0
+    assert similarities[1] == pytest.approx(DTWHelper.compute_similarity_banded(x, y))
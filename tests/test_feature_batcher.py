@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from audio_utils import AudioUtils
+from feature_batcher import FeatureBatcher
+from reference_feature_cache import FeatureParams
+
+
+@pytest.fixture
+def chunks():
+    rng = np.random.default_rng(0)
+    # Lengths that are and are not whole numbers of hops, including one shorter than n_fft
+    return [rng.standard_normal(length).astype(np.float32) for length in (44100, 30000, 22050 + 17, 1500)]
+
+
+@pytest.mark.filterwarnings("ignore:n_fft=2048 is too large")
+def test_batched_features_match_per_chunk_features(chunks):
+    params = FeatureParams()
+    batcher = FeatureBatcher(max_batch_size=len(chunks), max_wait=5.0)
+
+    pending = [batcher.submit(chunk, params) for chunk in chunks]
+    results = [future.result(timeout=30) for future in pending]
+
+    assert batcher.stats()["batch_size_histogram"] == {len(chunks): 1}
+    for chunk, (stft_magnitude, mfcc) in zip(chunks, results):
+        expected_stft, expected_mfcc = AudioUtils.spectral_features(chunk, params)
+        assert stft_magnitude.shape == expected_stft.shape
+        np.testing.assert_allclose(stft_magnitude, expected_stft, rtol=1e-4, atol=1e-4)
+        np.testing.assert_allclose(mfcc, expected_mfcc, rtol=1e-3, atol=1e-2)
+
+
+def test_chunks_with_different_params_are_computed_separately(chunks):
+    batcher = FeatureBatcher(max_batch_size=2, max_wait=5.0)
+    default, coarse = FeatureParams(), FeatureParams(hop_length=1024)
+
+    pending = [batcher.submit(chunks[0], default), batcher.submit(chunks[1], coarse)]
+    results = [future.result(timeout=30) for future in pending]
+
+    assert batcher.stats()["batch_size_histogram"] == {1: 2}
+    np.testing.assert_allclose(results[1][1], AudioUtils.spectral_features(chunks[1], coarse)[1], rtol=1e-3, atol=1e-2)
@@ -0,0 +1,67 @@
+import queue
+import logging
+
+import pytest
+
+from logger import Logger
+
+
+def make_record(msg="message %s", args=("argument",), level=logging.DEBUG, lineno=1):
+    return logging.LogRecord("test", level, "test_logger.py", lineno, msg, args, None)
+
+
+def test_full_queue_drops_records_and_counts_them(monkeypatch):
+    handler = Logger.NonBlockingQueueHandler(queue.Queue(maxsize=2))
+    records = [make_record(lineno=line) for line in range(5)]
+    for record in records:
+        handler.handle(record)
+
+    assert handler.dropped == 3
+    assert handler.queue.qsize() == 2
+    # Records are queued untouched; formatting is left to the listener thread
+    queued = handler.queue.get_nowait()
+    assert queued is records[0]
+    assert queued.args == ("argument",)
+
+    monkeypatch.setattr(Logger, "_queue_handler", handler)
+    assert Logger.stats() == {"queued": 1, "dropped": 3}
+
+
+def test_debug_sampling_keeps_one_in_every_n_per_call_site():
+    sampler = Logger.DebugSamplingFilter(every=3)
+
+    first_site = [sampler.filter(make_record(lineno=10)) for _ in range(7)]
+    second_site = [sampler.filter(make_record(lineno=20)) for _ in range(2)]
+
+    assert first_site == [True, False, False, True, False, False, True]
+    assert second_site == [True, False]
+
+
+def test_debug_sampling_passes_other_levels():
+    sampler = Logger.DebugSamplingFilter(every=100)
+    sampler.filter(make_record(level=logging.DEBUG))
+
+    assert all(sampler.filter(make_record(level=level)) for level in (logging.INFO, logging.WARNING, logging.ERROR))
+
+
+@pytest.fixture
+def reconfigured():
+    """Restores the suite's logging configuration after a test reconfigures it."""
+    previous_path = Logger._file_handler.baseFilename
+    previous_level = Logger._level
+    yield
+    Logger.configure(previous_level, file_path=previous_path)
+
+
+def test_configured_pipeline_writes_sampled_records_to_the_file(tmp_path, reconfigured):
+    log_path = tmp_path / "app.log"
+    Logger.configure("DEBUG", file_path=str(log_path), debug_sample_every=2)
+    log = Logger.get_logger("test_logger")
+
+    for index in range(4):
+        log.debug("sampled %s", index)
+    log.info("kept %s", "always")
+    Logger.shutdown()  # Writes out everything queued
+
+    lines = log_path.read_text().splitlines()
+    assert [line.rsplit(" - ", 1)[1] for line in lines] == ["sampled 0", "sampled 2", "kept always"]
@@ -0,0 +1,83 @@
+import re
+import urllib.request
+
+import pytest
+
+from metrics import MetricsRegistry, MetricsServer
+
+
+def parse(text):
+    """Parses exposition lines into {(name, labels): value}, skipping comments."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = re.match(r"^(\w+)(\{.*\})? (\S+)$", line)
+        assert match, f"Malformed sample line: {line!r}"
+        samples[(match.group(1), match.group(2) or "")] = float(match.group(3))
+    return samples
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(namespace="test")
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.1, 0.5, 2.0, 20.0, 30.0):
+        histogram.labels("align").observe(value)
+
+    samples = parse(registry.render())
+
+    bounds = ("0.1", "1.0", "10.0", "+Inf")
+    buckets = [samples[("test_latency_seconds_bucket", f'{{stage="align",le="{le}"}}')] for le in bounds]
+    # An observation equal to a bound falls in that bound's bucket
+    assert buckets == [2, 3, 4, 6]
+    assert samples[("test_latency_seconds_count", '{stage="align"}')] == 6
+    assert samples[("test_latency_seconds_sum", '{stage="align"}')] == pytest.approx(52.65)
+
+
+def test_children_are_rendered_per_label_value(registry):
+    counter = registry.counter("chunks_total", "Chunks.", ("outcome",))
+    counter.labels("ok").inc()
+    counter.labels("ok").inc(2)
+    counter.labels("error").inc()
+
+    samples = parse(registry.render())
+
+    assert samples[("test_chunks_total", '{outcome="ok"}')] == 3
+    assert samples[("test_chunks_total", '{outcome="error"}')] == 1
+
+
+def test_reregistering_returns_the_same_metric(registry):
+    assert registry.gauge("in_flight", "In flight.") is registry.gauge("in_flight", "In flight.")
+    with pytest.raises(ValueError):
+        registry.counter("in_flight", "In flight.")
+
+
+def test_stats_sources_are_read_at_render_time(registry):
+    stats = {"hits": 1, "entries": 2, "per_engine": {"whisper": {"loads": 3}}, "sizes": {"1": 4}, "name": "x"}
+    registry.register_stats("cache", lambda: stats, counters=("hits",))
+    stats["hits"] = 5
+
+    text = registry.render()
+    samples = parse(text)
+
+    assert "# TYPE test_cache_hits counter" in text
+    assert "# TYPE test_cache_entries gauge" in text
+    assert samples[("test_cache_hits", "")] == 5
+    assert samples[("test_cache_per_engine_loads", '{name="whisper"}')] == 3
+    assert samples[("test_cache_sizes", '{key="1"}')] == 4
+    assert not any(name == "test_cache_name" for name, _ in samples)
+
+
+def test_server_exposes_the_registry(registry):
+    registry.gauge("up", "Up.").set(1)
+    server = MetricsServer(0, registry, host="127.0.0.1")
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            assert parse(response.read().decode())[("test_up", "")] == 1
+    finally:
+        server.stop()
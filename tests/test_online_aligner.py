@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from online_aligner import OnlineAligner
+
+CHUNK_FRAMES = 40
+BAND_FRAMES = 20
+
+
+@pytest.fixture
+def reference():
+    # A random walk gives every frame a distinct, slowly varying feature vector, like MFCCs of a song
+    rng = np.random.default_rng(0)
+    return np.cumsum(rng.standard_normal((20, 800)), axis=1).astype(np.float32)
+
+
+def user_chunks(reference, start, count, noise=0.1):
+    """Chunks of a noisy copy of the reference that starts `start` frames into it."""
+    rng = np.random.default_rng(1)
+    for index in range(count):
+        window = reference[:, start + index * CHUNK_FRAMES : start + (index + 1) * CHUNK_FRAMES]
+        yield window + noise * rng.standard_normal(window.shape).astype(np.float32)
+
+
+def test_tracks_a_time_shifted_copy(reference):
+    aligner = OnlineAligner(reference, BAND_FRAMES)
+
+    starts = [aligner.align(chunk) for chunk in user_chunks(reference, 37, 10)]
+
+    assert starts == [37 + index * CHUNK_FRAMES for index in range(10)]
+    assert aligner.current_band == BAND_FRAMES
+
+
+def test_only_searches_around_the_playhead(reference):
+    aligner = OnlineAligner(reference, BAND_FRAMES)
+    assert aligner._search_window(CHUNK_FRAMES) == (0, reference.shape[1])
+
+    aligner.align(next(user_chunks(reference, 200, 1)))
+
+    assert aligner._search_window(CHUNK_FRAMES) == (240 - BAND_FRAMES, 240 + CHUNK_FRAMES + BAND_FRAMES)
+
+
+def test_follows_a_skip_within_the_band(reference):
+    aligner = OnlineAligner(reference, BAND_FRAMES)
+    aligner.align(next(user_chunks(reference, 100, 1)))
+
+    # The singer jumps ahead by less than the band
+    assert aligner.align(next(user_chunks(reference, 150, 1))) == 150
+
+
+def test_widens_the_band_to_catch_up_with_a_skip_past_it(reference):
+    aligner = OnlineAligner(reference, BAND_FRAMES)
+    aligner.align(next(user_chunks(reference, 100, 1)))
+
+    # The singer jumps further ahead than the band, so the match runs into the window's edge
+    chunks = user_chunks(reference, 175, 3)
+    aligner.align(next(chunks))
+    assert aligner.current_band == 2 * BAND_FRAMES
+
+    # The wider search finds the singer again, and the band narrows once the match settles
+    assert aligner.align(next(chunks)) == 175 + CHUNK_FRAMES
+    assert aligner.current_band == BAND_FRAMES
+    assert aligner.align(next(chunks)) == 175 + 2 * CHUNK_FRAMES
+
+
+def test_restored_state_aligns_like_the_original(reference):
+    chunks = list(user_chunks(reference, 37, 4))
+    aligner = OnlineAligner(reference, BAND_FRAMES)
+    for chunk in chunks[:2]:
+        aligner.align(chunk)
+
+    resumed = OnlineAligner(reference, BAND_FRAMES)
+    resumed.restore(aligner.state)
+
+    assert [resumed.align(chunk) for chunk in chunks[2:]] == [aligner.align(chunk) for chunk in chunks[2:]]
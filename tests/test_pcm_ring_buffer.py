@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from pcm_ring_buffer import PCMRingBuffer
+
+
+def ramp(start, length):
+    return np.arange(start, start + length, dtype=np.float32)
+
+
+def test_reads_across_the_wrap_point():
+    buffer = PCMRingBuffer(8)
+    buffer.append(ramp(0, 6))
+    buffer.append(ramp(6, 5))
+
+    assert buffer.total_written == 11
+    assert buffer.oldest_available == 3
+    np.testing.assert_array_equal(buffer.read(3, 8), ramp(3, 8))
+    np.testing.assert_array_equal(buffer.read(9, 2), ramp(9, 2))
+
+
+def test_oversized_append_after_wrapping():
+    buffer = PCMRingBuffer(8)
+    buffer.append(ramp(0, 6))
+    buffer.append(ramp(6, 5))
+    buffer.append(ramp(11, 20))
+
+    assert buffer.total_written == 31
+    assert buffer.oldest_available == 23
+    np.testing.assert_array_equal(buffer.read(23, 8), ramp(23, 8))
+    with pytest.raises(ValueError):
+        buffer.read(22, 1)
+
+    buffer.append(ramp(31, 3))
+    np.testing.assert_array_equal(buffer.read(26, 8), ramp(26, 8))
+
+
+def test_rejects_unwritten_samples():
+    buffer = PCMRingBuffer(8)
+    buffer.append(ramp(0, 4))
+
+    with pytest.raises(ValueError):
+        buffer.read(2, 3)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from pitch_tracker import PitchTracker
+
+SR = 22050
+
+
+def sine(f0, seconds, phase=0.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.5 * np.sin(2 * np.pi * f0 * t + phase)).astype(np.float32)
+
+
+@pytest.mark.parametrize("f0", [110.0, 220.0, 440.0])
+def test_recovers_the_f0_of_a_sine(f0):
+    estimated, voiced = PitchTracker(SR).estimate(sine(f0, 1.0))
+
+    assert voiced.all()
+    np.testing.assert_allclose(estimated, f0, rtol=0.005)
+
+
+def test_streaming_matches_the_whole_signal_across_chunk_boundaries():
+    signal = sine(220.0, 2.0)
+    whole_f0, _ = PitchTracker(SR).estimate(signal)
+
+    tracker = PitchTracker(SR)
+    # Chunk sizes that are not multiples of the hop, so frames straddle chunk boundaries
+    bounds = [0, 3000, 3001, 11111, 20000, len(signal)]
+    pieces = [tracker.process(signal[start:end]) for start, end in zip(bounds, bounds[1:])]
+    streamed_f0 = np.concatenate([f0 for f0, _ in pieces])
+
+    assert tracker.frames_processed == len(whole_f0)
+    np.testing.assert_allclose(streamed_f0, whole_f0)
+
+
+def test_reset_forgets_the_previous_chunk():
+    tracker = PitchTracker(SR)
+    tracker.process(sine(440.0, 0.3))
+    tracker.reset()
+
+    f0, voiced = tracker.process(sine(110.0, 0.5))
+
+    # Without the reset, the first frames would mix the 440 Hz tail into the 110 Hz signal
+    assert tracker.frames_processed == len(f0)
+    assert voiced.all()
+    np.testing.assert_allclose(f0, 110.0, rtol=0.005)
+
+
+def test_silence_is_unvoiced():
+    f0, voiced = PitchTracker(SR).estimate(np.zeros(SR, dtype=np.float32))
+
+    assert not voiced.any()
+    assert np.isnan(f0).all()
+
+
+def test_contour_indexes_frames_by_sample():
+    signal = np.concatenate((sine(220.0, 1.0), sine(330.0, 1.0)))
+    contour = PitchTracker(SR).contour(signal, block_seconds=0.5)
+
+    first, _ = contour.between(0, SR // 2)
+    second, _ = contour.between(SR + 4096, 2 * SR - 4096)
+    np.testing.assert_allclose(first, 220.0, rtol=0.005)
+    np.testing.assert_allclose(second, 330.0, rtol=0.005)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import scoring_engine
+from reference_feature_cache import FeatureParams, ReferenceFeatures
+from scoring_engine import SharedReference, _attach
+
+
+def make_features(track_hash):
+    rng = np.random.default_rng(0)
+    return ReferenceFeatures(
+        track_hash,
+        FeatureParams(),
+        audio=rng.standard_normal(22050).astype(np.float32),
+        stft_magnitude=rng.random((1025, 44)).astype(np.float32),
+        mfcc=rng.standard_normal((20, 44)).astype(np.float32),
+        onset_envelope=rng.random(44).astype(np.float32),
+        rms=rng.random(44).astype(np.float32),
+    )
+
+
+@pytest.fixture
+def published():
+    references = []
+
+    def publish(track_hash):
+        references.append(SharedReference(make_features(track_hash)))
+        return references[-1]
+
+    yield publish
+    scoring_engine._attached.clear()
+    for reference in references:
+        reference.close()
+
+
+def test_released_blocks_are_detached_on_the_next_job(published):
+    first, second = published("a"), published("b")
+    scorer = _attach(first.handle)
+    np.testing.assert_array_equal(scorer.reference_features.mfcc, make_features("a").mfcc)
+    first_mapping = scoring_engine._attached[first.shm.name][0]
+    del scorer
+
+    _attach(second.handle, released=(first.shm.name,))
+
+    assert list(scoring_engine._attached) == [second.shm.name]
+    assert first_mapping.buf is None  # The worker's mapping is closed, not just forgotten
+
+
+def test_attachments_are_bounded(published):
+    references = [published(str(index)) for index in range(scoring_engine._MAX_ATTACHED + 2)]
+    for reference in references:
+        _attach(reference.handle)
+
+    assert list(scoring_engine._attached) == [reference.shm.name for reference in references[2:]]
@@ -0,0 +1,61 @@
+import os
+import time
+import threading
+import importlib.util
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# AIProcessingService/ has a transcription_cache module too, so Scoring's is loaded by path
+_spec = importlib.util.spec_from_file_location(
+    "scoring_transcription_cache", os.path.join(REPO_ROOT, "Scoring", "transcription_cache.py")
+)
+scoring_transcription_cache = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scoring_transcription_cache)
+CachedTranscription = scoring_transcription_cache.CachedTranscription
+
+
+class SlowTranscription:
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def transcribe(self, audio_data, sr, from_file=False):
+        self.calls += 1
+        self.release.wait(5)
+        return "la la la"
+
+
+def test_concurrent_misses_transcribe_once():
+    engine = SlowTranscription()
+    cache = CachedTranscription(engine, "slow")
+    audio = np.zeros(16000, dtype=np.float32)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.transcribe(audio, 16000))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while not cache._in_flight:
+        time.sleep(0.01)
+    engine.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["la la la"] * 4
+    assert engine.calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_hits"] == 3
+
+
+def test_entries_are_reloaded_from_disk(tmp_path):
+    engine = SlowTranscription()
+    engine.release.set()
+    audio = np.ones(16000, dtype=np.float32)
+
+    CachedTranscription(engine, "slow", cache_dir=str(tmp_path)).transcribe(audio, 16000)
+    restarted = CachedTranscription(engine, "slow", cache_dir=str(tmp_path))
+
+    assert restarted.transcribe(audio, 16000) == "la la la"
+    assert engine.calls == 1
+    assert restarted.stats()["disk_hits"] == 1
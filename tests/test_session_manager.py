@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from session_manager import SessionLimitError, SessionManager
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def open_session(manager, session_id):
+    processor = FakeProcessor()
+    manager.attach(manager.reserve(session_id, "token"), processor)
+    return processor
+
+
+def test_rejects_sessions_over_capacity():
+    manager = SessionManager(max_sessions=2, idle_timeout=60)
+    open_session(manager, "a")
+    open_session(manager, "b")
+
+    with pytest.raises(SessionLimitError):
+        manager.reserve("c", "token")
+    assert manager.active_count() == 2
+    assert manager.stats()["rejected"] == 1
+
+
+def test_reservations_count_towards_capacity():
+    manager = SessionManager(max_sessions=1, idle_timeout=60)
+    reserved = manager.reserve("a", "token")
+
+    with pytest.raises(SessionLimitError):
+        manager.reserve("b", "token")
+    # A chunk arriving before the processor is attached is not served by a half-built session
+    with pytest.raises(ValueError):
+        manager.get("a")
+
+    processor = FakeProcessor()
+    manager.attach(reserved, processor)
+    assert manager.get("a").audio_processor is processor
+
+
+def test_removing_a_reservation_frees_its_slot_and_rejects_the_late_processor():
+    manager = SessionManager(max_sessions=1, idle_timeout=60)
+    reserved = manager.reserve("a", "token")
+    manager.remove("a")
+
+    processor = FakeProcessor()
+    with pytest.raises(ValueError):
+        manager.attach(reserved, processor)
+    assert processor.closed
+    open_session(manager, "b")
+
+
+def test_reinitializing_a_stream_replaces_its_session():
+    manager = SessionManager(max_sessions=1, idle_timeout=60)
+    first = open_session(manager, "a")
+    second = open_session(manager, "a")
+
+    assert first.closed
+    assert not second.closed
+    assert manager.get("a").audio_processor is second
+    assert manager.active_count() == 1
+
+
+def test_evicts_idle_sessions_but_not_reservations():
+    manager = SessionManager(max_sessions=2, idle_timeout=0.05)
+    idle = open_session(manager, "idle")
+    manager.reserve("building", "token")
+    time.sleep(0.1)
+
+    assert manager.evict_idle() == 1
+    assert idle.closed
+    with pytest.raises(ValueError):
+        manager.get("idle")
+    assert manager.active_count() == 1
+
+
+def test_full_registry_makes_room_by_evicting_idle_sessions():
+    manager = SessionManager(max_sessions=1, idle_timeout=0.05)
+    idle = open_session(manager, "idle")
+    time.sleep(0.1)
+
+    open_session(manager, "new")
+    assert idle.closed
+    assert manager.stats()["evicted"] == 1
@@ -0,0 +1,14 @@
+"""AIProcessingService/ and Scoring/ are deployed separately, so a few modules are copied between them."""
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read(service, module):
+    with open(os.path.join(REPO_ROOT, service, module)) as f:
+        return f.read()
+
+
+def test_lyric_timeline_copies_match():
+    assert read("AIProcessingService", "lyric_timeline.py") == read("Scoring", "lyric_timeline.py")
+
@@ -0,0 +1,79 @@
+from unittest import mock
+
+import librosa
+import numpy as np
+import pytest
+
+from audio_preprocessor import AudioPreprocessor, SpectralState
+
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal(22050).astype(np.float32), rng.standard_normal(22050).astype(np.float32)
+
+
+@pytest.fixture
+def transforms():
+    """Counts the stft and istft calls made while the fixture is active."""
+    with mock.patch.object(librosa, "stft", wraps=librosa.stft) as stft, mock.patch.object(
+        librosa, "istft", wraps=librosa.istft
+    ) as istft:
+        yield stft, istft
+
+
+def test_spectral_steps_share_one_stft_and_one_istft(audio, transforms):
+    chunk, reference = audio
+    stft, istft = transforms
+
+    processed = AudioPreprocessor.preprocess_audio(
+        chunk, ["adaptive_noise_reduction", "spectral_gate", "spectral_masking"], reference_audio=reference
+    )
+
+    # One stft of the chunk and one of the reference, shared by noise reduction and masking
+    assert stft.call_count == 2
+    assert istft.call_count == 1
+    assert len(processed) == len(chunk)
+
+
+def test_a_shared_reference_state_is_transformed_once(audio, transforms):
+    chunk, reference = audio
+    stft, _ = transforms
+    reference_state = SpectralState(reference)
+
+    for pipeline in (["adaptive_noise_reduction"], ["spectral_masking"]):
+        AudioPreprocessor.preprocess_audio(chunk, pipeline, reference_audio=reference_state)
+
+    assert stft.call_count == 3  # The chunk once per pipeline, the reference once
+
+
+def test_single_spectral_step_matches_its_time_domain_version(audio):
+    chunk, _ = audio
+    expected = AudioPreprocessor.spectral_gate(chunk)
+
+    np.testing.assert_array_equal(AudioPreprocessor.preprocess_audio(chunk, ["spectral_gate"]), expected)
+
+
+def test_state_converts_between_domains_lazily(audio, transforms):
+    chunk, _ = audio
+    stft, istft = transforms
+    state = SpectralState(chunk)
+    assert state.length == len(chunk)
+
+    spectral = state.with_stft(state.stft)
+    assert stft.call_count == 1
+    assert spectral.length == len(chunk)  # Known without an istft
+    assert istft.call_count == 0
+    np.testing.assert_allclose(spectral.signal, chunk, atol=1e-5)
+    assert set(state.timer.totals) == {"stft", "istft"}
+
+
+def test_prefix_stfts_are_cached_per_length(audio, transforms):
+    _, reference = audio
+    stft, _ = transforms
+    state = SpectralState(reference)
+
+    first = state.prefix_stft(11025)
+    assert state.prefix_stft(11025) is first
+    assert state.prefix_stft(len(reference)) is state.stft
+    assert stft.call_count == 2